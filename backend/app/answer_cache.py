@@ -0,0 +1,173 @@
+"""
+RAG 답변 시맨틱 캐시
+
+이 파일의 역할:
+- 의미가 거의 같은 추천 질문에 대해 이전에 생성한 LLM 답변을 재사용
+- 질문 임베딩의 코사인 유사도 + 추출된 선호도 + 검색된 메뉴 ID 집합으로 캐시 히트 판단
+- TTL(만료 시간)과 최대 크기 기반 LRU 제거
+
+왜 필요한가:
+- 트래픽의 상당 부분이 "전주 비빔밥 추천", "전주 비빔밥 추천해줘"처럼
+  같은 답변을 만드는 질문이며, 매번 gpt-4o-mini 호출 비용과 지연이 발생
+- 선호도와 검색 결과(메뉴 ID)까지 일치할 때만 재사용하므로
+  LLM이 보게 될 컨텍스트가 같은 경우에만 캐시된 답변을 반환
+
+작동 원리:
+1. (선호도, 메뉴 ID 집합)으로 버킷을 정확히 찾음
+2. 버킷 안의 항목들과 질문 임베딩의 코사인 유사도 비교 (보통 소수)
+3. 임계값 이상이고 만료되지 않았으면 히트
+4. 임베딩 없이 검색된 요청(어휘 인덱스 강한 일치)은 정규화된 질문 텍스트가 같을 때만 히트
+
+주의:
+- 대화 기록이 있는 요청은 문맥에 따라 답이 달라지므로 캐시를 사용하지 않음 (RAGChain에서 처리)
+"""
+
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from itertools import count
+from typing import List, Dict, Any, Optional, Iterable
+
+
+class SemanticAnswerCache:
+    """질문 임베딩 유사도 기반 답변 캐시 (스레드 안전)"""
+
+    def __init__(
+        self,
+        max_size: int = 512,
+        ttl_seconds: float = 600.0,
+        similarity_threshold: float = 0.95
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        # entry_id → {"bucket", "embedding", "text", "answer", "expires_at"} (LRU 순서)
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        # 버킷 키 → 해당 버킷의 entry_id 목록
+        self._buckets: Dict[str, List[int]] = {}
+        self._ids = count()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def _bucket_key(preferences: Dict[str, Any], menu_ids: Iterable[str]) -> str:
+        """선호도와 메뉴 ID 집합으로 정확 일치 버킷 키 생성"""
+        prefs = json.dumps(preferences, sort_keys=True, ensure_ascii=False, default=str)
+        return prefs + "|" + ",".join(sorted(set(menu_ids)))
+
+    @staticmethod
+    def _normalize(embedding: Optional[List[float]]) -> Optional[List[float]]:
+        if embedding is None:
+            return None
+        norm = math.sqrt(sum(x * x for x in embedding)) or 1.0
+        return [x / norm for x in embedding]
+
+    def _remove(self, entry_id: int):
+        """항목 제거 (락을 잡은 상태에서 호출)"""
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        bucket = self._buckets.get(entry["bucket"])
+        if bucket is not None:
+            bucket.remove(entry_id)
+            if not bucket:
+                del self._buckets[entry["bucket"]]
+
+    @staticmethod
+    def _similarity(
+        query: Optional[List[float]],
+        text: Optional[str],
+        entry: Dict[str, Any]
+    ) -> float:
+        """질문과 캐시 항목의 유사도 (임베딩이 없으면 텍스트 완전 일치 여부)"""
+        if query is not None and entry["embedding"] is not None:
+            return sum(a * b for a, b in zip(query, entry["embedding"]))
+        return 1.0 if text is not None and text == entry["text"] else -1.0
+
+    def get(
+        self,
+        query_embedding: Optional[List[float]],
+        preferences: Dict[str, Any],
+        menu_ids: Iterable[str],
+        text: Optional[str] = None
+    ) -> Optional[str]:
+        """캐시된 답변 조회 (없으면 None, query_embedding이 없으면 text 완전 일치로 조회)"""
+        if not self.enabled:
+            return None
+
+        bucket_key = self._bucket_key(preferences, menu_ids)
+        query = self._normalize(query_embedding)
+        now = time.time()
+
+        with self._lock:
+            best_id, best_score = None, self.similarity_threshold
+            for entry_id in list(self._buckets.get(bucket_key, [])):
+                entry = self._entries[entry_id]
+                if entry["expires_at"] <= now:
+                    self._remove(entry_id)
+                    continue
+                score = self._similarity(query, text, entry)
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return self._entries[best_id]["answer"]
+
+    def put(
+        self,
+        query_embedding: Optional[List[float]],
+        preferences: Dict[str, Any],
+        menu_ids: Iterable[str],
+        answer: str,
+        text: Optional[str] = None
+    ):
+        """답변 저장 (최대 크기 초과 시 가장 오래 사용되지 않은 항목 제거)"""
+        if not self.enabled or not answer:
+            return
+
+        bucket_key = self._bucket_key(preferences, menu_ids)
+        entry = {
+            "bucket": bucket_key,
+            "embedding": self._normalize(query_embedding),
+            "text": text,
+            "answer": answer,
+            "expires_at": time.time() + self.ttl_seconds
+        }
+
+        with self._lock:
+            entry_id = next(self._ids)
+            self._entries[entry_id] = entry
+            self._buckets.setdefault(bucket_key, []).append(entry_id)
+            while len(self._entries) > self.max_size:
+                oldest_id = next(iter(self._entries))
+                self._remove(oldest_id)
+
+    def clear(self):
+        """캐시 비우기 (카운터는 유지)"""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계 (크기, 히트/미스, 히트율)"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total > 0 else 0.0
+            }
@@ -0,0 +1,351 @@
+"""
+디스크 임베딩 캐시 (모든 적재 스크립트와 서버가 공유)
+
+이 파일의 역할:
+- (모델 이름, 모델 리비전, 텍스트 해시) → 임베딩 벡터를 디스크에 영구 저장
+- scripts/init_vectorstore.py(VectorStore.add_documents), scripts/import_csv_simple.py,
+  서버의 질문 임베딩이 모두 같은 캐시를 조회하여 바뀌지 않은 텍스트는 모델 추론을 생략
+
+왜 필요한가:
+- 두 적재 스크립트가 실행할 때마다 같은 문서를 처음부터 다시 임베딩함 (CPU로 수 분)
+- 전체 재구축, 실험, chroma ↔ simple 엔진 전환 때도 같은 텍스트를 반복 추론
+- 바뀌지 않은 텍스트의 벡터를 디스크에서 읽으면 재구축이 거의 공짜가 됨
+
+저장 형식 (네임스페이스 디렉토리 하나 = 모델 + 리비전 + 백엔드 하나):
+- vectors.f32: float32 벡터를 행 단위로 이어 붙인 파일 (추가 전용, mmap으로 읽음)
+- keys.bin: 텍스트 해시(blake2b 16바이트)를 같은 행 순서로 이어 붙인 파일 (추가 전용)
+- meta.json: 모델 이름, 리비전, 벡터 차원
+- 메모리에는 해시 → 행 번호 딕셔너리만 유지 (벡터는 OS 페이지 캐시가 관리)
+
+작동 원리:
+1. 텍스트 해시로 행 번호 조회 → 있으면 mmap에서 해당 행만 읽음
+2. 없는 텍스트만 모아 모델로 한 번에 임베딩 → 두 파일 끝에 추가
+3. 다른 프로세스가 추가한 행은 keys.bin 크기가 늘어난 것을 보고 다시 읽음
+4. 추가는 파일 잠금(fcntl) 안에서 vectors → keys 순서로 기록하므로,
+   중간에 끊겨도 두 파일 중 짧은 쪽 행 수까지만 유효로 보고 나머지는 다음 추가 때 잘라냄
+
+설정 (환경 변수):
+- EMBEDDING_STORE: 디스크 임베딩 캐시 사용 여부 (기본 1)
+- EMBEDDING_STORE_PATH: 저장 디렉토리 (기본: backend/embedding_store, git에 포함되는 chroma_db/ 밖)
+- EMBEDDING_STORE_QUERIES: 서버 질문 임베딩도 디스크에 추가할지 여부 (기본 0, 조회는 항상 함)
+- EMBEDDING_MODEL_REVISION: 모델 리비전 (기본 main, 모델을 바꾸면 다른 네임스페이스 사용)
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import threading
+from array import array
+from pathlib import Path
+from typing import List, Dict, Optional, Callable
+from app.utils import logger, BASE_DIR, get_env_int, get_env_optional
+
+# 다른 프로세스와의 추가 잠금 (POSIX 전용, 없으면 프로세스 내부 잠금만 사용)
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+
+# 기본 저장 위치
+DEFAULT_EMBEDDING_STORE_PATH = BASE_DIR / "embedding_store"
+
+# 텍스트 해시 크기 (바이트)
+KEY_SIZE = 16
+
+# float32 크기 (바이트)
+FLOAT_SIZE = 4
+
+_UNSAFE_NAME_PATTERN = re.compile(r"[^0-9A-Za-z@._-]+")
+
+
+def text_hash(text: str) -> bytes:
+    """
+    텍스트 해시 (16바이트)
+
+    임베딩 백엔드는 모두 줄바꿈을 공백으로 바꾼 텍스트를 모델에 넣으므로
+    (HuggingFaceEmbeddings, OnnxEmbeddings, BERT 토크나이저의 공백 처리)
+    같은 모델 입력이 되는 텍스트는 같은 키를 갖도록 줄바꿈을 공백으로 바꾼 뒤 해시
+    """
+    return hashlib.blake2b(text.replace("\n", " ").encode("utf-8"), digest_size=KEY_SIZE).digest()
+
+
+def namespace_dirname(model_name: str, revision: str) -> str:
+    """모델 이름 + 리비전 → 디렉토리 이름 (예: jhgan_ko-sroberta-multitask@main)"""
+    return _UNSAFE_NAME_PATTERN.sub("_", f"{model_name}@{revision}")
+
+
+class EmbeddingStore:
+    """
+    추가 전용 mmap 벡터 파일 + 해시 인덱스 (스레드/프로세스 안전)
+
+    같은 디렉토리를 여러 프로세스(서버, 적재 스크립트)가 동시에 열어도 됨
+    """
+
+    def __init__(self, path: Path, model_name: str, revision: str = "main"):
+        self.path = Path(path) / namespace_dirname(model_name, revision)
+        self.model_name = model_name
+        self.revision = revision
+        self.vectors_path = self.path / "vectors.f32"
+        self.keys_path = self.path / "keys.bin"
+        self.meta_path = self.path / "meta.json"
+
+        self.dim = 0
+        self.rows = 0
+        self._index: Dict[bytes, int] = {}
+        self._keys_size = 0
+        self._mmap: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        if self.meta_path.exists():
+            self.dim = int(json.loads(self.meta_path.read_text(encoding="utf-8")).get("dim", 0))
+        self._refresh()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    # ----- 읽기 -----
+
+    def _valid_rows(self) -> int:
+        """두 파일 모두에 온전히 기록된 행 수"""
+        if self.dim <= 0 or not self.keys_path.exists() or not self.vectors_path.exists():
+            return 0
+        key_rows = self.keys_path.stat().st_size // KEY_SIZE
+        vector_rows = self.vectors_path.stat().st_size // (self.dim * FLOAT_SIZE)
+        return min(key_rows, vector_rows)
+
+    def _refresh(self):
+        """다른 프로세스가 추가한 행을 인덱스와 mmap에 반영"""
+        with self._lock:
+            if self.dim <= 0 and self.meta_path.exists():
+                self.dim = int(json.loads(self.meta_path.read_text(encoding="utf-8")).get("dim", 0))
+            rows = self._valid_rows()
+            if rows == 0 or (rows <= self.rows and self._view is not None):
+                return
+
+            with open(self.keys_path, "rb") as f:
+                f.seek(self.rows * KEY_SIZE)
+                data = f.read((rows - self.rows) * KEY_SIZE)
+            for offset in range(0, len(data), KEY_SIZE):
+                self._index[data[offset:offset + KEY_SIZE]] = self.rows + offset // KEY_SIZE
+            self.rows = rows
+            self._keys_size = rows * KEY_SIZE
+
+            self._close_mmap()
+            with open(self.vectors_path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), rows * self.dim * FLOAT_SIZE, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap).cast("f")
+
+    def _maybe_refresh(self):
+        """keys.bin이 늘어났으면 다시 읽음 (stat 한 번)"""
+        try:
+            if self.keys_path.stat().st_size > self._keys_size:
+                self._refresh()
+        except FileNotFoundError:
+            pass
+
+    def _close_mmap(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """텍스트별 저장된 벡터 (없으면 None)"""
+        self._maybe_refresh()
+        with self._lock:
+            results: List[Optional[List[float]]] = []
+            for text in texts:
+                row = self._index.get(text_hash(text))
+                if row is None:
+                    results.append(None)
+                else:
+                    results.append(self._view[row * self.dim:(row + 1) * self.dim].tolist())
+            found = sum(1 for r in results if r is not None)
+            self.hits += found
+            self.misses += len(texts) - found
+            return results
+
+    def get(self, text: str) -> Optional[List[float]]:
+        return self.get_many([text])[0]
+
+    # ----- 쓰기 -----
+
+    def put_many(self, texts: List[str], vectors: List[List[float]]):
+        """새 벡터를 파일 끝에 추가 (이미 있는 텍스트는 건너뜀)"""
+        if not texts:
+            return
+        dim = len(vectors[0])
+        with self._lock:
+            with open(self.keys_path, "ab") as lock_file:
+                if HAS_FCNTL:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    self._append_locked(texts, vectors, dim)
+                finally:
+                    if HAS_FCNTL:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _append_locked(self, texts: List[str], vectors: List[List[float]], dim: int):
+        # 처음 쓰는 네임스페이스면 차원 기록
+        if self.dim <= 0:
+            if self.meta_path.exists():
+                self.dim = int(json.loads(self.meta_path.read_text(encoding="utf-8")).get("dim", 0))
+            else:
+                self.dim = dim
+                self.meta_path.write_text(
+                    json.dumps({"model_name": self.model_name, "revision": self.revision, "dim": dim}),
+                    encoding="utf-8"
+                )
+        if dim != self.dim:
+            raise ValueError(f"임베딩 차원이 다릅니다: 저장소 {self.dim}, 입력 {dim} ({self.path})")
+
+        # 다른 프로세스가 추가한 행 반영 후, 중간에 끊긴 기록은 잘라냄
+        self._refresh()
+        for file_path, size in ((self.vectors_path, self.rows * self.dim * FLOAT_SIZE),
+                                (self.keys_path, self.rows * KEY_SIZE)):
+            if file_path.exists() and file_path.stat().st_size != size:
+                os.truncate(file_path, size)
+
+        keys = bytearray()
+        values = array("f")
+        seen = set()
+        for text, vector in zip(texts, vectors):
+            key = text_hash(text)
+            if key in self._index or key in seen:
+                continue
+            seen.add(key)
+            keys += key
+            values.extend(vector)
+        if not keys:
+            return
+
+        # 벡터를 먼저 기록해야 keys.bin 기준으로 읽는 쪽이 불완전한 행을 보지 않음
+        with open(self.vectors_path, "ab") as f:
+            values.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self.keys_path, "ab") as f:
+            f.write(keys)
+            f.flush()
+        self._refresh()
+
+    # ----- 임베딩 -----
+
+    def embed(self, texts: List[str], embed_fn: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        """
+        저장된 벡터는 그대로 사용하고, 없는 텍스트만 embed_fn으로 한 번에 임베딩 후 저장
+
+        Args:
+            texts: 임베딩할 텍스트 목록
+            embed_fn: 텍스트 목록 → 벡터 목록 (모델 배치 추론)
+        """
+        results = self.get_many(texts)
+        missing: Dict[str, List[int]] = {}
+        for i, vector in enumerate(results):
+            if vector is None:
+                missing.setdefault(texts[i], []).append(i)
+        if missing:
+            missing_texts = list(missing)
+            vectors = [list(map(float, v)) for v in embed_fn(missing_texts)]
+            self.put_many(missing_texts, vectors)
+            for text, vector in zip(missing_texts, vectors):
+                for i in missing[text]:
+                    results[i] = vector
+        return results
+
+    def stats(self) -> Dict[str, object]:
+        total = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "rows": self.rows,
+            "dim": self.dim,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._close_mmap()
+
+
+class StoreBackedEmbeddings:
+    """
+    임베딩 객체(embed_query/embed_documents)를 감싸 디스크 캐시를 먼저 조회
+
+    - embed_documents: 없는 문서만 모델로 임베딩하고 저장
+    - embed_query: 저장된 벡터가 있으면 사용, persist_queries=True일 때만 새 질문을 저장
+      (사용자 질문은 종류가 끝없이 늘어나므로 기본적으로 디스크에 쌓지 않음)
+    """
+
+    def __init__(self, embeddings, store: EmbeddingStore, persist_queries: bool = False):
+        self.embeddings = embeddings
+        self.store = store
+        self.persist_queries = persist_queries
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.store.embed(texts, self.embeddings.embed_documents)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """질문 목록 임베딩 (마이크로 배치용, 저장은 persist_queries일 때만)"""
+        if self.persist_queries:
+            return self.store.embed(texts, self.embeddings.embed_documents)
+        results = self.store.get_many(texts)
+        missing = [i for i, vector in enumerate(results) if vector is None]
+        if missing:
+            vectors = self.embeddings.embed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, vectors):
+                results[i] = vector
+        return results
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_queries([text])[0]
+
+    def __getattr__(self, name):
+        # model_file 등 원래 임베딩 객체의 속성은 그대로 노출
+        if name == "embeddings":
+            raise AttributeError(name)
+        return getattr(self.embeddings, name)
+
+
+def open_embedding_store(model_name: str, path: Optional[str] = None) -> Optional[EmbeddingStore]:
+    """
+    설정에 맞는 디스크 임베딩 캐시 열기 (EMBEDDING_STORE=0이거나 열 수 없으면 None)
+
+    Args:
+        model_name: 모델 식별자 (app.embeddings.embedding_model_id 결과)
+        path: 저장 디렉토리 (없으면 EMBEDDING_STORE_PATH 설정값)
+    """
+    if not get_env_int("EMBEDDING_STORE", 1):
+        return None
+    root = Path(path or get_env_optional("EMBEDDING_STORE_PATH", str(DEFAULT_EMBEDDING_STORE_PATH)))
+    revision = get_env_optional("EMBEDDING_MODEL_REVISION", "main")
+    try:
+        store = EmbeddingStore(root, model_name, revision)
+        logger.info(f"[임베딩 저장소] {store.path} ({len(store)}개 벡터)")
+        return store
+    except Exception as e:
+        logger.warning(f"[임베딩 저장소] 열기 실패, 디스크 캐시 없이 진행합니다: {e}")
+        return None
+
+
+def wrap_embeddings(embeddings, model_name: str):
+    """디스크 캐시가 켜져 있으면 임베딩 객체를 StoreBackedEmbeddings로 감싸서 반환"""
+    store = open_embedding_store(model_name)
+    if store is None:
+        return embeddings
+    return StoreBackedEmbeddings(
+        embeddings,
+        store,
+        persist_queries=bool(get_env_int("EMBEDDING_STORE_QUERIES", 0))
+    )
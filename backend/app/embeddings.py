@@ -0,0 +1,278 @@
+"""
+임베딩 백엔드 선택 및 생성
+
+이 파일의 역할:
+- 설정(EMBEDDING_BACKEND)에 따라 임베딩 백엔드 객체를 생성
+- 기본 PyTorch(sentence-transformers) 백엔드와
+  ONNX로 변환 + int8 동적 양자화된 CPU 백엔드 제공
+- 두 백엔드의 결과가 얼마나 일치하는지(코사인 유사도) 확인하는 기능 제공
+
+왜 필요한가:
+- 운영 서버는 GPU 없이 CPU만 사용하므로 full-precision PyTorch 추론이 느리고 메모리를 많이 사용
+- 같은 모델(jhgan/ko-sroberta-multitask)을 ONNX int8로 돌리면
+  질문 임베딩 지연 시간과 상주 메모리를 크게 줄일 수 있음
+- 양자화로 인한 품질 저하가 없는지 메뉴 데이터로 직접 검증해야 함
+
+주요 기능:
+- create_embeddings(): 설정에 맞는 임베딩 객체 생성 (embed_query/embed_documents 제공)
+- embedding_model_id(): 디스크 임베딩 캐시(app/embedding_store.py) 네임스페이스용 모델 식별자
+- OnnxEmbeddings: ONNX Runtime 기반 임베딩 (mean pooling + L2 정규화)
+- HashEmbeddings: 모델 없이 글자 바이그램 해시로 만드는 벡터 (벤치마크/부하 테스트용)
+- compare_embedding_backends(): 두 백엔드의 코사인 일치도 및 속도 비교
+
+설정 (환경 변수):
+- EMBEDDING_BACKEND: "torch"(기본), "onnx" 또는 "hash" (의미 검색 품질 없음, 벤치마크/부하 테스트 전용)
+- EMBEDDING_ONNX_PATH: ONNX 모델 디렉토리 (기본: backend/models/ko-sroberta-onnx-int8)
+- EMBEDDING_ONNX_THREADS: ONNX Runtime 스레드 수 (0이면 자동)
+
+ONNX 모델 준비:
+- python scripts/export_onnx_embeddings.py
+"""
+
+import time
+import zlib
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from app.utils import logger, BASE_DIR, get_env_optional, get_env_int
+
+# ONNX 백엔드는 선택 설치 (onnxruntime, transformers)
+try:
+    import numpy as np
+    import onnxruntime as ort
+    from transformers import AutoTokenizer
+    HAS_ONNXRUNTIME = True
+except ImportError:
+    HAS_ONNXRUNTIME = False
+
+
+# 기본 임베딩 모델 (한국어 전용)
+MODEL_NAME = "jhgan/ko-sroberta-multitask"
+
+# ONNX 모델 기본 저장 위치
+DEFAULT_ONNX_PATH = BASE_DIR / "models" / "ko-sroberta-onnx-int8"
+
+# 양자화 모델 파일명 (없으면 model.onnx 사용)
+ONNX_MODEL_FILES = ["model_quantized.onnx", "model.onnx"]
+
+# 해시 임베딩 차원 (ko-sroberta와 같게 하여 인덱스 크기/검색 비용을 맞춤)
+HASH_EMBEDDING_DIM = 768
+
+
+class OnnxEmbeddings:
+    """
+    ONNX Runtime 기반 문장 임베딩
+
+    sentence-transformers의 ko-sroberta-multitask와 같은 방식
+    (토큰 임베딩 mean pooling + L2 정규화)으로 벡터를 계산하여
+    HuggingFaceEmbeddings와 같은 인터페이스(embed_query/embed_documents)를 제공
+    """
+
+    def __init__(
+        self,
+        model_path: Path,
+        batch_size: int = 64,
+        max_length: int = 128,
+        num_threads: int = 0
+    ):
+        if not HAS_ONNXRUNTIME:
+            raise RuntimeError("onnxruntime/transformers가 설치되지 않았습니다")
+
+        self.model_path = Path(model_path)
+        self.batch_size = max(1, batch_size)
+        self.max_length = max_length
+
+        model_file = None
+        for filename in ONNX_MODEL_FILES:
+            if (self.model_path / filename).exists():
+                model_file = self.model_path / filename
+                break
+        if model_file is None:
+            raise FileNotFoundError(f"ONNX 모델 파일을 찾을 수 없습니다: {self.model_path}")
+
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            session_options.intra_op_num_threads = num_threads
+
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.model_path))
+        self.session = ort.InferenceSession(
+            str(model_file),
+            sess_options=session_options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.model_file = model_file
+
+    def _encode_batch(self, texts: List[str]) -> "np.ndarray":
+        """배치 하나를 토큰화 → ONNX 추론 → mean pooling → 정규화"""
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np"
+        )
+        inputs = {
+            name: encoded[name].astype(np.int64)
+            for name in ("input_ids", "attention_mask", "token_type_ids")
+            if name in self.input_names and name in encoded
+        }
+        token_embeddings = self.session.run(None, inputs)[0]
+
+        # attention mask를 고려한 mean pooling
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled = summed / counts
+
+        # L2 정규화 (normalize_embeddings=True와 동일)
+        norms = np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled / norms
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서 목록 임베딩 (batch_size 단위로 추론)"""
+        texts = [t.replace("\n", " ") for t in texts]
+        results: List[List[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            results.extend(self._encode_batch(texts[start:start + self.batch_size]).tolist())
+        return results
+
+    def embed_query(self, text: str) -> List[float]:
+        """질문 하나 임베딩"""
+        return self.embed_documents([text])[0]
+
+
+class HashEmbeddings:
+    """
+    글자 바이그램 feature hashing 임베딩 (모델 로드 없음)
+
+    검색 품질은 의미가 없지만 같은 텍스트는 항상 같은 벡터가 나오고 차원이 실제 모델과 같으므로
+    수백만 문서 코퍼스를 빠르게 만들어 인덱스 검색 비용만 측정하거나,
+    모델 없이 서버 부하 테스트를 할 때 사용
+    """
+
+    def __init__(self, dim: int = HASH_EMBEDDING_DIM):
+        self.dim = dim
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        compact = "".join(text.split())
+        for i in range(len(compact) - 1):
+            h = zlib.crc32(compact[i:i + 2].encode("utf-8"))
+            # 하위 비트로 위치, 최상위 비트로 부호 결정 (충돌 편향 상쇄)
+            vector[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norm = sum(v * v for v in vector) ** 0.5 or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def embedding_model_id(embeddings) -> str:
+    """
+    디스크 임베딩 캐시 네임스페이스용 모델 식별자
+
+    ONNX int8 모델은 같은 원본 모델이라도 벡터가 조금 다르므로 따로 구분
+    """
+    if isinstance(embeddings, OnnxEmbeddings):
+        return f"{MODEL_NAME}-onnx-{embeddings.model_file.stem}"
+    if isinstance(embeddings, HashEmbeddings):
+        return f"hash-{embeddings.dim}"
+    return MODEL_NAME
+
+
+def create_torch_embeddings(batch_size: int = 64):
+    """기본 PyTorch(sentence-transformers) 임베딩 생성"""
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(
+        model_name=MODEL_NAME,
+        model_kwargs={'device': 'cpu'},  # GPU가 있으면 'cuda'로 변경 가능
+        encode_kwargs={
+            'normalize_embeddings': True,
+            'batch_size': batch_size
+        }
+    )
+
+
+def create_onnx_embeddings(batch_size: int = 64, model_path: Optional[str] = None) -> OnnxEmbeddings:
+    """ONNX int8 임베딩 생성"""
+    path = Path(model_path or get_env_optional("EMBEDDING_ONNX_PATH", str(DEFAULT_ONNX_PATH)))
+    return OnnxEmbeddings(
+        model_path=path,
+        batch_size=batch_size,
+        num_threads=get_env_int("EMBEDDING_ONNX_THREADS", 0)
+    )
+
+
+def create_embeddings(batch_size: int = 64, backend: Optional[str] = None):
+    """
+    설정에 맞는 임베딩 객체 생성
+
+    ONNX 백엔드를 선택했지만 패키지나 모델 파일이 없으면
+    경고를 남기고 PyTorch 백엔드로 대체함
+
+    Args:
+        batch_size: 문서 임베딩 배치 크기
+        backend: "torch", "onnx" 또는 "hash" (없으면 EMBEDDING_BACKEND 설정값)
+    """
+    backend = (backend or get_env_optional("EMBEDDING_BACKEND", "torch")).lower()
+
+    if backend == "onnx":
+        try:
+            embeddings = create_onnx_embeddings(batch_size)
+            logger.info(f"ONNX 임베딩 백엔드 사용: {embeddings.model_file}")
+            return embeddings
+        except Exception as e:
+            logger.warning(f"ONNX 임베딩 백엔드 로드 실패, PyTorch 백엔드로 대체합니다: {e}")
+    elif backend == "hash":
+        logger.warning("해시 임베딩 백엔드 사용 (벤치마크/부하 테스트 전용, 의미 검색 불가)")
+        return HashEmbeddings()
+    elif backend != "torch":
+        logger.warning(f"알 수 없는 EMBEDDING_BACKEND: {backend} (PyTorch 백엔드 사용)")
+
+    return create_torch_embeddings(batch_size)
+
+
+def compare_embedding_backends(reference, candidate, texts: List[str]) -> Dict[str, Any]:
+    """
+    두 임베딩 백엔드의 결과 일치도 비교
+
+    같은 텍스트에 대해 두 백엔드가 만든 벡터의 코사인 유사도를 계산하고,
+    질문 하나를 임베딩하는 평균 지연 시간도 함께 측정
+
+    Args:
+        reference: 기준 백엔드 (보통 PyTorch)
+        candidate: 비교 대상 백엔드 (보통 ONNX int8)
+        texts: 비교에 사용할 텍스트 (메뉴 문서 등)
+
+    Returns:
+        코사인 유사도 통계(mean/min/p01/p05)와 백엔드별 질문 임베딩 지연 시간(ms)
+    """
+    import numpy as np
+
+    ref = np.asarray(reference.embed_documents(texts), dtype=np.float32)
+    cand = np.asarray(candidate.embed_documents(texts), dtype=np.float32)
+    ref /= np.clip(np.linalg.norm(ref, axis=1, keepdims=True), 1e-12, None)
+    cand /= np.clip(np.linalg.norm(cand, axis=1, keepdims=True), 1e-12, None)
+    cosines = (ref * cand).sum(axis=1)
+
+    def query_latency_ms(backend, samples: List[str]) -> float:
+        start = time.perf_counter()
+        for text in samples:
+            backend.embed_query(text)
+        return (time.perf_counter() - start) / max(1, len(samples)) * 1000.0
+
+    samples = texts[:50]
+    return {
+        "count": len(texts),
+        "cosine_mean": float(cosines.mean()),
+        "cosine_min": float(cosines.min()),
+        "cosine_p01": float(np.percentile(cosines, 1)),
+        "cosine_p05": float(np.percentile(cosines, 5)),
+        "reference_query_ms": query_latency_ms(reference, samples),
+        "candidate_query_ms": query_latency_ms(candidate, samples)
+    }
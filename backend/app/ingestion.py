@@ -0,0 +1,842 @@
+"""
+CSV → 벡터 인덱스 스트리밍 적재 파이프라인 (메모리 사용량 고정)
+
+이 파일의 역할:
+- CSV 읽기 → 문서 변환 → 배치 임베딩 → 배치 저장을 단계별 스레드로 나누어 동시에 실행
+- 단계 사이를 크기 제한 큐로 연결하여 느린 단계가 앞 단계를 멈추게 함 (back-pressure)
+- 진행률/처리량(행/초, 문서/초, 큐 적체) 주기적 보고
+- 저장이 끝난 위치를 체크포인트 파일에 기록하여 중단된 적재를 이어서 실행
+- 저장 대상(sink): ChromaDB 컬렉션(ChromaSink), simple_store 파일(SimpleStoreSink)
+
+왜 필요한가:
+- 기존 스크립트는 CSV 전체를 딕셔너리로 읽고, 전체 문서/메타데이터/임베딩 목록을 만든 뒤에야 저장함
+- 478행은 괜찮지만 수백만 행 지역 데이터는 메모리가 부족하고, 중간에 실패하면 처음부터 다시 해야 함
+- 읽기/임베딩/저장이 순서대로만 실행되어 CPU와 디스크가 번갈아 놀게 됨
+
+작동 원리:
+1. 읽기 스레드: CSV를 한 행씩 읽어 format_row로 문서 변환, batch_size개씩 묶어 임베딩 큐에 넣음
+2. 임베딩 스레드: 배치 단위로 embed_fn 호출 후 저장 큐에 넣음
+3. 저장(호출한 스레드): sink.write 후 마지막 행 번호/파일 위치/sink 상태를 체크포인트에 기록
+4. 큐가 가득 차면 앞 단계가 기다리므로 메모리에는 최대 (큐 크기 × 2 + 3)개 배치만 존재
+5. 재실행 시 CSV 크기/수정 시간이 같으면 체크포인트의 파일 위치부터 이어서 읽음
+   (마지막 배치가 두 번 저장될 수 있으므로 sink는 upsert/잘라내기로 멱등하게 동작)
+
+병렬 모드 (ParallelIngestionPipeline):
+- CSV를 restaurant_id 기준으로 샤딩하여 워커 프로세스(spawn)마다 임베딩 모델을 따로 로드해 임베딩
+- 워커별 torch/ONNX 스레드 수를 고정하여 워커끼리 코어를 나눠 씀
+- 결과는 호출한 프로세스의 단일 writer가 CSV 순서대로 재정렬하여 저장
+  → 저장되는 문서 ID/텍스트/메타데이터/순서와 체크포인트가 직렬 모드와 같음
+- 워커별 처리량(행/초) 보고
+
+설정 (환경 변수):
+- INGEST_WORKERS: 임베딩 워커 프로세스 수 (기본 1 = 직렬 파이프라인, 스크립트에서 사용)
+- INGEST_THREADS_PER_WORKER: 워커별 연산 스레드 수 (0이면 CPU 수 ÷ 워커 수)
+- INGEST_BATCH_SIZE: 임베딩/저장 배치 크기 (기본 256)
+- INGEST_QUEUE_SIZE: 단계 사이 큐에 쌓아둘 최대 배치 수 (기본 4)
+- INGEST_PROGRESS_INTERVAL: 진행률 보고 주기 (초, 기본 5)
+"""
+
+import csv
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Iterator, Tuple
+from app.utils import logger, get_env_int, get_env_float
+
+# simple_store 저장은 NumPy 필요 (ChromaDB 저장은 불필요)
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+# 문서 하나: (문서 ID, 텍스트, 메타데이터)
+Document = Tuple[str, str, Dict[str, Any]]
+
+# 스레드 종료 신호
+_DONE = object()
+
+
+@dataclass
+class Batch:
+    """파이프라인 단계 사이를 오가는 배치"""
+    ids: List[str] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list)
+    metadatas: List[Dict[str, Any]] = field(default_factory=list)
+    embeddings: Optional[List[List[float]]] = None
+    # 이 배치까지 처리한 CSV 행 수 / 파일 위치 (체크포인트용)
+    rows: int = 0
+    offset: int = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def iter_csv_rows(csv_path: Path, offset: int = 0, header: Optional[List[str]] = None) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    CSV를 한 행씩 읽으면서 (행이 끝난 파일 위치, 행 딕셔너리) 반환
+
+    - 바이너리로 읽고 줄 단위로 디코딩하므로 행마다 정확한 바이트 위치를 알 수 있음
+      (따옴표 안 줄바꿈처럼 여러 줄에 걸친 행도 csv 모듈이 필요한 만큼만 줄을 가져감)
+    - offset > 0이면 그 위치부터 이어서 읽음 (체크포인트 재개, header 필수)
+    """
+    with open(csv_path, "rb") as f:
+        f.seek(offset)
+        position = offset
+
+        def lines() -> Iterator[str]:
+            nonlocal position
+            encoding = "utf-8-sig" if offset == 0 else "utf-8"
+            for raw in f:
+                position += len(raw)
+                yield raw.decode(encoding)
+                encoding = "utf-8"
+
+        reader = csv.reader(lines())
+        if offset == 0:
+            # 첫 줄은 헤더
+            file_header = next(reader, None)
+            if file_header is None:
+                return
+            header = header or file_header
+        for values in reader:
+            if not values:
+                continue
+            yield position, dict(zip(header, values))
+
+
+def read_csv_header(csv_path: Path) -> List[str]:
+    """CSV 헤더 (BOM 제거)"""
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        return next(csv.reader(f), [])
+
+
+# ===== 저장 대상 =====
+
+class ChromaSink:
+    """ChromaDB 컬렉션에 upsert (같은 ID는 덮어쓰므로 재개 시 중복 저장돼도 안전)"""
+
+    name = "chroma"
+
+    def __init__(self, vectorstore):
+        self.vectorstore = vectorstore
+
+    def state(self) -> Dict[str, Any]:
+        return {}
+
+    def restore(self, state: Dict[str, Any]):
+        pass
+
+    def write(self, batch: Batch):
+        self.vectorstore.write_embeddings(
+            texts=batch.texts,
+            metadatas=batch.metadatas,
+            ids=batch.ids,
+            embeddings=batch.embeddings,
+            upsert=True
+        )
+
+    def finalize(self):
+        pass
+
+
+class SimpleStoreSink:
+    """
+    simple_store 파일(documents.json, metadatas.json, embeddings.npy) 저장
+
+    적재 중에는 output_dir/.partial 아래 추가 전용 파일에 배치를 이어 쓰고,
+    끝나면 한 번에 최종 형식으로 변환 (임베딩은 memmap으로 복사하므로 메모리 고정)
+    재개 시에는 체크포인트에 기록된 크기로 잘라내어 저장 중 끊긴 배치를 제거
+    """
+
+    name = "simple"
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = Path(output_dir)
+        self.partial_dir = self.output_dir / ".partial"
+        self.vectors_path = self.partial_dir / "embeddings.f32"
+        self.documents_path = self.partial_dir / "documents.jsonl"
+        self.metadatas_path = self.partial_dir / "metadatas.jsonl"
+        self.count = 0
+        self.dim = 0
+
+    def _files(self):
+        return (self.vectors_path, self.documents_path, self.metadatas_path)
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "dim": self.dim,
+            "sizes": [p.stat().st_size if p.exists() else 0 for p in self._files()]
+        }
+
+    def restore(self, state: Dict[str, Any]):
+        """체크포인트 상태로 되돌림 (state가 비어 있으면 새로 시작)"""
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        sizes = state.get("sizes") or [0, 0, 0]
+        for path, size in zip(self._files(), sizes):
+            with open(path, "ab"):
+                pass
+            os.truncate(path, size)
+        self.count = int(state.get("count", 0))
+        self.dim = int(state.get("dim", 0))
+
+    def write(self, batch: Batch):
+        if batch.embeddings is not None:
+            if not HAS_NUMPY:
+                raise RuntimeError("simple_store 임베딩 저장에는 numpy가 필요합니다")
+            vectors = np.asarray(batch.embeddings, dtype=np.float32)
+            self.dim = self.dim or vectors.shape[1]
+            with open(self.vectors_path, "ab") as f:
+                vectors.tofile(f)
+        with open(self.documents_path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(text, ensure_ascii=False) + "\n" for text in batch.texts)
+        with open(self.metadatas_path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(metadata, ensure_ascii=False) + "\n" for metadata in batch.metadatas)
+        self.count += len(batch)
+
+    @staticmethod
+    def _write_json_array(source: Path, target: Path):
+        """JSON lines → JSON 배열 (한 줄씩 복사)"""
+        with open(source, "r", encoding="utf-8") as src, open(target, "w", encoding="utf-8") as dst:
+            dst.write("[\n")
+            for i, line in enumerate(src):
+                dst.write((",\n" if i else "") + line.rstrip("\n"))
+            dst.write("\n]\n")
+
+    def finalize(self):
+        """최종 simple_store 형식으로 변환 후 임시 파일 삭제"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp_suffix = ".tmp"
+        targets = []
+
+        for source, name in ((self.documents_path, "documents.json"), (self.metadatas_path, "metadatas.json")):
+            target = self.output_dir / (name + tmp_suffix)
+            self._write_json_array(source, target)
+            targets.append((target, self.output_dir / name))
+
+        if self.dim > 0 and self.vectors_path.stat().st_size > 0:
+            source = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self.count, self.dim))
+            target_path = self.output_dir / ("embeddings.npy" + tmp_suffix)
+            target = np.lib.format.open_memmap(target_path, mode="w+", dtype=np.float32, shape=(self.count, self.dim))
+            step = 65536
+            for start in range(0, self.count, step):
+                target[start:start + step] = source[start:start + step]
+            target.flush()
+            del target, source
+            targets.append((target_path, self.output_dir / "embeddings.npy"))
+
+        for tmp_path, final_path in targets:
+            os.replace(tmp_path, final_path)
+        for path in self._files():
+            path.unlink(missing_ok=True)
+        self.partial_dir.rmdir()
+
+
+# ===== 파이프라인 =====
+
+class IngestionPipeline:
+    """
+    CSV 읽기 → 문서 변환 → 배치 임베딩 → 배치 저장 스트리밍 파이프라인
+
+    Args:
+        csv_path: 입력 CSV
+        format_row: CSV 행 딕셔너리 → 문서 목록 [(ID, 텍스트, 메타데이터), ...] (청크 분할 포함 가능)
+        embed_fn: 텍스트 목록 → 벡터 목록 (None이면 임베딩 없이 저장)
+        sink: ChromaSink 또는 SimpleStoreSink
+        checkpoint_path: 체크포인트 파일 (None이면 재개 기능 없음)
+        batch_size / queue_size / progress_interval: 없으면 INGEST_* 설정값
+    """
+
+    def __init__(
+        self,
+        csv_path: Path,
+        format_row: Callable[[Dict[str, str]], List[Document]],
+        embed_fn: Optional[Callable[[List[str]], List[List[float]]]],
+        sink,
+        checkpoint_path: Optional[Path] = None,
+        batch_size: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        progress_interval: Optional[float] = None
+    ):
+        self.csv_path = Path(csv_path)
+        self.format_row = format_row
+        self.embed_fn = embed_fn
+        self.sink = sink
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.batch_size = max(1, batch_size or get_env_int("INGEST_BATCH_SIZE", 256))
+        self.queue_size = max(1, queue_size or get_env_int("INGEST_QUEUE_SIZE", 4))
+        self.progress_interval = progress_interval or get_env_float("INGEST_PROGRESS_INTERVAL", 5.0)
+
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+        # 단계별 누적 작업 시간 (병목 확인용)
+        self.stage_seconds = {"read": 0.0, "embed": 0.0, "write": 0.0}
+
+    # ----- 체크포인트 -----
+
+    def _csv_identity(self) -> Dict[str, Any]:
+        stat = self.csv_path.stat()
+        return {"csv_path": str(self.csv_path.resolve()), "csv_size": stat.st_size, "csv_mtime": stat.st_mtime}
+
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """같은 CSV(경로/크기/수정 시간)와 같은 sink의 체크포인트만 반환"""
+        if self.checkpoint_path is None or not self.checkpoint_path.exists():
+            return None
+        try:
+            checkpoint = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"[적재] 체크포인트를 읽을 수 없어 처음부터 시작합니다: {e}")
+            return None
+        identity = self._csv_identity()
+        if any(checkpoint.get(k) != v for k, v in identity.items()) or checkpoint.get("sink") != self.sink.name:
+            logger.warning("[적재] CSV 파일이 바뀌어 체크포인트를 무시하고 처음부터 시작합니다")
+            return None
+        return checkpoint
+
+    def _save_checkpoint(self, header: List[str], rows: int, offset: int, documents: int):
+        if self.checkpoint_path is None:
+            return
+        checkpoint = {
+            **self._csv_identity(),
+            "sink": self.sink.name,
+            "header": header,
+            "rows": rows,
+            "offset": offset,
+            "documents": documents,
+            "sink_state": self.sink.state(),
+            "updated_at": time.time()
+        }
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(checkpoint, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def clear_checkpoint(self):
+        if self.checkpoint_path is not None:
+            self.checkpoint_path.unlink(missing_ok=True)
+
+    # ----- 단계 -----
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        """큐가 가득 차면 기다림 (중단 신호가 오면 False)"""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, error: BaseException):
+        self._errors.append(error)
+        self._stop.set()
+
+    def _read_stage(self, out: queue.Queue, header: List[str], offset: int, rows: int):
+        """CSV 읽기 + 문서 변환 → 배치"""
+        try:
+            batch = Batch(rows=rows, offset=offset)
+            batch_start_rows = rows
+            start = time.perf_counter()
+            for position, row in iter_csv_rows(self.csv_path, offset=offset, header=header):
+                for doc_id, text, metadata in self.format_row(row):
+                    batch.ids.append(doc_id)
+                    batch.texts.append(text)
+                    batch.metadatas.append(metadata)
+                batch.rows += 1
+                batch.offset = position
+                if len(batch) >= self.batch_size:
+                    self.stage_seconds["read"] += time.perf_counter() - start
+                    if not self._put(out, batch):
+                        return
+                    start = time.perf_counter()
+                    batch = Batch(rows=batch.rows, offset=batch.offset)
+                    batch_start_rows = batch.rows
+            self.stage_seconds["read"] += time.perf_counter() - start
+            # 남은 문서 (문서가 없는 행만 남았어도 체크포인트 위치를 옮기기 위해 보냄)
+            if batch.rows > batch_start_rows:
+                if not self._put(out, batch):
+                    return
+            self._put(out, _DONE)
+        except BaseException as e:
+            self._fail(e)
+
+    def _embed_stage(self, source: queue.Queue, out: queue.Queue):
+        """배치 임베딩"""
+        try:
+            while True:
+                batch = self._get(source)
+                if batch is _DONE:
+                    self._put(out, _DONE)
+                    return
+                if self.embed_fn is not None and len(batch) > 0:
+                    start = time.perf_counter()
+                    batch.embeddings = self.embed_fn(batch.texts)
+                    self.stage_seconds["embed"] += time.perf_counter() - start
+                if not self._put(out, batch):
+                    return
+        except BaseException as e:
+            self._fail(e)
+
+    # ----- 실행 -----
+
+    def run(self, resume: bool = True) -> Dict[str, Any]:
+        """
+        파이프라인 실행 (완료되면 체크포인트 삭제)
+
+        Args:
+            resume: True면 유효한 체크포인트 위치부터 이어서 실행
+
+        Returns:
+            처리 통계 (행 수, 문서 수, 소요 시간, 처리량, 단계별 시간)
+        """
+        header, offset, rows, documents = self._begin(resume)
+        start_rows, start_documents = rows, documents
+
+        to_embed: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        to_write: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        threads = [
+            threading.Thread(target=self._read_stage, args=(to_embed, header, offset, rows),
+                             name="ingest-read", daemon=True),
+            threading.Thread(target=self._embed_stage, args=(to_embed, to_write),
+                             name="ingest-embed", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        started = time.time()
+        last_report = started
+        try:
+            while True:
+                batch = self._get(to_write)
+                if batch is _DONE:
+                    break
+                documents = self._write_batch(batch, header, documents)
+                rows = batch.rows
+
+                now = time.time()
+                if now - last_report >= self.progress_interval:
+                    last_report = now
+                    self._report(rows - start_rows, documents - start_documents, now - started,
+                                 to_embed.qsize(), to_write.qsize())
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join(timeout=5.0)
+
+        return self._finish(rows, documents, start_rows, start_documents, started)
+
+    def _begin(self, resume: bool) -> Tuple[List[str], int, int, int]:
+        """체크포인트가 있으면 그 위치, 없으면 처음부터 (헤더, 파일 위치, 행 수, 문서 수)"""
+        checkpoint = self.load_checkpoint() if resume else None
+        if checkpoint:
+            self.sink.restore(checkpoint.get("sink_state") or {})
+            logger.info(f"[적재] 체크포인트에서 재개: {checkpoint['rows']}행, {checkpoint['documents']}개 문서 이후부터")
+            return checkpoint["header"], checkpoint["offset"], checkpoint["rows"], checkpoint["documents"]
+        self.sink.restore({})
+        return read_csv_header(self.csv_path), 0, 0, 0
+
+    def _write_batch(self, batch: Batch, header: List[str], documents: int) -> int:
+        """배치 저장 후 체크포인트 기록 (저장된 누적 문서 수 반환)"""
+        write_start = time.perf_counter()
+        if len(batch) > 0:
+            self.sink.write(batch)
+        self.stage_seconds["write"] += time.perf_counter() - write_start
+        documents += len(batch)
+        self._save_checkpoint(header, batch.rows, batch.offset, documents)
+        return documents
+
+    def _finish(self, rows: int, documents: int, start_rows: int, start_documents: int, started: float) -> Dict[str, Any]:
+        """오류가 있으면 다시 발생, 없으면 sink 마무리 + 체크포인트 삭제 후 통계 반환"""
+        if self._errors:
+            logger.error(f"[적재] 중단됨: {rows}행까지 저장 (다시 실행하면 이어서 진행)")
+            raise self._errors[0]
+
+        self.sink.finalize()
+        self.clear_checkpoint()
+        elapsed = time.time() - started
+        stats = {
+            "rows": rows,
+            "documents": documents,
+            "resumed_from_rows": start_rows,
+            "elapsed_seconds": round(elapsed, 2),
+            "rows_per_second": round((rows - start_rows) / elapsed, 1) if elapsed > 0 else 0.0,
+            "documents_per_second": round((documents - start_documents) / elapsed, 1) if elapsed > 0 else 0.0,
+            "stage_seconds": {k: round(v, 2) for k, v in self.stage_seconds.items()}
+        }
+        logger.info(f"[적재] 완료: {stats}")
+        return stats
+
+    def _report(self, rows: int, documents: int, elapsed: float, embed_backlog: int, write_backlog: int):
+        """진행률/처리량 보고 (큐 적체로 병목 단계 확인)"""
+        message = (
+            f"[적재] {rows}행, {documents}개 문서 ({rows / elapsed:.1f}행/초, {documents / elapsed:.1f}문서/초) "
+            f"| 임베딩 대기 {embed_backlog}/{self.queue_size}, 저장 대기 {write_backlog}/{self.queue_size} "
+            f"| 누적 시간 읽기 {self.stage_seconds['read']:.1f}초, 임베딩 {self.stage_seconds['embed']:.1f}초, "
+            f"저장 {self.stage_seconds['write']:.1f}초"
+        )
+        logger.info(message)
+
+
+# ===== 멀티코어 병렬 적재 =====
+
+def create_worker_embedder(batch_size: int) -> Callable[[List[str]], List[List[float]]]:
+    """
+    워커 프로세스용 기본 임베딩 함수 (설정된 백엔드 + 디스크 임베딩 캐시)
+
+    디스크 캐시는 파일 잠금으로 추가하므로 여러 워커가 같은 캐시를 함께 써도 됨
+    """
+    from app.embeddings import create_embeddings, embedding_model_id
+    from app.embedding_store import wrap_embeddings
+
+    embeddings = create_embeddings(batch_size=batch_size)
+    return wrap_embeddings(embeddings, embedding_model_id(embeddings)).embed_documents
+
+
+def _pin_threads(threads: int):
+    """워커 프로세스의 연산 스레드 수 고정 (워커끼리 코어를 나눠 쓰도록)"""
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "EMBEDDING_ONNX_THREADS"):
+        os.environ[name] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def _embedding_worker(worker_index: int, embedder_factory, batch_size: int, threads: int, tasks, results):
+    """
+    임베딩 워커 프로세스 본체
+
+    tasks에서 (라운드 번호, 문서 번호 목록, 텍스트 목록, 행 수)를 받아 임베딩 후
+    results에 ("result", 워커 번호, (라운드 번호, 문서 번호 목록, 벡터 목록, 행 수, 소요 시간)) 전달
+    """
+    import traceback
+
+    try:
+        _pin_threads(threads)
+        embed_fn = embedder_factory(batch_size)
+        results.put(("ready", worker_index, None))
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            round_id, doc_indices, texts, row_count = task
+            start = time.perf_counter()
+            vectors = embed_fn(texts)
+            results.put(("result", worker_index,
+                         (round_id, doc_indices, vectors, row_count, time.perf_counter() - start)))
+    except BaseException:
+        results.put(("error", worker_index, traceback.format_exc()))
+
+
+def shard_of(key: str, workers: int) -> int:
+    """샤드 번호 (실행/프로세스마다 같은 값이 나오도록 crc32 사용)"""
+    return zlib.crc32(key.encode("utf-8")) % workers
+
+
+@dataclass
+class _Round:
+    """읽기 스레드가 한 번에 워커들에게 나눠준 문서 묶음 (체크포인트 단위)"""
+    round_id: int
+    doc_start: int
+    doc_end: int
+    rows: int
+    offset: int
+
+
+class ParallelIngestionPipeline(IngestionPipeline):
+    """
+    restaurant_id 기준으로 샤딩하여 여러 프로세스가 임베딩하는 병렬 적재 파이프라인
+
+    작동 원리:
+    1. 읽기 스레드: CSV 행을 문서로 변환하고 restaurant_id의 crc32로 워커를 정함
+       (같은 음식점의 메뉴는 항상 같은 워커가 처리)
+    2. 약 batch_size × 워커 수 문서마다 라운드를 끊고, 샤드별 묶음을 각 워커 큐에 전달
+    3. 워커 프로세스: 각자 임베딩 모델을 로드(연산 스레드 수 고정)하여 배치 임베딩
+    4. 저장(호출한 스레드, 단일 writer): 결과를 문서 번호로 재정렬하는 버퍼에 모았다가
+       라운드가 모두 채워지면 CSV 순서대로 batch_size씩 sink에 저장하고 체크포인트 기록
+       → 저장 순서, 문서 ID, 메타데이터, 체크포인트가 직렬 파이프라인과 같음
+    5. 진행 중인 라운드 수를 queue_size로 제한하여 재정렬 버퍼 메모리도 고정
+
+    Args (IngestionPipeline 인자 외):
+        workers: 워커 프로세스 수
+        threads_per_worker: 워커별 torch/ONNX 스레드 수 (없으면 CPU 수 ÷ 워커 수)
+        embedder_factory: batch_size → 임베딩 함수 (워커 안에서 호출, 모듈 최상위 함수여야 함)
+        shard_key: 샤딩 기준 메타데이터 키
+    """
+
+    def __init__(
+        self,
+        *args,
+        workers: int = 2,
+        threads_per_worker: Optional[int] = None,
+        embedder_factory: Callable[[int], Callable[[List[str]], List[List[float]]]] = create_worker_embedder,
+        shard_key: str = "restaurant_id",
+        **kwargs
+    ):
+        kwargs.setdefault("embed_fn", None)
+        super().__init__(*args, **kwargs)
+        self.workers = max(1, workers)
+        self.threads_per_worker = max(1, threads_per_worker or (os.cpu_count() or 1) // self.workers)
+        self.embedder_factory = embedder_factory
+        self.shard_key = shard_key
+
+        self._lock = threading.Lock()
+        self._documents: Dict[int, Document] = {}
+        self._vectors: Dict[int, List[float]] = {}
+        self._rounds: "queue.Queue[_Round]" = queue.Queue()
+        self._round_slots = threading.Semaphore(self.queue_size)
+        # 워커별 처리 통계
+        self.worker_stats = [{"rows": 0, "documents": 0, "seconds": 0.0} for _ in range(self.workers)]
+
+    def _read_rounds(self, task_queues, header: List[str], offset: int, rows: int):
+        """CSV 읽기 + 문서 변환 → 샤드별 묶음 → 워커 큐 (라운드 단위)"""
+        try:
+            round_size = self.batch_size * self.workers
+            doc_index = 0
+            round_id = 0
+            shards: List[List[Tuple[int, str]]] = [[] for _ in range(self.workers)]
+            shard_rows = [0] * self.workers
+            round_start = 0
+            flushed_rows = rows
+            position = offset
+
+            def flush():
+                nonlocal round_id, round_start, flushed_rows, shards, shard_rows
+                # 진행 중인 라운드가 queue_size개면 저장이 따라올 때까지 대기 (back-pressure)
+                while not self._round_slots.acquire(timeout=0.1):
+                    if self._stop.is_set():
+                        return False
+                self._rounds.put(_Round(round_id, round_start, doc_index, rows, position))
+                for worker_index, items in enumerate(shards):
+                    for start in range(0, len(items), self.batch_size):
+                        chunk = items[start:start + self.batch_size]
+                        task_queues[worker_index].put((
+                            round_id,
+                            [i for i, _ in chunk],
+                            [text for _, text in chunk],
+                            shard_rows[worker_index] if start == 0 else 0
+                        ))
+                round_id += 1
+                round_start = doc_index
+                flushed_rows = rows
+                shards = [[] for _ in range(self.workers)]
+                shard_rows = [0] * self.workers
+                return True
+
+            start = time.perf_counter()
+            for position, row in iter_csv_rows(self.csv_path, offset=offset, header=header):
+                if self._stop.is_set():
+                    return
+                worker_index = shard_of(str(row.get(self.shard_key, "")), self.workers)
+                for document in self.format_row(row):
+                    with self._lock:
+                        self._documents[doc_index] = document
+                    shards[worker_index].append((doc_index, document[1]))
+                    doc_index += 1
+                shard_rows[worker_index] += 1
+                rows += 1
+                if doc_index - round_start >= round_size:
+                    self.stage_seconds["read"] += time.perf_counter() - start
+                    if not flush():
+                        return
+                    start = time.perf_counter()
+            self.stage_seconds["read"] += time.perf_counter() - start
+            if doc_index > round_start or rows > flushed_rows:
+                if not flush():
+                    return
+            self._rounds.put(_DONE)
+        except BaseException as e:
+            self._fail(e)
+
+    def _round_complete(self, current: _Round) -> bool:
+        with self._lock:
+            return all(i in self._vectors for i in range(current.doc_start, current.doc_end))
+
+    def _write_round(self, current: _Round, header: List[str], documents: int) -> int:
+        """라운드 하나를 CSV 순서대로 batch_size씩 저장 (마지막 배치에서 체크포인트 위치 이동)"""
+        for start in range(current.doc_start, max(current.doc_end, current.doc_start + 1), self.batch_size):
+            end = min(start + self.batch_size, current.doc_end)
+            batch = Batch(rows=current.rows, offset=current.offset)
+            with self._lock:
+                for i in range(start, end):
+                    doc_id, text, metadata = self._documents.pop(i)
+                    batch.ids.append(doc_id)
+                    batch.texts.append(text)
+                    batch.metadatas.append(metadata)
+                batch.embeddings = [self._vectors.pop(i) for i in range(start, end)]
+            if end < current.doc_end:
+                # 라운드 중간 배치: 체크포인트는 라운드가 끝날 때만 옮김
+                write_start = time.perf_counter()
+                self.sink.write(batch)
+                self.stage_seconds["write"] += time.perf_counter() - write_start
+                documents += len(batch)
+            else:
+                documents = self._write_batch(batch, header, documents)
+        return documents
+
+    def run(self, resume: bool = True) -> Dict[str, Any]:
+        """병렬 파이프라인 실행 (IngestionPipeline.run과 같은 통계 + 워커별 처리량)"""
+        import multiprocessing
+
+        header, offset, rows, documents = self._begin(resume)
+        start_rows, start_documents = rows, documents
+
+        # fork는 부모가 이미 띄운 torch 스레드 풀을 복제하여 멈출 수 있으므로 spawn 사용
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        task_queues = [context.Queue() for _ in range(self.workers)]
+        processes = [
+            context.Process(
+                target=_embedding_worker,
+                args=(i, self.embedder_factory, self.batch_size, self.threads_per_worker, task_queues[i], results),
+                name=f"ingest-embed-{i}",
+                daemon=True
+            )
+            for i in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+        logger.info(f"[적재] 임베딩 워커 {self.workers}개 시작 (워커별 스레드 {self.threads_per_worker}개)")
+
+        reader = threading.Thread(target=self._read_rounds, args=(task_queues, header, offset, rows),
+                                  name="ingest-read", daemon=True)
+        reader.start()
+
+        started = time.time()
+        last_report = started
+        current: Optional[_Round] = None
+        try:
+            while not self._stop.is_set():
+                # 다음 라운드 정보 (읽기가 끝났으면 _DONE)
+                if current is None:
+                    try:
+                        current = self._rounds.get(timeout=0.1)
+                    except queue.Empty:
+                        current = None
+                    if current is _DONE:
+                        break
+
+                # 완료된 라운드는 순서대로 저장
+                if current is not None and self._round_complete(current):
+                    documents = self._write_round(current, header, documents)
+                    rows = current.rows
+                    current = None
+                    self._round_slots.release()
+                    continue
+
+                try:
+                    kind, worker_index, payload = results.get(timeout=0.1)
+                except queue.Empty:
+                    if not all(p.is_alive() for p in processes):
+                        raise RuntimeError("임베딩 워커 프로세스가 비정상 종료되었습니다")
+                    continue
+                if kind == "error":
+                    raise RuntimeError(f"임베딩 워커 {worker_index} 오류:\n{payload}")
+                if kind == "result":
+                    _, doc_indices, vectors, row_count, seconds = payload
+                    with self._lock:
+                        self._vectors.update(zip(doc_indices, vectors))
+                    stats = self.worker_stats[worker_index]
+                    stats["rows"] += row_count
+                    stats["documents"] += len(doc_indices)
+                    stats["seconds"] += seconds
+                    self.stage_seconds["embed"] += seconds
+
+                now = time.time()
+                if now - last_report >= self.progress_interval:
+                    last_report = now
+                    self._report(rows - start_rows, documents - start_documents, now - started,
+                                 self._rounds.qsize() + (current is not None), len(self._vectors))
+                    self._report_workers()
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._stop.set()
+            reader.join(timeout=5.0)
+            for task_queue in task_queues:
+                task_queue.put(None)
+            for process in processes:
+                process.join(timeout=5.0)
+                if process.is_alive():
+                    process.terminate()
+
+        stats = self._finish(rows, documents, start_rows, start_documents, started)
+        stats["workers"] = self._worker_summary()
+        self._report_workers()
+        return stats
+
+    def _report(self, rows: int, documents: int, elapsed: float, rounds_in_flight: int, buffered_vectors: int):
+        """진행률/처리량 보고 (진행 중인 라운드 수, 재정렬 버퍼에 쌓인 벡터 수)"""
+        message = (
+            f"[적재] {rows}행, {documents}개 문서 ({rows / elapsed:.1f}행/초, {documents / elapsed:.1f}문서/초) "
+            f"| 진행 중인 라운드 {rounds_in_flight}/{self.queue_size}, 저장 대기 벡터 {buffered_vectors}개 "
+            f"| 누적 시간 읽기 {self.stage_seconds['read']:.1f}초, 임베딩(워커 합계) {self.stage_seconds['embed']:.1f}초, "
+            f"저장 {self.stage_seconds['write']:.1f}초"
+        )
+        logger.info(message)
+
+    def _worker_summary(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "worker": i,
+                "rows": s["rows"],
+                "documents": s["documents"],
+                "embed_seconds": round(s["seconds"], 2),
+                "rows_per_second": round(s["rows"] / s["seconds"], 1) if s["seconds"] > 0 else 0.0
+            }
+            for i, s in enumerate(self.worker_stats)
+        ]
+
+    def _report_workers(self):
+        """워커별 처리량 (임베딩에 쓴 시간 기준 행/초)"""
+        summary = ", ".join(
+            f"#{w['worker']} {w['rows']}행 {w['rows_per_second']}행/초" for w in self._worker_summary()
+        )
+        logger.info(f"[적재] 워커별 처리량: {summary}")
+
+
+def create_ingestion_pipeline(
+    *,
+    embed_fn: Optional[Callable[[List[str]], List[List[float]]]],
+    workers: Optional[int] = None,
+    threads_per_worker: Optional[int] = None,
+    embedder_factory: Callable[[int], Callable[[List[str]], List[List[float]]]] = create_worker_embedder,
+    **kwargs
+) -> IngestionPipeline:
+    """
+    워커 수에 맞는 파이프라인 생성
+
+    workers가 1 이하면 embed_fn을 쓰는 직렬 파이프라인,
+    2 이상이면 embedder_factory로 워커마다 모델을 로드하는 병렬 파이프라인
+
+    Args:
+        workers: 임베딩 워커 프로세스 수 (없으면 INGEST_WORKERS 설정값, 기본 1)
+        threads_per_worker: 워커별 연산 스레드 수 (없으면 INGEST_THREADS_PER_WORKER, 0이면 자동)
+        나머지: IngestionPipeline 인자
+    """
+    workers = workers or get_env_int("INGEST_WORKERS", 1)
+    if workers <= 1:
+        return IngestionPipeline(embed_fn=embed_fn, **kwargs)
+    return ParallelIngestionPipeline(
+        workers=workers,
+        threads_per_worker=threads_per_worker or get_env_int("INGEST_THREADS_PER_WORKER", 0) or None,
+        embedder_factory=embedder_factory,
+        **kwargs
+    )
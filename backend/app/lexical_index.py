@@ -0,0 +1,306 @@
+"""
+메뉴 어휘 검색 인덱스 (한글 바이그램 역색인 + BM25)
+
+이 파일의 역할:
+- 메뉴명, 음식점명, 재료 원산지를 한글 2글자 단위(바이그램)로 나누어 역색인 구축
+- BM25 점수로 질문과 어휘적으로 일치하는 메뉴 검색
+- 벡터 검색 결과와 RRF(Reciprocal Rank Fusion)로 순위 결합
+- 질문에 메뉴명/음식점명이 그대로 들어 있으면(강한 일치) 임베딩 없이 바로 결과 반환
+
+왜 필요한가:
+- "피순대", "콩나물국밥"처럼 요리 이름만 있는 질문은 문장 임베딩으로는 잘 구분되지 않음
+- 이런 질문도 매번 임베딩 모델 추론 비용을 냄
+- 역색인 조회는 밀리초 단위이므로 정확한 요리명 질문의 검색 지연이 크게 줄어듦
+
+작동 원리:
+1. 각 단어를 바이그램으로 분해 (예: "콩나물국밥" → 콩나, 나물, 물국, 국밥), 한 글자 단어는 그대로
+2. 필드 가중치(메뉴명 3, 음식점명 2, 재료 1)만큼 토큰 빈도를 반영하여 BM25 계산
+3. SearchFilter 조건은 점수 계산 전에 후보에서 제외
+4. 강한 일치: 질문 안의 메뉴명이 단어 경계에 맞게 들어 있는 경우
+   - 이름이 단어 처음에서 시작하고, 단어 끝 또는 조사(은/는/이/가/을/를 ...) 바로 앞에서 끝나야 함
+     ("중이라면"의 "라면", "피순대가"의 "순대"처럼 단어 중간에 걸친 일치는 제외)
+   - 음식점명만 일치한 경우("한옥마을 근처 맛집")는 지명과 겹치는 일이 많아 강한 일치로 보지 않음
+     (어휘 결과 앞쪽 정렬에만 반영, 검색은 벡터 결과와 RRF로 결합)
+   - 이름 이외의 단어가 가격/추천 요청 같은 군말뿐이어야 함
+     ("비빔밥 가격 얼마야"는 강한 일치, "비빔밥이랑 비슷한 거 추천"은 의도가 있으므로 RRF로 결합)
+
+설정 (환경 변수):
+- LEXICAL_INDEX: 어휘 인덱스 사용 여부 (기본 1, 0이면 벡터 검색만 사용)
+- LEXICAL_FAST_PATH: 강한 일치 시 임베딩 생략 여부 (기본 1)
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+from app.preferences import SearchFilter
+from app.utils import logger
+
+
+# 한글/영문/숫자 이외 문자는 구분자로 취급
+_NON_WORD_PATTERN = re.compile(r"[^0-9a-z가-힣]+")
+_INGREDIENTS_PATTERN = re.compile(r"재료 원산지:\s*(.+)$", re.DOTALL)
+
+# 필드별 가중치 (토큰 빈도에 곱함)
+FIELD_WEIGHTS = {
+    "menu_name": 3,
+    "restaurant_name": 2,
+    "ingredients_origin": 1,
+}
+
+# 강한 일치로 인정할 최소 이름 길이 (글자)
+MIN_STRONG_NAME_LENGTH = 2
+
+# 이름 바로 뒤에 붙어도 단어 경계로 보는 조사 ("비빔밥은", "콩나물국밥이랑")
+PARTICLES = frozenset({
+    "은", "는", "이", "가", "을", "를", "도", "만", "의", "에", "에서", "으로", "로",
+    "와", "과", "랑", "이랑", "하고", "이나", "나", "처럼", "보다", "부터", "까지", "요", "이요",
+})
+
+
+# 강한 일치에서 이름 외에 있어도 되는 단어 (단어 앞부분 일치: "추천해줘", "얼마야", "전주에서")
+_FILLER_WORD_PATTERN = re.compile(
+    r"\d[\d,]*(?:만|천)?(?:원|kcal|칼로리)?|만원|천원|가격|얼마|칼로리|열량|kcal|추천|알려|메뉴|맛집|식당"
+    r"|전주|어디|뭐|좀|먹고|먹을|싶어|있어|있나|줘|주세요|해줘|이하|이상|미만|정도|저렴|싼|싸게"
+)
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    """결과 식별 키 (벡터 검색 결과와 같은 메뉴인지 판단)"""
+    metadata = result.get("metadata", {})
+    return f"{metadata.get('restaurant_id', '')}:{metadata.get('menu_id', '')}"
+
+
+def tokenize(text: str) -> List[str]:
+    """한글 바이그램 토큰화 (한 글자 단어는 그대로, 원산지 표기 "(국내산)" 등은 구분자로 제거)"""
+    tokens: List[str] = []
+    for word in _NON_WORD_PATTERN.split(text.lower()):
+        if len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def compact_text(text: str) -> str:
+    """강한 일치 비교용 (소문자, 구분자 제거)"""
+    return _NON_WORD_PATTERN.sub("", text.lower())
+
+
+def reciprocal_rank_fusion(
+    result_lists: Iterable[List[Dict[str, Any]]],
+    k: int,
+    rrf_k: int = 60
+) -> List[Dict[str, Any]]:
+    """
+    여러 검색 결과 목록을 RRF로 결합 (점수 척도가 다른 BM25와 벡터 거리를 순위만으로 합침)
+
+    score(d) = Σ 1 / (rrf_k + rank)
+    같은 메뉴는 먼저 나온 목록(벡터 검색)의 결과 딕셔너리를 사용
+    """
+    fused: Dict[str, float] = defaultdict(float)
+    first_seen: Dict[str, Dict[str, Any]] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, 1):
+            key = result_key(result)
+            fused[key] += 1.0 / (rrf_k + rank)
+            if key not in first_seen:
+                first_seen[key] = dict(result)
+            elif "lexical_score" in result:
+                first_seen[key]["lexical_score"] = result["lexical_score"]
+
+    ranked = sorted(fused, key=fused.get, reverse=True)[:k]
+    return [first_seen[key] for key in ranked]
+
+
+class LexicalIndex:
+    """바이그램 역색인 + BM25 검색 (읽기 전용, 스레드 안전)"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        # 토큰 → [(문서 번호, 가중 빈도), ...]
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.doc_lengths: List[int] = []
+        self.avg_doc_length = 0.0
+        # 공백 제거한 메뉴명/음식점명 → [(문서 번호, 일치 수준), ...] (강한 일치 판단용)
+        self.names: Dict[str, List[Tuple[int, int]]] = {}
+        self.max_name_length = 0
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @staticmethod
+    def _fields(document: str, metadata: Dict[str, Any]) -> Dict[str, str]:
+        """색인할 필드 추출 (재료 원산지는 메타데이터에 없으면 문서 텍스트에서 추출)"""
+        ingredients = metadata.get("ingredients_origin")
+        if not ingredients:
+            match = _INGREDIENTS_PATTERN.search(document or "")
+            ingredients = match.group(1) if match else ""
+        return {
+            "menu_name": str(metadata.get("menu_name", "")),
+            "restaurant_name": str(metadata.get("restaurant_name", "")),
+            "ingredients_origin": str(ingredients),
+        }
+
+    def build(self, documents: List[str], metadatas: List[Dict[str, Any]]) -> "LexicalIndex":
+        """문서/메타데이터 목록으로 색인 구축 (같은 메뉴의 청크는 첫 번째만 사용)"""
+        start = time.time()
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        names: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        seen = set()
+
+        for document, metadata in zip(documents, metadatas):
+            metadata = metadata or {}
+            key = result_key({"metadata": metadata})
+            if key in seen:
+                continue
+            seen.add(key)
+
+            doc_id = len(self.documents)
+            self.documents.append(document)
+            self.metadatas.append(metadata)
+
+            fields = self._fields(document, metadata)
+            counts: Counter = Counter()
+            for field_name, text in fields.items():
+                weight = FIELD_WEIGHTS[field_name]
+                for token in tokenize(text):
+                    counts[token] += weight
+            for token, tf in counts.items():
+                postings[token].append((doc_id, tf))
+            self.doc_lengths.append(sum(counts.values()))
+
+            # 메뉴명 일치(2)를 음식점명 일치(1)보다 우선
+            for field_name, level in (("menu_name", 2), ("restaurant_name", 1)):
+                name = compact_text(fields[field_name])
+                if len(name) >= MIN_STRONG_NAME_LENGTH:
+                    names[name].append((doc_id, level))
+
+        self.postings = dict(postings)
+        self.names = dict(names)
+        self.max_name_length = max((len(name) for name in self.names), default=0)
+        self.avg_doc_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 0.0
+        logger.info(
+            f"[어휘 인덱스] {len(self.documents)}개 메뉴, {len(self.postings)}개 토큰 색인 "
+            f"({time.time() - start:.2f}초)"
+        )
+        return self
+
+    def _allowed(self, doc_id: int, search_filter: Optional[SearchFilter]) -> bool:
+        return search_filter is None or search_filter.matches(self.metadatas[doc_id], self.documents[doc_id])
+
+    def search(
+        self,
+        query: str,
+        k: int = 8,
+        search_filter: Optional[SearchFilter] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        BM25 검색
+
+        Returns:
+            (결과 목록, 강한 일치 여부)
+            - 결과 형식은 VectorStore.similarity_search와 같음 (score 대신 lexical_score)
+            - 강한 일치 문서는 BM25 점수와 관계없이 앞쪽에 배치 (메뉴명 일치 > 음식점명 일치)
+        """
+        if not self.documents:
+            return [], False
+
+        scores: Dict[int, float] = defaultdict(float)
+        n = len(self.documents)
+        for token in set(tokenize(query)):
+            posting = self.postings.get(token)
+            if not posting:
+                continue
+            idf = math.log(1.0 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_id, tf in posting:
+                norm = self.k1 * (1.0 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_doc_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+
+        strong, only_filler = self._name_matches(query)
+
+        candidates = [doc_id for doc_id in scores if self._allowed(doc_id, search_filter)]
+        candidates.sort(key=lambda doc_id: (strong.get(doc_id, 0), scores[doc_id]), reverse=True)
+
+        results = [
+            {
+                "content": self.documents[doc_id],
+                "metadata": self.metadatas[doc_id],
+                "score": None,
+                "lexical_score": round(scores[doc_id], 4)
+            }
+            for doc_id in candidates[:k]
+        ]
+        # 메뉴명 일치(2)가 있고 나머지가 군말뿐일 때만 강한 일치 (애매하면 벡터 검색과 RRF 결합으로 넘김)
+        return results, only_filler and any(strong.get(doc_id) == 2 for doc_id in candidates)
+
+    def _name_matches(self, query: str) -> Tuple[Dict[int, int], bool]:
+        """
+        단어 경계에 맞는 메뉴명/음식점명 일치 → ({문서 번호: 일치 수준}, 나머지 단어가 군말뿐인지)
+
+        질문 단어의 시작 위치에서만 이름 사전을 조회 (문서 수와 무관하게 질문 길이에만 비례)
+        여러 단어에 걸친 이름("전주 비빔밥")도 공백을 뺀 위치로 비교
+        """
+        words = [word for word in _NON_WORD_PATTERN.split(query.lower()) if word]
+        compact_query = "".join(words)
+        word_starts = []
+        word_end_of = [0] * len(compact_query)  # 위치 → 그 위치가 속한 단어의 끝
+        word_index_of = [0] * len(compact_query)  # 위치 → 그 위치가 속한 단어 번호
+        position = 0
+        for index, word in enumerate(words):
+            word_starts.append(position)
+            for offset in range(len(word)):
+                word_end_of[position + offset] = position + len(word)
+                word_index_of[position + offset] = index
+            position += len(word)
+
+        strong: Dict[int, int] = {}
+        covered = set()
+        for i in word_starts:
+            for j in range(i + MIN_STRONG_NAME_LENGTH, min(len(compact_query), i + self.max_name_length) + 1):
+                matches = self.names.get(compact_query[i:j])
+                if not matches:
+                    continue
+                rest = compact_query[j:word_end_of[j - 1]]
+                if rest and rest not in PARTICLES:
+                    continue
+                for doc_id, level in matches:
+                    strong[doc_id] = max(strong.get(doc_id, 0), level)
+                covered.update(range(word_index_of[i], word_index_of[j - 1] + 1))
+
+        only_filler = all(
+            index in covered or _FILLER_WORD_PATTERN.match(word)
+            for index, word in enumerate(words)
+        )
+        return strong, only_filler
+
+
+class LazyLexicalIndex:
+    """
+    첫 검색 시 한 번만 구축하는 어휘 인덱스 래퍼
+
+    - loader: (documents, metadatas)를 반환하는 함수 (예: ChromaDB 컬렉션 전체 조회)
+    - 문서가 추가/삭제되면 invalidate()로 다음 검색 때 다시 구축
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._index: Optional[LexicalIndex] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> LexicalIndex:
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    documents, metadatas = self._loader()
+                    self._index = LexicalIndex().build(documents, metadatas)
+        return self._index
+
+    def invalidate(self):
+        with self._lock:
+            self._index = None
@@ -0,0 +1,160 @@
+"""
+LLM 공급자 선택 및 생성
+
+이 파일의 역할:
+- 설정(LLM_PROVIDER)에 따라 RAGChain이 사용할 채팅 모델 생성
+- 기본 OpenAI(ChatOpenAI, gpt-4o-mini)와
+  네트워크/API 키 없이 동작하는 로컬 대체 모델(FakeChatModel) 제공
+
+왜 필요한가:
+- RAGChain이 ChatOpenAI를 직접 만들면 API 키와 네트워크 없이는 서버를 띄워 측정할 수 없음
+- 부하 테스트/벤치마크/CI에서 OpenAI 지연 시간과 우리 서버 오버헤드(검색, 프롬프트, SSE)를 분리해야 함
+- 대체 모델은 같은 프롬프트에 항상 같은 답을 내고, 첫 토큰 지연과 토큰 속도를 설정할 수 있어야
+  실행마다 비교 가능한 결과가 나옴
+
+주요 기능:
+- create_llm(): 설정에 맞는 채팅 모델 생성 (invoke/ainvoke/astream 제공)
+- FakeChatModel: 프롬프트의 메뉴 목록에서 결정적으로 답변을 만들고 설정된 속도로 토큰 스트리밍
+
+설정 (환경 변수):
+- LLM_PROVIDER: "openai"(기본) 또는 "fake"
+- LLM_MODEL: OpenAI 모델 이름 (기본 gpt-4o-mini)
+- LLM_TEMPERATURE: 기본 0.7
+- LLM_MAX_TOKENS: 최대 응답 토큰 수 (기본 500, fake 모델도 이 길이에서 자름)
+- FAKE_LLM_TTFT_MS: fake 모델 첫 토큰까지 지연 (ms, 기본 300)
+- FAKE_LLM_TOKENS_PER_SEC: fake 모델 토큰 생성 속도 (기본 50, 0이면 지연 없음)
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+from typing import List, Any, AsyncIterator, Iterator
+from langchain_core.messages import AIMessage, AIMessageChunk
+from app.utils import logger, get_env_optional, get_env_int, get_env_float
+
+
+# 기본 OpenAI 모델
+DEFAULT_OPENAI_MODEL = "gpt-4o-mini"
+
+# 시스템 프롬프트의 메뉴 목록 시작 표시 (RAGChain.prompt_template)
+_MENU_SECTION_MARKER = "메뉴 목록:"
+
+# 프롬프트 안의 메뉴 목록 한 줄: "1. 음식점명 - 메뉴명 (가격원, 칼로리kcal) [주소] (카테고리)"
+_MENU_LINE_PATTERN = re.compile(r"^\d+\.\s+(.+)$", re.MULTILINE)
+
+# 토큰 단위 (단어 + 뒤따르는 공백)
+_TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+
+
+def _message_text(message: Any) -> str:
+    content = getattr(message, "content", message)
+    return content if isinstance(content, str) else str(content)
+
+
+class FakeChatModel:
+    """
+    네트워크 없이 동작하는 결정적 채팅 모델 (ChatOpenAI 대체)
+
+    - 시스템 프롬프트의 메뉴 목록과 질문으로 만든 해시로 추천 메뉴 2~3개를 골라
+      실제 답변과 비슷한 길이/형식의 한국어 답변 생성 (같은 프롬프트 → 같은 답변)
+    - invoke/ainvoke: 첫 토큰 지연 + 토큰 수 ÷ 초당 토큰 수만큼 기다린 뒤 전체 답변 반환
+    - astream: 첫 토큰 지연 후 초당 토큰 수 간격으로 AIMessageChunk 전달
+    """
+
+    def __init__(self, ttft_ms: float = 300.0, tokens_per_second: float = 50.0, max_tokens: int = 500):
+        self.ttft = max(0.0, ttft_ms) / 1000.0
+        self.token_interval = 1.0 / tokens_per_second if tokens_per_second > 0 else 0.0
+        self.max_tokens = max(1, max_tokens)
+
+    def _answer(self, prompt: Any) -> str:
+        """프롬프트 → 결정적 답변"""
+        messages = prompt if isinstance(prompt, list) else [prompt]
+        texts = [_message_text(m) for m in messages]
+        question = texts[-1] if texts else ""
+        digest = hashlib.sha256("\n".join(texts).encode("utf-8")).digest()
+
+        # 시스템 프롬프트의 "메뉴 목록:" 뒤 부분만 사용 (앞쪽 번호 매긴 규칙 제외)
+        system = texts[0] if len(texts) > 1 else ""
+        menus = _MENU_LINE_PATTERN.findall(system.split(_MENU_SECTION_MARKER, 1)[-1])
+        if not menus:
+            return (f"'{question}'에 맞는 메뉴 정보를 찾지 못했어요. "
+                    "가격대나 음식 종류를 조금 더 알려주시면 다시 찾아볼게요.")
+
+        count = min(len(menus), 2 + digest[0] % 2)
+        start = digest[1] % len(menus)
+        picked = [menus[(start + i) % len(menus)] for i in range(count)]
+        lines = [f"'{question}'에 어울리는 메뉴를 추천해 드릴게요.", ""]
+        for i, menu in enumerate(picked, 1):
+            lines.append(f"{i}. {menu}")
+        lines.append("")
+        lines.append("가격과 칼로리를 비교해 보시고 마음에 드는 곳을 골라 보세요.")
+        return "\n".join(lines)
+
+    def _tokens(self, prompt: Any) -> List[str]:
+        return _TOKEN_PATTERN.findall(self._answer(prompt))[:self.max_tokens]
+
+    def invoke(self, prompt: Any, **kwargs) -> AIMessage:
+        tokens = self._tokens(prompt)
+        time.sleep(self.ttft + self.token_interval * max(0, len(tokens) - 1))
+        return AIMessage(content="".join(tokens))
+
+    async def ainvoke(self, prompt: Any, **kwargs) -> AIMessage:
+        tokens = self._tokens(prompt)
+        await asyncio.sleep(self.ttft + self.token_interval * max(0, len(tokens) - 1))
+        return AIMessage(content="".join(tokens))
+
+    def stream(self, prompt: Any, **kwargs) -> Iterator[AIMessageChunk]:
+        time.sleep(self.ttft)
+        for i, token in enumerate(self._tokens(prompt)):
+            if i > 0 and self.token_interval:
+                time.sleep(self.token_interval)
+            yield AIMessageChunk(content=token)
+
+    async def astream(self, prompt: Any, **kwargs) -> AsyncIterator[AIMessageChunk]:
+        await asyncio.sleep(self.ttft)
+        for i, token in enumerate(self._tokens(prompt)):
+            if i > 0 and self.token_interval:
+                await asyncio.sleep(self.token_interval)
+            yield AIMessageChunk(content=token)
+
+
+def create_openai_llm(temperature: float, max_tokens: int):
+    """OpenAI 채팅 모델 생성 (환경 변수 OPENAI_API_KEY 사용)"""
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=get_env_optional("LLM_MODEL", DEFAULT_OPENAI_MODEL),
+        temperature=temperature,
+        max_tokens=max_tokens  # 응답 길이 제한으로 속도 개선
+    )
+
+
+def create_fake_llm(max_tokens: int) -> FakeChatModel:
+    """로컬 대체 모델 생성 (벤치마크/부하 테스트/CI용)"""
+    return FakeChatModel(
+        ttft_ms=get_env_float("FAKE_LLM_TTFT_MS", 300.0),
+        tokens_per_second=get_env_float("FAKE_LLM_TOKENS_PER_SEC", 50.0),
+        max_tokens=max_tokens
+    )
+
+
+def create_llm(provider: str = None):
+    """
+    설정에 맞는 채팅 모델 생성
+
+    Args:
+        provider: "openai" 또는 "fake" (없으면 LLM_PROVIDER 설정값)
+    """
+    provider = (provider or get_env_optional("LLM_PROVIDER", "openai")).lower()
+    max_tokens = get_env_int("LLM_MAX_TOKENS", 500)
+
+    if provider == "fake":
+        llm = create_fake_llm(max_tokens)
+        logger.warning(f"로컬 대체 LLM 사용 (첫 토큰 {llm.ttft * 1000:.0f}ms, "
+                       f"토큰 간격 {llm.token_interval * 1000:.0f}ms) - 실제 답변이 아닙니다")
+        return llm
+    if provider != "openai":
+        logger.warning(f"알 수 없는 LLM_PROVIDER: {provider} (OpenAI 사용)")
+
+    return create_openai_llm(get_env_float("LLM_TEMPERATURE", 0.7), max_tokens)
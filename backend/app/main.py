@@ -4,15 +4,25 @@ FastAPI 애플리케이션: SSE/WebSocket 엔드포인트
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from sse_starlette.sse import EventSourceResponse
-from app.models import ChatRequest, ChatResponse, StreamChunk, Source
+from app.models import ChatRequest, ChatResponse, StreamChunk, Source, RecommendedMenu
 from app.rag_chain import get_rag_chain
+from app.metrics import (
+    MetricsMiddleware,
+    StreamMetrics,
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    metrics_enabled,
+    register_cache_collectors,
+    render_metrics
+)
+from app.tracing import Trace, TracingMiddleware, current_trace, activate, span, flush_trace_log, tracing_enabled
 from app.utils import logger, validate_question
 import json
 import uuid
 import time
 from datetime import datetime
+from typing import List, Dict, Any, Optional
 
 # FastAPI 앱 생성
 app = FastAPI(
@@ -30,6 +40,66 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 요청 수/처리 시간/처리 중 요청 수 메트릭 (SSE는 스트림 종료까지 측정)
+if metrics_enabled():
+    app.add_middleware(MetricsMiddleware)
+
+# 요청 단위 추적 구간 + Server-Timing 헤더 (오류 응답에도 헤더 포함)
+if tracing_enabled():
+    app.add_middleware(TracingMiddleware)
+
+
+# SSE 헤더 (버퍼링 방지 및 연결 유지)
+SSE_HEADERS = {
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # Nginx 버퍼링 방지
+    "Cache-Control": "no-cache",
+    "Content-Type": "text/event-stream",
+}
+
+
+def to_sources(items: List[Dict[str, Any]]) -> List[Source]:
+    """RAG 결과의 소스 딕셔너리를 응답 모델로 변환"""
+    return [
+        Source(
+            content=s.get("content", ""),
+            metadata=s.get("metadata", {}),
+            score=s.get("score")
+        )
+        for s in items
+    ]
+
+
+def to_recommended_menus(items: List[Dict[str, Any]]) -> List[RecommendedMenu]:
+    """RAG 결과의 추천 메뉴 딕셔너리를 응답 모델로 변환"""
+    return [
+        RecommendedMenu(
+            restaurant_name=m.get("restaurant_name", ""),
+            menu_name=m.get("menu_name", ""),
+            price=m.get("price", ""),
+            calories=m.get("calories", ""),
+            address=m.get("address", ""),
+            category=m.get("category", ""),
+            score=m.get("score")
+        )
+        for m in items
+    ]
+
+
+def convert_history(request: ChatRequest) -> Optional[List[Dict[str, str]]]:
+    """요청의 대화 기록을 RAG 체인 형식으로 변환"""
+    if not request.history:
+        return None
+    return [
+        {"role": msg.role, "content": msg.content}
+        for msg in request.history
+    ]
+
+
+def trace_timings(trace: Optional[Trace]) -> Optional[Dict[str, float]]:
+    """SSE 완료 청크에 넣을 단계별 시간 (추적 비활성화면 None)"""
+    return trace.timings() if trace is not None else None
+
 
 @app.get("/")
 async def root():
@@ -41,6 +111,7 @@ async def root():
             "chat": "/chat",
             "chat_stream": "/chat/stream",
             "health": "/health",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
@@ -52,6 +123,14 @@ async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 메트릭 (텍스트 형식)"""
+    if not metrics_enabled():
+        raise HTTPException(status_code=404, detail="메트릭이 비활성화되어 있습니다 (METRICS=0)")
+    return PlainTextResponse(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
@@ -59,10 +138,18 @@ async def chat(request: ChatRequest):
     
     - 질문을 받아 벡터 검색 + LLM을 통해 답변 생성
     - 전체 응답을 한 번에 반환
+    - 단계별 시간은 Server-Timing 헤더로 반환 (TracingMiddleware)
     """
     try:
-        # 질문 검증 (LLM 호출 전에 수행)
-        is_valid, rejection_message = validate_question(request.message)
+        # RAG 체인 가져오기
+        rag_chain = get_rag_chain()
+        
+        # 대화 기록 변환
+        history = convert_history(request)
+        
+        # 질문 검증 (검색/LLM 호출 전에 수행)
+        with span("validation"):
+            is_valid, rejection_message = validate_question(request.message)
         if not is_valid:
             # 거절 메시지만 반환 (소스 없음, 추천 메뉴 없음)
             return ChatResponse(
@@ -73,54 +160,28 @@ async def chat(request: ChatRequest):
                 timestamp=datetime.now()
             )
         
-        # RAG 체인 가져오기
-        rag_chain = get_rag_chain()
-        
-        # 대화 기록 변환
-        history = None
-        if request.history:
-            history = [
-                {"role": msg.role, "content": msg.content}
-                for msg in request.history
-            ]
-        
-        # RAG 체인 실행
-        result = rag_chain.invoke(
-            question=request.message,
-            conversation_id=request.conversation_id,
-            history=history
-        )
-        
-        # 소스 변환
-        sources = [
-            Source(
-                content=s.get("content", ""),
-                metadata=s.get("metadata", {}),
-                score=s.get("score")
+        # 음식점명/메뉴명 직접 조회 (LLM 호출 없음, 스레드 풀에서 실행)
+        with span("direct_lookup"):
+            result = await rag_chain.run_in_executor(
+                rag_chain.lookup_direct_answer,
+                question=request.message,
+                conversation_id=request.conversation_id,
+                history=history
             )
-            for s in result.get("sources", [])
-        ]
         
-        # 추천 메뉴 변환
-        from app.models import RecommendedMenu
-        recommended_menus = [
-            RecommendedMenu(
-                restaurant_name=m.get("restaurant_name", ""),
-                menu_name=m.get("menu_name", ""),
-                price=m.get("price", ""),
-                calories=m.get("calories", ""),
-                address=m.get("address", ""),
-                category=m.get("category", ""),
-                score=m.get("score")
+        if result is None:
+            # RAG 체인 실행 (비동기: 검색은 스레드 풀, LLM은 ainvoke)
+            result = await rag_chain.ainvoke(
+                question=request.message,
+                conversation_id=request.conversation_id,
+                history=history
             )
-            for m in result.get("recommended_menus", [])
-        ]
         
         # 응답 생성
         response = ChatResponse(
             response=result.get("response", ""),
-            sources=sources,
-            recommended_menus=recommended_menus,
+            sources=to_sources(result.get("sources", [])),
+            recommended_menus=to_recommended_menus(result.get("recommended_menus", [])),
             conversation_id=request.conversation_id or str(uuid.uuid4()),
             timestamp=datetime.now()
         )
@@ -142,10 +203,19 @@ async def chat_stream(request: ChatRequest):
     """
     # 요청 받은 시간 기록
     request_start_time = time.time()
+    # TracingMiddleware가 만든 이 요청의 Trace (추적 비활성화면 None)
+    trace = current_trace()
     
     try:
-        # 질문 검증 (LLM 호출 전에 수행)
-        is_valid, rejection_message = validate_question(request.message)
+        # RAG 체인 가져오기
+        rag_chain = get_rag_chain()
+        
+        # 대화 기록 변환
+        history = convert_history(request)
+        
+        # 질문 검증 (검색/LLM 호출 전에 수행)
+        with span("validation"):
+            is_valid, rejection_message = validate_question(request.message)
         if not is_valid:
             # 거절 메시지를 스트리밍 형식으로 즉시 반환
             async def reject():
@@ -153,48 +223,65 @@ async def chat_stream(request: ChatRequest):
                 chunk = StreamChunk(
                     content=rejection_message,
                     done=True,
-                    sources=[]
+                    sources=[],
+                    timings=trace_timings(trace)
                 )
                 yield f"data: {chunk.model_dump_json()}\n\n"
+                if trace is not None:
+                    trace.set_attributes(stream="reject")
             
-            return EventSourceResponse(
-                reject(),
-                headers={
-                    "Connection": "keep-alive",
-                    "X-Accel-Buffering": "no",
-                    "Cache-Control": "no-cache",
-                    "Content-Type": "text/event-stream",
-                }
-            )
+            return EventSourceResponse(StreamMetrics("reject").wrap(reject()), headers=SSE_HEADERS)
         
-        # RAG 체인 가져오기
-        rag_chain = get_rag_chain()
+        # 음식점명/메뉴명 직접 조회 (LLM 호출 없음, 스레드 풀에서 실행)
+        with span("direct_lookup"):
+            direct_result = await rag_chain.run_in_executor(
+                rag_chain.lookup_direct_answer,
+                question=request.message,
+                conversation_id=request.conversation_id,
+                history=history
+            )
+        if direct_result is not None:
+            direct_metrics = StreamMetrics("direct")
+            
+            async def direct():
+                # 템플릿 답변을 한 번에 전송한 뒤 소스/추천 메뉴와 함께 완료 신호
+                chunk = StreamChunk(content=direct_result["response"], done=False)
+                direct_metrics.tokens(1)
+                yield f"data: {chunk.model_dump_json()}\n\n"
+                final_chunk = StreamChunk(
+                    content="",
+                    done=True,
+                    sources=to_sources(direct_result["sources"]),
+                    recommended_menus=to_recommended_menus(direct_result["recommended_menus"]),
+                    timings=trace_timings(trace)
+                )
+                yield f"data: {final_chunk.model_dump_json()}\n\n"
+                if trace is not None:
+                    trace.set_attributes(stream="direct")
+            
+            return EventSourceResponse(direct_metrics.wrap(direct()), headers=SSE_HEADERS)
         
-        # 대화 기록 변환
-        history = None
-        if request.history:
-            history = [
-                {"role": msg.role, "content": msg.content}
-                for msg in request.history
-            ]
+        stream_metrics = StreamMetrics("generate")
         
         async def generate():
             """스트리밍 생성기"""
             full_content = ""
             sources = []
+            recommended_menus = []
+            chunk_count = 0
+            sent_count = 0
+            # 생성기는 엔드포인트와 다른 태스크에서 실행될 수 있으므로 추적을 다시 연결
+            activate(trace)
             
             try:
-                # 벡터 검색으로 소스 먼저 가져오기 (필수)
-                vectorstore = rag_chain.vectorstore
-                search_results = vectorstore.similarity_search(request.message, k=5)
-                sources = [
-                    {
-                        "content": r.get("content", ""),
-                        "metadata": r.get("metadata", {}),
-                        "score": r.get("score")
-                    }
-                    for r in search_results
-                ]
+                # 검색은 한 번만 수행: LLM 컨텍스트와 동일한 결과를 소스로 사용
+                stream_result = await rag_chain.astream_with_sources(
+                    question=request.message,
+                    conversation_id=request.conversation_id,
+                    history=history
+                )
+                sources = stream_result["sources"]
+                recommended_menus = stream_result.get("recommended_menus", [])
                 
                 # 스트리밍 시작 시간 기록
                 stream_start_time = time.time()
@@ -202,13 +289,7 @@ async def chat_stream(request: ChatRequest):
                 logger.info("스트리밍 시작")
                 logger.info(f"[요청 처리] 요청 수신부터 스트리밍 시작까지: {request_to_stream_time:.3f}초")
                 
-                chunk_count = 0
-                sent_count = 0
-                async for chunk in rag_chain.stream(
-                    question=request.message,
-                    conversation_id=request.conversation_id,
-                    history=history
-                ):
+                async for chunk in stream_result["stream"]:
                     chunk_count += 1
                     full_content += chunk
                     logger.info(f"청크 #{chunk_count} 생성, 길이: {len(chunk) if chunk else 0}, 내용: '{chunk[:50] if chunk else ''}...'")
@@ -220,6 +301,7 @@ async def chat_stream(request: ChatRequest):
                     
                     # SSE 형식으로 즉시 전송
                     sent_count += 1
+                    stream_metrics.tokens(1)
                     chunk_data = StreamChunk(
                         content=chunk,
                         done=False,
@@ -241,10 +323,12 @@ async def chat_stream(request: ChatRequest):
                 # 최소 하나의 청크도 전송되지 않았다면 에러 청크 전송
                 if sent_count == 0:
                     logger.warning("스트리밍 중 청크를 받지 못했습니다")
+                    stream_metrics.outcome = "error"
                     error_chunk = StreamChunk(
                         content="응답을 생성하는 중 오류가 발생했습니다.",
                         done=True,
-                        sources=[]
+                        sources=[],
+                        timings=trace_timings(trace)
                     )
                     yield f"data: {error_chunk.model_dump_json()}\n\n"
                     return
@@ -253,36 +337,29 @@ async def chat_stream(request: ChatRequest):
                 final_chunk = StreamChunk(
                     content="",
                     done=True,
-                    sources=[
-                        Source(
-                            content=s.get("content", ""),
-                            metadata=s.get("metadata", {}),
-                            score=s.get("score")
-                        )
-                        for s in sources
-                    ]
+                    sources=to_sources(sources),
+                    recommended_menus=to_recommended_menus(recommended_menus),
+                    timings=trace_timings(trace)
                 )
                 yield f"data: {final_chunk.model_dump_json()}\n\n"
                 
             except Exception as e:
                 logger.error(f"스트리밍 오류: {e}", exc_info=True)
+                stream_metrics.outcome = "error"
                 error_chunk = StreamChunk(
                     content=f"오류가 발생했습니다: {str(e)}",
                     done=True,
-                    sources=[]
+                    sources=[],
+                    timings=trace_timings(trace)
                 )
                 yield f"data: {error_chunk.model_dump_json()}\n\n"
+            finally:
+                # 기록(finish)은 스트림 종료 후 TracingMiddleware가 수행 (연결이 끊겨도 그때까지의 구간 기록)
+                if trace is not None:
+                    trace.set_attributes(stream="generate", chunks=sent_count)
         
         # SSE 헤더 설정 (버퍼링 방지 및 연결 유지)
-        return EventSourceResponse(
-            generate(),
-            headers={
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",  # Nginx 버퍼링 방지
-                "Cache-Control": "no-cache",
-                "Content-Type": "text/event-stream",
-            }
-        )
+        return EventSourceResponse(stream_metrics.wrap(generate()), headers=SSE_HEADERS)
         
     except Exception as e:
         logger.error(f"스트리밍 요청 처리 오류: {e}", exc_info=True)
@@ -295,7 +372,15 @@ async def startup_event():
     logger.info("챗봇 서버 시작")
     logger.info("벡터 저장소 초기화 중...")
     # 벡터 저장소 초기화 (지연 로딩)
-    get_rag_chain()
+    rag_chain = get_rag_chain()
+    # 메뉴 직접 조회 색인 미리 구축 (첫 요청 지연 방지)
+    if rag_chain.menu_lookup is not None:
+        try:
+            rag_chain.menu_lookup.build()
+        except Exception as e:
+            logger.error(f"메뉴 직접 조회 색인 구축 실패: {e}")
+    # 캐시 히트율은 각 캐시가 세는 값을 스크레이프 시점에 읽음
+    register_cache_collectors(rag_chain)
     logger.info("서버 준비 완료")
 
 
@@ -303,3 +388,9 @@ async def startup_event():
 async def shutdown_event():
     """애플리케이션 종료 시 실행"""
     logger.info("챗봇 서버 종료")
+    rag_chain = get_rag_chain()
+    # 대기 중인 대화 기록 저장 후 검색 스레드 풀 정리
+    rag_chain.sessions.close()
+    rag_chain.executor.shutdown(wait=False)
+    # 대기 중인 추적 로그 기록
+    flush_trace_log()
@@ -0,0 +1,219 @@
+"""
+메뉴/음식점 직접 조회 (LLM 없는 빠른 경로)
+
+이 파일의 역할:
+- "전주한정식 비빔밥 가격 얼마야?"처럼 메타데이터만으로 답할 수 있는 질문을
+  정규화된 음식점명/메뉴명 해시 조회로 바로 답변
+- 정해진 템플릿 답변 + 검색 결과(소스) 반환 → RAGChain 결과와 같은 형식으로 변환
+
+왜 필요한가:
+- 이런 질문도 임베딩, 벡터 검색, gpt-4o-mini 호출(최대 500토큰)을 모두 거쳐 수 초가 걸림
+- 답은 메타데이터(가격, 칼로리, 주소)에 그대로 있으므로 해시 조회만으로 1ms 이내 응답 가능
+
+확실한 일치(confident hit) 조건:
+1. 가격/칼로리/주소/메뉴 목록을 묻는 표현이 있음
+2. 공백을 뺀 질문에 음식점명이 그대로 포함됨 (같은 이름의 지점이 여럿이면 지점별로 답변)
+3. 질문의 나머지 부분에 그 음식점의 메뉴명이 있으면 메뉴 답변,
+   없으면 주소/메뉴 목록 답변 (음식점명이 메뉴명에도 쓰이면 메뉴명까지 일치해야 함)
+4. 검색 조건(카테고리/가격·칼로리 범위/제외)이나 추천/비교/부정 표현이 없음
+   ("보리밥 말고", "만원 이하", "근처 메뉴 추천", "비슷한 가격대"는 템플릿으로 답할 수 없음)
+- 조건을 만족하지 않으면 None → 기존 RAG 경로로 처리
+"""
+
+import re
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from app.lexical_index import compact_text
+from app.preferences import parse_preferences
+from app.utils import logger
+
+
+# 질문 의도 → 판단 표현 (공백 제거한 질문에서 검색)
+_INTENT_PATTERNS = {
+    "price": re.compile(r"가격|얼마|비용|몇원"),
+    "calories": re.compile(r"칼로리|열량|kcal"),
+    "address": re.compile(r"주소|위치|어디에있|어디야|어디있|가는길"),
+    "menus": re.compile(r"메뉴|뭐있|뭐팔|뭐가있|뭐파"),
+}
+
+# 추천/비교/부정/범위 표현 → 템플릿 답변 대신 RAG로 넘김 (공백 제거한 질문에서 검색)
+_DEFER_PATTERN = re.compile(r"추천|비슷|말고|근처|보다|이하|이상|미만|초과")
+
+# 메뉴 목록 답변에 나열할 최대 메뉴 수
+MAX_LISTED_MENUS = 10
+
+
+def _format_price(value: Any) -> str:
+    return f"{value:,}원" if isinstance(value, int) else f"{value}원"
+
+
+def _format_calories(value: Any) -> str:
+    return f"{value}kcal"
+
+
+class MenuLookup:
+    """정규화된 음식점명/메뉴명 해시 기반 직접 조회 (첫 조회 시 구축, 스레드 안전)"""
+
+    def __init__(self, loader: Callable[[], Tuple[List[str], List[Dict[str, Any]]]]):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._built = False
+        # 음식점 ID → {"name", "address", "category", "menus": {정규화 메뉴명: (문서, 메타데이터)}}
+        self.restaurants: Dict[str, Dict[str, Any]] = {}
+        # 정규화 음식점명 → 음식점 ID 목록
+        self.restaurant_names: Dict[str, List[str]] = {}
+        # 전체 정규화 메뉴명
+        self.menu_names: set = set()
+        # 메뉴명에 포함되는 음식점명 (예: "피자", "보리밥") - 요리를 묻는 질문일 수 있음
+        self.generic_names: set = set()
+        self.max_name_length = 0
+
+    def _build(self):
+        start = time.time()
+        documents, metadatas = self._loader()
+        for document, metadata in zip(documents, metadatas):
+            metadata = metadata or {}
+            restaurant_id = str(metadata.get("restaurant_id", ""))
+            name = compact_text(str(metadata.get("restaurant_name", "")))
+            menu = compact_text(str(metadata.get("menu_name", "")))
+            if not restaurant_id or len(name) < 2 or not menu:
+                continue
+
+            restaurant = self.restaurants.get(restaurant_id)
+            if restaurant is None:
+                restaurant = {
+                    "name": metadata.get("restaurant_name", ""),
+                    "address": metadata.get("address", ""),
+                    "category": metadata.get("category", ""),
+                    "menus": {}
+                }
+                self.restaurants[restaurant_id] = restaurant
+                self.restaurant_names.setdefault(name, []).append(restaurant_id)
+            # 같은 메뉴의 청크는 첫 번째만 사용
+            restaurant["menus"].setdefault(menu, (document, metadata))
+            self.menu_names.add(menu)
+
+        # 메뉴명의 부분 문자열을 음식점명 사전에서 조회 (메뉴명 길이에만 비례)
+        for menu in self.menu_names:
+            for i in range(len(menu)):
+                for j in range(i + 2, len(menu) + 1):
+                    if menu[i:j] in self.restaurant_names:
+                        self.generic_names.add(menu[i:j])
+
+        self.max_name_length = max((len(n) for n in self.restaurant_names), default=0)
+        self._built = True
+        logger.info(
+            f"[메뉴 직접 조회] {len(self.restaurants)}개 음식점, {len(self.menu_names)}개 메뉴명 색인 "
+            f"({time.time() - start:.2f}초)"
+        )
+
+    def build(self):
+        """색인 구축 (이미 구축되었으면 생략, 서버 시작 시 미리 호출)"""
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._build()
+
+    def invalidate(self):
+        """데이터가 바뀌면 다음 조회 때 다시 구축"""
+        with self._lock:
+            self.restaurants, self.restaurant_names = {}, {}
+            self.menu_names, self.generic_names = set(), set()
+            self._built = False
+
+    def _restaurant_candidates(self, compact_question: str) -> List[str]:
+        """질문에 포함된 음식점명 (긴 이름 우선)"""
+        found = set()
+        for i in range(len(compact_question)):
+            for j in range(i + 2, min(len(compact_question), i + self.max_name_length) + 1):
+                if compact_question[i:j] in self.restaurant_names:
+                    found.add(compact_question[i:j])
+        return sorted(found, key=len, reverse=True)
+
+    @staticmethod
+    def _find_menu(restaurant: Dict[str, Any], text: str) -> Optional[Tuple[str, Any]]:
+        """질문 나머지 부분에 포함된 메뉴 중 가장 긴 메뉴명"""
+        matches = [name for name in restaurant["menus"] if name in text]
+        if not matches:
+            return None
+        name = max(matches, key=len)
+        return name, restaurant["menus"][name]
+
+    @staticmethod
+    def _menu_answer(restaurant: Dict[str, Any], metadata: Dict[str, Any], intents: List[str]) -> str:
+        """메뉴 하나에 대한 템플릿 답변"""
+        menu_name = metadata.get("menu_name", "")
+        price = _format_price(metadata.get("price", ""))
+        calories = _format_calories(metadata.get("calories", ""))
+        lines = []
+        if "calories" in intents and "price" not in intents:
+            lines.append(f"{restaurant['name']}의 {menu_name} 칼로리는 {calories}예요. (가격 {price})")
+        else:
+            lines.append(f"{restaurant['name']}의 {menu_name} 가격은 {price}이에요. (칼로리 {calories})")
+        if restaurant["address"]:
+            lines.append(f"주소: {restaurant['address']}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _restaurant_answer(restaurant: Dict[str, Any], intents: List[str]) -> str:
+        """음식점 주소/메뉴 목록 템플릿 답변"""
+        lines = [f"{restaurant['name']} ({restaurant['category']}) 주소: {restaurant['address']}"]
+        if set(intents) & {"menus", "price", "calories"}:
+            menus = list(restaurant["menus"].values())
+            lines.append("메뉴:")
+            for _, metadata in menus[:MAX_LISTED_MENUS]:
+                lines.append(
+                    f"- {metadata.get('menu_name', '')}: {_format_price(metadata.get('price', ''))}, "
+                    f"{_format_calories(metadata.get('calories', ''))}"
+                )
+            if len(menus) > MAX_LISTED_MENUS:
+                lines.append(f"외 {len(menus) - MAX_LISTED_MENUS}개 메뉴")
+        return "\n".join(lines)
+
+    def lookup(self, question: str) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        직접 답할 수 있는 질문이면 (템플릿 답변, 검색 결과 목록) 반환, 아니면 None
+
+        검색 결과 형식은 VectorStore.similarity_search와 같음 (score는 None)
+        """
+        compact_question = compact_text(question)
+        intents = [intent for intent, pattern in _INTENT_PATTERNS.items() if pattern.search(compact_question)]
+        if not intents:
+            return None
+        if _DEFER_PATTERN.search(compact_question) or not parse_preferences(question).is_empty():
+            return None
+
+        self.build()
+        for name in self._restaurant_candidates(compact_question):
+            # 같은 이름의 지점이 여럿이면 지점별로 답변
+            branches = [self.restaurants[rid] for rid in self.restaurant_names[name]]
+            rest = compact_question.replace(name, "", 1)
+
+            menu_hits = []
+            for restaurant in branches:
+                menu = self._find_menu(restaurant, rest)
+                if menu is not None:
+                    menu_hits.append((restaurant, menu[1]))
+            if menu_hits:
+                answer = "\n\n".join(
+                    self._menu_answer(restaurant, metadata, intents)
+                    for restaurant, (_, metadata) in menu_hits
+                )
+                results = [
+                    {"content": document, "metadata": metadata, "score": None}
+                    for _, (document, metadata) in menu_hits
+                ]
+                return answer, results
+
+            # 음식점명이 메뉴명에도 쓰이면("비빔밥", "피자") 요리를 묻는 질문일 수 있으므로 RAG로 넘김
+            if name in self.generic_names:
+                continue
+            answer = "\n\n".join(self._restaurant_answer(restaurant, intents) for restaurant in branches)
+            results = [
+                {"content": document, "metadata": metadata, "score": None}
+                for restaurant in branches
+                for document, metadata in restaurant["menus"].values()
+            ]
+            return answer, results
+        return None
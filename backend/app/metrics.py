@@ -0,0 +1,381 @@
+"""
+Prometheus 메트릭 (/metrics)
+
+이 파일의 역할:
+- 카운터/게이지/히스토그램을 메모리에 모아 Prometheus 텍스트 형식(0.0.4)으로 내보냄
+- RAG 단계별 시간(invoke/ainvoke/stream 경로 모두), 임베딩/ChromaDB 검색 시간,
+  임베딩 캐시/답변 캐시 히트, 처리 중인 요청 수, SSE 스트림 수/시간/전송 토큰 수 기록
+- HTTP 요청 수/시간/처리 중 요청 수를 재는 ASGI 미들웨어 제공
+
+왜 필요한가:
+- RAGChain.invoke의 step_times는 로그로만 남고, 스트리밍 경로는 단계별 시간을 전혀 기록하지 않음
+- 로그를 grep하지 않고 대시보드와 알림(p95 지연, 캐시 히트율, 오류 스트림 비율)을 만들어야 함
+
+작동 원리:
+- 외부 패키지 없이 구현 (prometheus_client 미설치 환경에서도 동작)
+- 라벨 조합별 값은 처음 사용할 때 만들어 캐시하고, 관측은 잠금 한 번 + 정수 덧셈이라 요청당 오버헤드가 작음
+- 캐시 통계처럼 이미 다른 객체가 세고 있는 값은 스크레이프할 때 콜백(collector)으로 읽음
+
+설정 (환경 변수):
+- METRICS: 0이면 /metrics 엔드포인트와 HTTP 미들웨어 비활성화 (기본 1)
+"""
+
+import asyncio
+import bisect
+import threading
+import time
+from typing import List, Dict, Any, Tuple, Callable, Sequence, AsyncIterator
+from app.utils import logger, get_env_int
+
+
+# 지연 시간 히스토그램 기본 구간 (초): 1ms ~ 60초
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Prometheus 텍스트 형식 Content-Type
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# HTTP 메트릭 라벨로 쓸 경로 (그 외는 "other", 라벨 수 폭증 방지)
+TRACKED_PATHS = {"/", "/chat", "/chat/stream", "/health", "/metrics"}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """라벨 조합별 값을 가진 메트릭 공통 부분"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str, **kwargs: str):
+        """라벨 값으로 하위 값 객체 가져오기 (처음이면 생성)"""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in children:
+            lines.extend(child.render(self.name, self.labelnames, key))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self, lock: threading.Lock):
+        self._lock = lock
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def render(self, name, labelnames, key) -> List[str]:
+        return [f"{name}{_format_labels(labelnames, key)} {_format_value(self.value)}"]
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("_lock", "_buckets", "counts", "sum", "count")
+
+    def __init__(self, lock: threading.Lock, buckets: Tuple[float, ...]):
+        self._lock = lock
+        self._buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def render(self, name, labelnames, key) -> List[str]:
+        with self._lock:
+            counts = list(self.counts)
+            total, count = self.sum, self.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self._buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{name}_bucket{_format_labels(labelnames, key, le)} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, key)} {_format_value(total)}")
+        lines.append(f"{name}_count{_format_labels(labelnames, key)} {count}")
+        return lines
+
+
+class Counter(_Metric):
+    """증가만 하는 값 (요청 수, 토큰 수 등)"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild(self._lock)
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    """오르내리는 값 (처리 중인 요청 수 등)"""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild(self._lock)
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def set(self, value: float):
+        self._default.set(value)
+
+
+class Histogram(_Metric):
+    """구간별 관측 수 + 합계 (지연 시간 분포, PromQL histogram_quantile로 p95 계산)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self._lock, self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+
+# (이름, 종류, 설명, [(라벨 딕셔너리, 값), ...]) 목록을 반환하는 스크레이프 시점 콜백
+Collector = Callable[[], List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]
+
+
+class MetricsRegistry:
+    """메트릭 목록 + 스크레이프 시점 콜백 → Prometheus 텍스트"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        # 이름 → 콜백 (같은 이름으로 다시 등록하면 교체: 재시작/리로드 시 중복 방지)
+        self._collectors: Dict[str, Collector] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, name: str, collector: Collector):
+        self._collectors[name] = collector
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in list(self._collectors.values()):
+            try:
+                families = collector()
+            except Exception as e:
+                logger.debug(f"메트릭 수집 콜백 실패: {e}")
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ===== 메트릭 정의 =====
+
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "chatbot_http_requests_in_flight", "처리 중인 HTTP 요청 수 (SSE는 스트림이 끝날 때까지 포함)", ["endpoint"]))
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "chatbot_http_request_duration_seconds", "HTTP 요청 처리 시간 (SSE는 스트림 종료까지)", ["endpoint", "method", "status"]))
+RAG_STAGE_DURATION = REGISTRY.register(Histogram(
+    "chatbot_rag_stage_duration_seconds", "RAG 단계별 처리 시간", ["path", "stage"]))
+QUERY_EMBEDDING_DURATION = REGISTRY.register(Histogram(
+    "chatbot_query_embedding_duration_seconds", "질문 임베딩 시간 (캐시 히트 포함)"))
+VECTOR_QUERY_DURATION = REGISTRY.register(Histogram(
+    "chatbot_vector_query_duration_seconds", "벡터 인덱스(ChromaDB/simple) 검색 시간", ["engine", "filtered"]))
+SSE_STREAMS_ACTIVE = REGISTRY.register(Gauge(
+    "chatbot_sse_streams_active", "진행 중인 SSE 스트림 수"))
+SSE_STREAMS_TOTAL = REGISTRY.register(Counter(
+    "chatbot_sse_streams_total", "종료된 SSE 스트림 수", ["kind", "outcome"]))
+SSE_STREAM_DURATION = REGISTRY.register(Histogram(
+    "chatbot_sse_stream_duration_seconds", "SSE 스트림 시작부터 종료까지 시간", ["kind"]))
+SSE_TOKENS_TOTAL = REGISTRY.register(Counter(
+    "chatbot_sse_tokens_streamed_total", "SSE로 전송한 답변 청크(LLM 토큰) 수", ["kind"]))
+
+
+def observe_stage_times(path: str, step_times: Dict[str, float]):
+    """RAGChain step_times 딕셔너리를 단계별 히스토그램에 기록"""
+    for stage, seconds in step_times.items():
+        RAG_STAGE_DURATION.labels(path, stage).observe(seconds)
+
+
+def observe_vector_query(engine: str, embedding_time: float, search_time: float, filtered: bool):
+    """질문 임베딩 시간과 벡터 인덱스 검색 시간 기록"""
+    QUERY_EMBEDDING_DURATION.observe(embedding_time)
+    VECTOR_QUERY_DURATION.labels(engine, "true" if filtered else "false").observe(search_time)
+
+
+def _cache_family(name: str, documentation: str, stats: Dict[str, Any]):
+    return [
+        (f"{name}_hits_total", "counter", f"{documentation} 히트 수", [({}, stats["hits"])]),
+        (f"{name}_misses_total", "counter", f"{documentation} 미스 수", [({}, stats["misses"])]),
+        (f"{name}_hit_ratio", "gauge", f"{documentation} 누적 히트율", [({}, stats["hit_rate"])]),
+        (f"{name}_entries", "gauge", f"{documentation} 항목 수", [({}, stats["size"])]),
+    ]
+
+
+def register_cache_collectors(rag_chain):
+    """
+    임베딩 캐시/답변 캐시 통계를 스크레이프 시점에 읽는 콜백 등록 (이미 세고 있는 값 재사용)
+
+    서버 시작마다 호출되어도 콜백은 하나만 유지 (마지막으로 등록한 RAGChain 기준)
+    """
+    def collect():
+        families = []
+        embedding_cache = getattr(rag_chain.vectorstore, "embedding_cache", None)
+        if embedding_cache is not None:
+            families.extend(_cache_family("chatbot_embedding_cache", "질문 임베딩 캐시", embedding_cache.stats()))
+        families.extend(_cache_family("chatbot_answer_cache", "답변 시맨틱 캐시", rag_chain.answer_cache.stats()))
+        return families
+
+    REGISTRY.register_collector("cache", collect)
+
+
+class StreamMetrics:
+    """
+    SSE 스트림 하나의 메트릭 기록
+
+    wrap()으로 감싼 생성기가 끝나면 종료 결과(completed/error/disconnected)와 시간을 기록
+    생성기 안에서 오류 청크를 보낸 경우 outcome을 "error"로 바꿔 둠
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.outcome = "completed"
+
+    def tokens(self, count: int):
+        if count:
+            SSE_TOKENS_TOTAL.labels(self.kind).inc(count)
+
+    async def wrap(self, stream: AsyncIterator[str]) -> AsyncIterator[str]:
+        SSE_STREAMS_ACTIVE.inc()
+        start = time.perf_counter()
+        try:
+            async for item in stream:
+                yield item
+        except (GeneratorExit, asyncio.CancelledError):
+            # 클라이언트 연결 끊김
+            self.outcome = "disconnected"
+            raise
+        except Exception:
+            self.outcome = "error"
+            raise
+        finally:
+            SSE_STREAMS_ACTIVE.dec()
+            SSE_STREAMS_TOTAL.labels(self.kind, self.outcome).inc()
+            SSE_STREAM_DURATION.labels(self.kind).observe(time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    """
+    HTTP 요청 수/처리 시간/처리 중 요청 수를 재는 ASGI 미들웨어
+
+    응답 본문 전송이 끝날 때까지 재므로 SSE 요청은 스트림 전체 시간이 기록됨
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope.get("path", "")
+        endpoint = path if path in TRACKED_PATHS else "other"
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(endpoint)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            HTTP_REQUEST_DURATION.labels(endpoint, scope.get("method", ""), str(status["code"])).observe(
+                time.perf_counter() - start
+            )
+
+
+def metrics_enabled() -> bool:
+    """METRICS 설정 (0이면 /metrics 엔드포인트와 HTTP 미들웨어 비활성화)"""
+    return bool(get_env_int("METRICS", 1))
+
+
+def render_metrics() -> str:
+    """현재 메트릭을 Prometheus 텍스트 형식으로 반환"""
+    return REGISTRY.render()
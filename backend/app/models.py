@@ -29,13 +29,6 @@ class Source(BaseModel):
 
 
 
-class StreamChunk(BaseModel):
-    """스트리밍 응답 청크"""
-    content: str = Field(..., description="청크 내용")
-    done: bool = Field(default=False, description="스트리밍 완료 여부")
-    sources: Optional[List[Source]] = Field(None, description="참조된 소스 (완료 시)")
-
-
 class RecommendedMenu(BaseModel):
     """추천 메뉴 정보"""
     restaurant_name: str = Field(..., description="음식점명")
@@ -47,6 +40,15 @@ class RecommendedMenu(BaseModel):
     score: Optional[float] = Field(None, description="유사도 점수")
 
 
+class StreamChunk(BaseModel):
+    """스트리밍 응답 청크"""
+    content: str = Field(..., description="청크 내용")
+    done: bool = Field(default=False, description="스트리밍 완료 여부")
+    sources: Optional[List[Source]] = Field(None, description="참조된 소스 (완료 시)")
+    recommended_menus: Optional[List[RecommendedMenu]] = Field(None, description="추천 메뉴 목록 (완료 시)")
+    timings: Optional[Dict[str, float]] = Field(None, description="요청 처리 단계별 시간 ms (완료 시, Server-Timing과 같은 값)")
+
+
 class ChatResponse(BaseModel):
     """채팅 API 응답"""
     response: str = Field(..., description="챗봇 응답")
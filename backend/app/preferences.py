@@ -0,0 +1,314 @@
+"""
+질문 선호도 파서 → 검색 필터 스펙
+
+이 파일의 역할:
+- 사용자 질문에서 카테고리, 가격/칼로리 범위, 제외 조건, 가격대를 추출
+- 결과를 SearchFilter(구조화된 필터 객체)로 반환하여
+  벡터 저장소가 순위 계산 전에 그대로 적용하도록 함 (VectorStore.search)
+
+왜 필요한가:
+- 예전 RAGChain._extract_preferences는 호출마다 re를 import하고 re.findall을 반복 실행
+- "N만원", "N칼로리" 같은 상한 하나만 이해하고 "1만~2만원", "500칼로리 이상"은 처리하지 못함
+- price_range("저렴", "고급")는 계산만 하고 검색에는 쓰이지 않았음
+- "치킨", "카페"처럼 실제 카테고리 값("치킨/닭강정", "카페/디저트")과 다른 단어로
+  필터링하여 결과가 0건이 되는 문제
+
+작동 원리:
+1. 모든 패턴을 하나의 정규식으로 모듈 로드 시 한 번만 컴파일
+2. finditer 한 번으로 질문을 앞에서부터 스캔하며 토큰 종류(이름 있는 그룹)별로 처리
+3. 명시적인 가격 범위가 없을 때만 가격대(저렴/적당/고급)를 숫자 범위로 변환
+
+지원 표현 예:
+- 범위: "1만~2만원", "8천원에서 12000원", "1만원대", "500~700칼로리"
+- 상한/하한: "1만원 이하", "만원 이하", "15000원 이상", "500칼로리 이하", "300kcal 넘는"
+- 여러 카테고리: "한식이나 일식", "중식, 분식"
+- 제외: "매운 거 빼고", "한식 말고", "돼지고기 제외", "고추 없는"
+  ("없는/없이"는 아는 재료/카테고리 단어에만 적용 → "부담 없는 가격"은 제외 조건이 아님)
+- 가격대: "저렴한", "가성비", "적당한", "고급"
+"""
+
+import re
+from dataclasses import dataclass, field, asdict, replace
+from typing import List, Dict, Any, Optional, Tuple
+
+
+# 질문에 나오는 단어 → 실제 메타데이터 카테고리 값
+CATEGORY_ALIASES: Dict[str, str] = {
+    "한식": "한식",
+    "중식": "중식",
+    "중국집": "중식",
+    "중화요리": "중식",
+    "일식": "일식",
+    "일본": "일식",
+    "양식": "양식",
+    "피자": "양식",
+    "파스타": "양식",
+    "분식": "분식",
+    "치킨": "치킨/닭강정",
+    "닭강정": "치킨/닭강정",
+    "카페": "카페/디저트",
+    "디저트": "카페/디저트",
+}
+
+# 가격대 → (최소 가격, 최대 가격) (메뉴 데이터 가격 분포의 하위/상위 25% 부근)
+PRICE_TIER_BOUNDS: Dict[str, Tuple[Optional[int], Optional[int]]] = {
+    "low": (None, 8000),
+    "medium": (8000, 15000),
+    "high": (15000, None),
+}
+
+PRICE_TIER_WORDS: Dict[str, str] = {
+    "저렴": "low",
+    "싼": "low",
+    "싸게": "low",
+    "저가": "low",
+    "가성비": "low",
+    "적당한": "medium",
+    "무난한": "medium",
+    "비싼": "high",
+    "고급": "high",
+    "프리미엄": "high",
+}
+
+# 제외 대상 단어 → 문서에서 제외할 단어들 (메타데이터에 없는 속성은 메뉴명/재료로 판단)
+EXCLUDE_TERM_ALIASES: Dict[str, List[str]] = {
+    "매운": ["매운", "매콤", "고추", "짬뽕", "떡볶이", "마라", "불닭", "핫치킨"],
+    "매콤한": ["매운", "매콤", "고추", "짬뽕", "떡볶이", "마라", "불닭", "핫치킨"],
+    "맵": ["매운", "매콤", "고추", "짬뽕", "떡볶이", "마라", "불닭", "핫치킨"],
+    "돼지": ["돼지"],
+    "소고기": ["소고기", "쇠고기"],
+    "해산물": ["새우", "오징어", "해물", "연어", "조개", "홍합"],
+}
+
+# "~ 없는", "~ 없이"로 제외할 수 있는 재료 단어
+# ("부담 없는 가격", "걱정 없이"처럼 흔한 표현과 구분하기 위해 이 목록과 위 별칭/카테고리만 허용)
+EXCLUDE_INGREDIENT_WORDS = frozenset(
+    {term for terms in EXCLUDE_TERM_ALIASES.values() for term in terms}
+    | {
+        "고기", "돼지고기", "닭고기", "쇠고기", "오리고기", "양고기", "해물", "생선", "회",
+        "밀가루", "면", "우유", "유제품", "치즈", "계란", "달걀", "땅콩", "견과류",
+        "마늘", "양파", "파", "고수", "오이", "버섯", "김치", "설탕", "msg",
+    }
+)
+
+
+def _alternation(words) -> str:
+    """긴 단어 우선 alternation (예: "비싼"이 "싼"보다 먼저 일치)"""
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+# 금액: "15000", "1만", "1.5만", "1만5천", "5천", "12,000", 숫자 없는 "만"("만원 이하")
+_MONEY = r"(?:\d+(?:[.,]\d+)?\s*(?:만\s*(?:\d+\s*천)?|천)?|(?<![가-힣\d])만)"
+_MONEY_GROUPS = re.compile(r"(\d+(?:[.,]\d+)?)\s*(만|천)?\s*(?:(\d+)\s*천)?")
+_CALORIE_UNIT = r"(?:kcal|킬로칼로리|칼로리|칼)"
+_RANGE_SEP = r"\s*(?:~|-|에서|부터)\s*"
+_UPPER = r"이하|미만|까지|아래|이내|안쪽|안으로|넘지\s*않는"
+_LOWER = r"이상|초과|넘는|넘게|부터|보다\s*많은"
+
+_PREFERENCE_PATTERN = re.compile(
+    # 가격 범위 ("1만~2만원", "8천원에서 12000원")
+    rf"(?P<price_range>(?P<pr_lo>{_MONEY})\s*원?{_RANGE_SEP}(?P<pr_hi>{_MONEY})\s*원)"
+    # "1만원대"
+    rf"|(?P<price_band>(?P<pb>{_MONEY})\s*원\s*대)"
+    # 가격 한쪽 범위 또는 단독 금액 ("1만원 이하", "15000원")
+    rf"|(?P<price>(?P<p>{_MONEY})\s*원\s*(?:(?P<p_upper>{_UPPER})|(?P<p_lower>{_LOWER}))?)"
+    # 칼로리 범위 ("500~700칼로리")
+    rf"|(?P<cal_range>(?P<cr_lo>\d+){_CALORIE_UNIT}?{_RANGE_SEP}(?P<cr_hi>\d+)\s*{_CALORIE_UNIT})"
+    # 칼로리 한쪽 범위 또는 단독 값 ("500칼로리 이하")
+    rf"|(?P<cal>(?P<c>\d+)\s*{_CALORIE_UNIT}\s*(?:(?P<c_upper>{_UPPER})|(?P<c_lower>{_LOWER}))?)"
+    # 제외 ("매운 거 빼고", "한식은 말고")
+    r"|(?P<exclude>(?P<ex>[가-힣A-Za-z]+?)\s*(?:거|것|음식|메뉴|종류|류)?\s*(?:은|는|을|를|이|가)?\s*"
+    r"(?:빼고|빼줘|제외|말고|싫어|안\s*먹|(?P<ex_absent>없이|없는)))"
+    # 카테고리
+    rf"|(?P<category>{_alternation(CATEGORY_ALIASES)})"
+    # 가격대
+    rf"|(?P<tier>{_alternation(PRICE_TIER_WORDS)})",
+    re.IGNORECASE
+)
+
+
+def parse_money(text: str) -> Optional[int]:
+    """한국어 금액 표현을 원 단위 정수로 변환 (예: "1만5천" → 15000, "1.5만" → 15000, "만" → 10000)"""
+    if text.strip() == "만":
+        return 10000
+    match = _MONEY_GROUPS.search(text)
+    if not match:
+        return None
+    number, unit, thousands = match.groups()
+    try:
+        value = float(number.replace(",", ""))
+    except ValueError:
+        return None
+    if unit == "만":
+        value *= 10000
+        if thousands:
+            value += int(thousands) * 1000
+    elif unit == "천":
+        value *= 1000
+    return int(value)
+
+
+@dataclass
+class SearchFilter:
+    """
+    검색 필터 스펙 (벡터 저장소가 순위 계산 전에 적용)
+
+    - categories: 포함할 카테고리 (여러 개면 OR)
+    - exclude_categories: 제외할 카테고리
+    - exclude_terms: 문서에 포함되면 제외할 단어 (메뉴명/재료)
+    - min/max_price, min/max_calories: 숫자 범위 (경계 포함)
+    - price_tier: 가격대 단어("low", "medium", "high") - 숫자 범위로 이미 반영됨
+    """
+
+    categories: List[str] = field(default_factory=list)
+    exclude_categories: List[str] = field(default_factory=list)
+    exclude_terms: List[str] = field(default_factory=list)
+    min_price: Optional[int] = None
+    max_price: Optional[int] = None
+    min_calories: Optional[int] = None
+    max_calories: Optional[int] = None
+    price_tier: Optional[str] = None
+
+    def is_empty(self) -> bool:
+        """적용할 조건이 없는지 여부 (price_tier는 숫자 범위로 반영되므로 제외)"""
+        return not (
+            self.categories or self.exclude_categories or self.exclude_terms
+            or self.min_price is not None or self.max_price is not None
+            or self.min_calories is not None or self.max_calories is not None
+        )
+
+    def matches(self, metadata: Dict[str, Any], document: str = "") -> bool:
+        """
+        메타데이터/문서 한 건이 조건을 만족하는지 (벡터 DB 밖에서 필터를 적용할 때 사용)
+
+        숫자 조건이 있는데 값이 없거나 숫자가 아니면 제외 (ChromaDB where 절과 같은 동작)
+        예전 컬렉션처럼 "8000" 문자열로 저장된 값은 숫자로 읽음
+        """
+        category = metadata.get("category")
+        if self.categories and category not in self.categories:
+            return False
+        if category in self.exclude_categories:
+            return False
+        for field_name in ("price", "calories"):
+            low = getattr(self, f"min_{field_name}")
+            high = getattr(self, f"max_{field_name}")
+            if low is None and high is None:
+                continue
+            value = _as_number(metadata.get(field_name))
+            if value is None:
+                return False
+            if (low is not None and value < low) or (high is not None and value > high):
+                return False
+        return not any(term in document for term in self.exclude_terms)
+
+    def has_numeric_bounds(self) -> bool:
+        """가격/칼로리 범위 조건이 있는지 여부"""
+        return any(
+            value is not None
+            for value in (self.min_price, self.max_price, self.min_calories, self.max_calories)
+        )
+
+    def without_numeric_bounds(self) -> "SearchFilter":
+        """가격/칼로리 범위를 뺀 복사본 (숫자 where 절을 쓸 수 없는 컬렉션용)"""
+        return replace(self, min_price=None, max_price=None, min_calories=None, max_calories=None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """로그/답변 캐시 키용 딕셔너리"""
+        return asdict(self)
+
+
+def _as_number(value: Any) -> Optional[float]:
+    """메타데이터 숫자 값 (정수/실수 또는 "8,000" 같은 숫자 문자열, 아니면 None)"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.replace(",", "").strip())
+        except ValueError:
+            return None
+    return None
+
+
+def _add_unique(values: List[str], items) -> None:
+    for item in items:
+        if item not in values:
+            values.append(item)
+
+
+def _set_bounds(
+    spec: SearchFilter,
+    field_name: str,
+    low: Optional[int],
+    high: Optional[int]
+) -> None:
+    """범위 설정 (뒤집힌 범위는 바로잡음, 예: "2만~1만원")"""
+    if low is not None and high is not None and low > high:
+        low, high = high, low
+    if low is not None:
+        setattr(spec, f"min_{field_name}", low)
+    if high is not None:
+        setattr(spec, f"max_{field_name}", high)
+
+
+def parse_preferences(question: str) -> SearchFilter:
+    """질문에서 검색 필터 추출 (정규식 스캔 한 번)"""
+    spec = SearchFilter()
+    explicit_price = False
+
+    for match in _PREFERENCE_PATTERN.finditer(question):
+        kind = match.lastgroup
+        if kind == "price_range":
+            _set_bounds(spec, "price", parse_money(match.group("pr_lo")), parse_money(match.group("pr_hi")))
+            explicit_price = True
+        elif kind == "price_band":
+            # "1만원대" → 10000 ~ 19999, "5천원대" → 5000 ~ 5999
+            value = parse_money(match.group("pb"))
+            if value:
+                step = 10000 if value >= 10000 else 1000
+                _set_bounds(spec, "price", value, value + step - 1)
+                explicit_price = True
+        elif kind == "price":
+            value = parse_money(match.group("p"))
+            if value is None:
+                continue
+            if match.group("p_lower"):
+                _set_bounds(spec, "price", value, None)
+            else:
+                # 단독 금액("15000원")은 예산 상한으로 해석 (예전 동작 유지)
+                _set_bounds(spec, "price", None, value)
+            explicit_price = True
+        elif kind == "cal_range":
+            _set_bounds(spec, "calories", int(match.group("cr_lo")), int(match.group("cr_hi")))
+        elif kind == "cal":
+            value = int(match.group("c"))
+            if match.group("c_lower"):
+                _set_bounds(spec, "calories", value, None)
+            else:
+                _set_bounds(spec, "calories", None, value)
+        elif kind == "exclude":
+            target = match.group("ex").lower()
+            # "없는/없이"는 아는 재료/카테고리 단어일 때만 제외 ("부담 없는 가격"은 무시)
+            if match.group("ex_absent") and not (
+                target in CATEGORY_ALIASES or target in EXCLUDE_TERM_ALIASES or target in EXCLUDE_INGREDIENT_WORDS
+            ):
+                continue
+            if target in CATEGORY_ALIASES:
+                _add_unique(spec.exclude_categories, [CATEGORY_ALIASES[target]])
+            else:
+                _add_unique(spec.exclude_terms, EXCLUDE_TERM_ALIASES.get(target, [target]))
+        elif kind == "category":
+            _add_unique(spec.categories, [CATEGORY_ALIASES[match.group("category").lower()]])
+        elif kind == "tier" and spec.price_tier is None:
+            spec.price_tier = PRICE_TIER_WORDS[match.group("tier")]
+
+    # 제외한 카테고리는 포함 목록에서 뺌 ("치킨 말고 한식" → 한식만)
+    spec.categories = [c for c in spec.categories if c not in spec.exclude_categories]
+
+    # 명시적인 가격 조건이 없을 때만 가격대를 숫자 범위로 반영
+    if spec.price_tier and not explicit_price:
+        low, high = PRICE_TIER_BOUNDS[spec.price_tier]
+        _set_bounds(spec, "price", low, high)
+
+    return spec
@@ -2,14 +2,25 @@
 Advanced RAG 체인: 검색 + LLM + 외부 API
 """
 
-from typing import List, Dict, Any, Optional, AsyncIterator
+from typing import List, Dict, Any, Optional, AsyncIterator, Callable, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
+import functools
 import os
 import time
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
-from app.vectorstore import get_vectorstore
-from app.utils import logger
+from app.vectorstore import get_vectorstore, normalize_query
+from app.preferences import SearchFilter, parse_preferences
+from app.answer_cache import SemanticAnswerCache
+from app.menu_lookup import MenuLookup
+from app.session_store import Message, history_to_messages
+from app.session_backends import create_session_store
+from app.llm import create_llm
+from app.metrics import observe_stage_times
+from app.tracing import record_span
+from app.utils import logger, get_env_int, get_env_float
 from dotenv import load_dotenv
 
 # 환경 변수 로드
@@ -21,19 +32,39 @@ class RAGChain:
     
     def __init__(self):
         """RAG 체인 초기화"""
-        # OpenAI LLM 초기화
+        # LLM 초기화 (LLM_PROVIDER: 기본 OpenAI gpt-4o-mini, fake면 네트워크 없는 로컬 대체 모델)
         # ChatOpenAI는 환경 변수 OPENAI_API_KEY를 자동으로 읽어옵니다
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",  # GPT-4o-mini 모델 사용
-            temperature=0.7,
-            max_tokens=500  # 응답 길이 제한으로 속도 개선
-        )
+        self.llm = create_llm()
         
         # 벡터 저장소 가져오기
         self.vectorstore = get_vectorstore()
         
-        # 대화 기록 관리 (간단한 리스트로 관리)
-        self.memories: Dict[str, List[BaseMessage]] = {}
+        # 임베딩/ChromaDB 같은 블로킹 작업 전용 스레드 풀
+        # (이벤트 루프를 막지 않도록 async 경로에서 사용, 크기로 동시 실행 수 제한)
+        self.executor = ThreadPoolExecutor(
+            max_workers=get_env_int("RETRIEVAL_WORKERS", 4),
+            thread_name_prefix="rag-retrieval"
+        )
+        
+        # 음식점명/메뉴명 직접 조회 (LLM 없는 빠른 경로, MENU_LOOKUP=0이면 비활성화)
+        self.menu_lookup: Optional[MenuLookup] = None
+        if get_env_int("MENU_LOOKUP", 1):
+            self.menu_lookup = MenuLookup(self.vectorstore.load_all_documents)
+        
+        # 답변 시맨틱 캐시 (ANSWER_CACHE_SIZE=0이면 비활성화)
+        self.answer_cache = SemanticAnswerCache(
+            max_size=get_env_int("ANSWER_CACHE_SIZE", 512),
+            ttl_seconds=get_env_float("ANSWER_CACHE_TTL", 600.0),
+            similarity_threshold=get_env_float("ANSWER_CACHE_THRESHOLD", 0.95)
+        )
+        
+        # 대화 기록 관리 (대화당 메시지 상한, 유휴 만료, 전체 LRU 제거)
+        # SESSION_BACKEND 설정으로 여러 워커가 공유하는 SQLite/Redis 백엔드 사용 가능
+        self.sessions = create_session_store(
+            max_messages=get_env_int("SESSION_MAX_MESSAGES", 20),
+            idle_ttl=get_env_float("SESSION_IDLE_TTL", 1800.0),
+            max_conversations=get_env_int("SESSION_MAX_CONVERSATIONS", 10000)
+        )
         
         # 프롬프트 템플릿 (간소화된 형식)
         self.prompt_template = ChatPromptTemplate.from_messages([
@@ -54,72 +85,24 @@ class RAGChain:
             ("human", "{question}")
         ])
     
-    def _get_memory(self, conversation_id: Optional[str] = None) -> List[BaseMessage]:
-        """대화 기록 가져오기 또는 생성"""
+    def _get_memory(self, conversation_id: Optional[str] = None) -> List[Message]:
+        """대화 기록 가져오기 (conversation_id가 없으면 저장된 기록 없음, 공유 백엔드는 블로킹 → 스레드 풀에서 호출)"""
         if conversation_id is None:
-            conversation_id = "default"
-        
-        if conversation_id not in self.memories:
-            self.memories[conversation_id] = []
-        
-        return self.memories[conversation_id]
+            return []
+        return self.sessions.get(conversation_id)
     
-    def _extract_preferences(self, question: str) -> Dict[str, Any]:
-        """질문에서 사용자 선호도 추출"""
-        preferences = {
-            "category": None,
-            "price_range": None,
-            "max_price": None,
-            "max_calories": None,
-            "keywords": []
-        }
+    def _remember(self, conversation_id: Optional[str], question: str, answer: str):
+        """
+        이번 질문/답변을 대화 기록에 추가 (conversation_id가 있을 때만)
         
-        question_lower = question.lower()
-        
-        # 카테고리 추출
-        categories = ["한식", "중식", "일식", "양식", "분식", "치킨", "피자", "카페"]
-        for cat in categories:
-            if cat in question:
-                preferences["category"] = cat
-                break
-        
-        # 가격 관련 키워드
-        price_keywords = {
-            "저렴": "low",
-            "싼": "low",
-            "저가": "low",
-            "비싼": "high",
-            "고급": "high",
-            "프리미엄": "high",
-            "적당한": "medium"
-        }
-        for keyword, range_type in price_keywords.items():
-            if keyword in question_lower:
-                preferences["price_range"] = range_type
-                break
-        
-        # 가격 숫자 추출 (예: "1만원 이하", "15000원")
-        import re
-        price_matches = re.findall(r'(\d+)\s*만?\s*원', question)
-        if price_matches:
-            try:
-                price = int(price_matches[0])
-                if "만" in question or price > 1000:
-                    price = price * 10000 if price < 1000 else price
-                preferences["max_price"] = price
-            except ValueError:
-                pass
-        
-        # 칼로리 관련
-        if "칼로리" in question or "다이어트" in question_lower or "저칼로리" in question_lower:
-            calorie_matches = re.findall(r'(\d+)\s*칼로리', question)
-            if calorie_matches:
-                try:
-                    preferences["max_calories"] = int(calorie_matches[0])
-                except ValueError:
-                    pass
-        
-        return preferences
+        추가는 백엔드 조회 없이 write-behind 대기열에만 넣으므로 이벤트 루프에서 바로 호출해도 됨
+        """
+        if conversation_id is not None:
+            self.sessions.append(conversation_id, [("user", question), ("assistant", answer)])
+    
+    def _extract_preferences(self, question: str) -> SearchFilter:
+        """질문에서 사용자 선호도를 검색 필터 스펙으로 추출 (app/preferences.py)"""
+        return parse_preferences(question)
     
     def _format_context(self, search_results: List[Dict[str, Any]]) -> str:
         """검색 결과를 컨텍스트 문자열로 변환 (간소화된 형식)"""
@@ -155,6 +138,191 @@ class RAGChain:
         
         return "\n".join(context_parts)
     
+    async def run_in_executor(self, func: Callable, *args, **kwargs):
+        """
+        블로킹 함수를 검색 전용 스레드 풀에서 실행하고 결과를 기다림
+        
+        run_in_executor는 contextvars를 넘기지 않으므로 현재 컨텍스트를 복사해 실행
+        (스레드 안에서 기록한 추적 구간이 같은 요청에 붙도록, app/tracing.py)
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self.executor,
+            functools.partial(context.run, func, *args, **kwargs)
+        )
+    
+    def _retrieve(self, question: str, preferences: SearchFilter) -> List[Dict[str, Any]]:
+        """선호도 필터를 벡터 저장소에 그대로 전달하여 검색 (조건이 없으면 일반 검색, 블로킹)"""
+        return self.vectorstore.search(question, preferences, k=5)  # 8 → 5로 줄여서 프롬프트 길이 단축
+    
+    def _prepare_memory(
+        self,
+        conversation_id: Optional[str],
+        history: Optional[List[Dict[str, str]]]
+    ) -> List[Message]:
+        """
+        대화 기록 준비
+        
+        클라이언트가 history를 보내면 그것이 기준이므로 저장된 기록을 교체하고
+        (매 요청마다 다시 추가하지 않음), 없으면 서버에 저장된 기록을 사용
+        """
+        if history:
+            messages = history_to_messages(history)
+            if conversation_id is not None:
+                self.sessions.replace(conversation_id, messages)
+            return messages
+        return self._get_memory(conversation_id)
+    
+    def _build_prompt(self, question: str, context: str, memory: List[Message]) -> List[BaseMessage]:
+        """컨텍스트와 최근 대화 기록으로 프롬프트 메시지 생성"""
+        recent = memory[-6:] if len(memory) > 6 else memory  # 최근 6개만
+        # 프롬프트 조립 시점에만 LangChain 메시지 객체로 변환
+        chat_history = [
+            HumanMessage(content=content) if role == "user" else AIMessage(content=content)
+            for role, content in recent
+        ]
+        return self.prompt_template.format_messages(
+            context=context,
+            history="\n".join([f"{'사용자' if role == 'user' else '챗봇'}: {content}" 
+                              for role, content in recent]),
+            question=question,
+            chat_history=chat_history
+        )
+    
+    def _build_result(self, answer: str, search_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """답변과 검색 결과로 소스 정보 및 추천 메뉴 구성"""
+        sources = []
+        recommended_menus = []
+        
+        for r in search_results[:5]:  # 상위 5개만 추천
+            metadata = r.get("metadata", {})
+            source_info = {
+                "content": r.get("content", ""),
+                "metadata": metadata,
+                "score": r.get("score")
+            }
+            sources.append(source_info)
+            
+            # 추천 메뉴 정보 추출
+            if metadata.get("menu_name") and metadata.get("restaurant_name"):
+                recommended_menus.append({
+                    "restaurant_name": metadata.get("restaurant_name", ""),
+                    "menu_name": metadata.get("menu_name", ""),
+                    "price": str(metadata.get("price", "")),
+                    "calories": str(metadata.get("calories", "")),
+                    "address": metadata.get("address", ""),
+                    "category": metadata.get("category", ""),
+                    "score": r.get("score")
+                })
+        
+        return {
+            "response": answer,
+            "sources": sources,
+            "recommended_menus": recommended_menus
+        }
+    
+    def _lookup_answer_cache(
+        self,
+        question: str,
+        preferences: SearchFilter,
+        search_results: List[Dict[str, Any]],
+        memory: List[Message]
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        답변 캐시 조회 (블로킹: 질문 임베딩 사용)
+        
+        대화 기록이 있으면 문맥에 따라 답이 달라지므로 캐시를 사용하지 않음
+        어휘 인덱스 강한 일치로 임베딩 없이 검색된 경우(score가 없음)는
+        임베딩을 새로 계산하지 않고 정규화된 질문 텍스트 완전 일치로만 조회
+        
+        Returns:
+            (캐시 키, 캐시된 답변) - 캐시 대상이 아니면 (None, None)
+        """
+        if not self.answer_cache.enabled or memory or not search_results:
+            return None, None
+        
+        # 검색 단계에서 이미 계산되어 임베딩 LRU 캐시에 있으므로 추가 추론 없음
+        embedding = None
+        if any(r.get("score") is not None for r in search_results):
+            embedding = self.vectorstore.embed_query(question)
+        menu_ids = [
+            f"{r.get('metadata', {}).get('restaurant_id', '')}:{r.get('metadata', {}).get('menu_id', '')}"
+            for r in search_results
+        ]
+        cache_key = {
+            "query_embedding": embedding,
+            "preferences": preferences.to_dict(),
+            "menu_ids": menu_ids,
+            "text": normalize_query(question)
+        }
+        return cache_key, self.answer_cache.get(**cache_key)
+    
+    def _store_answer_cache(self, cache_key: Optional[Dict[str, Any]], answer: str):
+        """LLM 답변을 캐시에 저장 (캐시 대상인 경우만)"""
+        if cache_key is not None:
+            self.answer_cache.put(answer=answer, **cache_key)
+    
+    def _cached_result(
+        self,
+        question: str,
+        answer: str,
+        search_results: List[Dict[str, Any]],
+        conversation_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """캐시된 답변으로 결과 구성 (대화 기록에도 추가)"""
+        logger.info(f"답변 캐시 히트: {question} (히트율: {self.answer_cache.stats()['hit_rate']:.1%})")
+        self._remember(conversation_id, question, answer)
+        result = self._build_result(answer, search_results)
+        result["cached"] = True
+        return result
+    
+    def lookup_direct_answer(
+        self,
+        question: str,
+        conversation_id: Optional[str] = None,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        메타데이터만으로 답할 수 있는 질문이면 LLM 없이 템플릿 답변 반환 (app/menu_lookup.py)
+        
+        예: "전주한정식 비빔밥 가격 얼마야?" → 임베딩/검색/LLM 호출 없이 1ms 이내
+        확실하지 않으면 None → invoke/stream으로 처리
+        질문 검증(validate_question)을 통과한 질문에만 호출 (블로킹: 이벤트 루프에서는 run_in_executor로 실행)
+        """
+        if self.menu_lookup is None:
+            return None
+        start = time.time()
+        try:
+            hit = self.menu_lookup.lookup(question)
+        except Exception as e:
+            logger.error(f"메뉴 직접 조회 실패: {e}")
+            return None
+        if hit is None:
+            return None
+        
+        answer, search_results = hit
+        logger.info(f"메뉴 직접 조회 히트: {question} ({(time.time() - start) * 1000:.2f}ms)")
+        # 클라이언트가 보낸 history가 기준이면 동기화만 함 (저장된 기록은 답변에 쓰지 않으므로 조회하지 않음)
+        if history and conversation_id is not None:
+            self.sessions.replace(conversation_id, history_to_messages(history))
+        self._remember(conversation_id, question, answer)
+        result = self._build_result(answer, search_results)
+        result["direct"] = True
+        return result
+    
+    def _log_step_times(self, step_times: Dict[str, float], path: str):
+        """단계별 시간 로그 출력 및 메트릭 기록 (path: invoke/ainvoke/stream)"""
+        observe_stage_times(path, step_times)
+        total_time = step_times.get('total', step_times.get('pre_llm_total', 0.0))
+        logger.info("=" * 60)
+        logger.info("단계별 응답 시간 분석")
+        logger.info("=" * 60)
+        for step, elapsed in step_times.items():
+            percentage = (elapsed / total_time * 100) if total_time > 0 else 0
+            logger.info(f"  {step:25s}: {elapsed:6.2f}초 ({percentage:5.1f}%)")
+        logger.info("=" * 60)
+    
     def invoke(
         self,
         question: str,
@@ -180,24 +348,15 @@ class RAGChain:
             start = time.time()
             preferences = self._extract_preferences(question)
             step_times['preference_extraction'] = time.time() - start
+            record_span("preference_extraction", start)
             logger.info(f"추출된 선호도: {preferences}")
             
             # 2. 벡터 검색 (필터링 적용)
             start = time.time()
             logger.info(f"질문 검색 중: {question}")
-            if preferences.get("category") or preferences.get("max_price") or preferences.get("max_calories"):
-                # 필터링 검색 사용
-                search_results = self.vectorstore.search_with_filters(
-                    query=question,
-                    category=preferences.get("category"),
-                    max_price=preferences.get("max_price"),
-                    max_calories=preferences.get("max_calories"),
-                    k=5  # 8 → 5로 줄여서 프롬프트 길이 단축
-                )
-            else:
-                # 일반 검색
-                search_results = self.vectorstore.similarity_search(question, k=5)  # 8 → 5로 줄임
+            search_results = self._retrieve(question, preferences)
             step_times['vector_search'] = time.time() - start
+            record_span("retrieval", start)
             
             # 3. 컨텍스트 포맷팅
             start = time.time()
@@ -206,29 +365,24 @@ class RAGChain:
             
             # 4. 대화 기록 준비
             start = time.time()
-            memory = self._get_memory(conversation_id)
-            
-            # history가 제공되면 메모리에 추가
-            if history:
-                for msg in history:
-                    if msg.get("role") == "user":
-                        memory.append(HumanMessage(content=msg.get("content", "")))
-                    elif msg.get("role") == "assistant":
-                        memory.append(AIMessage(content=msg.get("content", "")))
+            memory = self._prepare_memory(conversation_id, history)
             step_times['memory_preparation'] = time.time() - start
             
-            # 5. 프롬프트 생성
+            # 4-1. 답변 캐시 조회 (히트 시 LLM 호출 생략)
             start = time.time()
-            chat_history = memory[-6:] if len(memory) > 6 else memory  # 최근 6개만
+            cache_key, cached_answer = self._lookup_answer_cache(question, preferences, search_results, memory)
+            step_times['answer_cache_lookup'] = time.time() - start
+            record_span("answer_cache_lookup", start)
+            if cached_answer is not None:
+                step_times['total'] = time.time() - total_start
+                self._log_step_times(step_times, "invoke")
+                return self._cached_result(question, cached_answer, search_results, conversation_id)
             
-            prompt = self.prompt_template.format_messages(
-                context=context,
-                history="\n".join([f"{'사용자' if isinstance(m, HumanMessage) else '챗봇'}: {m.content}" 
-                                  for m in chat_history]),
-                question=question,
-                chat_history=chat_history
-            )
+            # 5. 프롬프트 생성
+            start = time.time()
+            prompt = self._build_prompt(question, context, memory)
             step_times['prompt_creation'] = time.time() - start
+            record_span("prompt_build", start)
             
             # 6. LLM 호출
             start = time.time()
@@ -236,56 +390,22 @@ class RAGChain:
             response = self.llm.invoke(prompt)
             answer = response.content if hasattr(response, 'content') else str(response)
             step_times['llm_call'] = time.time() - start
+            record_span("llm_completion", start)
+            self._store_answer_cache(cache_key, answer)
             
             # 7. 대화 기록에 추가
             start = time.time()
-            memory.append(HumanMessage(content=question))
-            memory.append(AIMessage(content=answer))
+            self._remember(conversation_id, question, answer)
             
             # 8. 소스 정보 및 추천 메뉴 준비
-            sources = []
-            recommended_menus = []
-            
-            for r in search_results[:5]:  # 상위 5개만 추천
-                metadata = r.get("metadata", {})
-                source_info = {
-                    "content": r.get("content", ""),
-                    "metadata": metadata,
-                    "score": r.get("score")
-                }
-                sources.append(source_info)
-                
-                # 추천 메뉴 정보 추출
-                if metadata.get("menu_name") and metadata.get("restaurant_name"):
-                    recommended_menus.append({
-                        "restaurant_name": metadata.get("restaurant_name", ""),
-                        "menu_name": metadata.get("menu_name", ""),
-                        "price": str(metadata.get("price", "")),
-                        "calories": str(metadata.get("calories", "")),
-                        "address": metadata.get("address", ""),
-                        "category": metadata.get("category", ""),
-                        "score": r.get("score")
-                    })
+            result = self._build_result(answer, search_results)
             step_times['result_preparation'] = time.time() - start
             
-            # 총 시간 계산
-            total_time = time.time() - total_start
-            step_times['total'] = total_time
+            # 총 시간 계산 및 단계별 시간 로그 출력
+            step_times['total'] = time.time() - total_start
+            self._log_step_times(step_times, "invoke")
             
-            # 단계별 시간 로그 출력
-            logger.info("=" * 60)
-            logger.info("단계별 응답 시간 분석")
-            logger.info("=" * 60)
-            for step, elapsed in step_times.items():
-                percentage = (elapsed / total_time * 100) if total_time > 0 else 0
-                logger.info(f"  {step:25s}: {elapsed:6.2f}초 ({percentage:5.1f}%)")
-            logger.info("=" * 60)
-            
-            return {
-                "response": answer,
-                "sources": sources,
-                "recommended_menus": recommended_menus
-            }
+            return result
             
         except Exception as e:
             logger.error(f"RAG 체인 실행 오류: {e}", exc_info=True)
@@ -294,64 +414,196 @@ class RAGChain:
                 "sources": []
             }
     
-    async def stream(
+    async def ainvoke(
         self,
         question: str,
         conversation_id: Optional[str] = None,
         history: Optional[List[Dict[str, str]]] = None
-    ) -> AsyncIterator[str]:
+    ) -> Dict[str, Any]:
         """
-        스트리밍 방식으로 답변 생성
+        invoke의 비동기 버전 (이벤트 루프를 막지 않음)
+        
+        - 임베딩 + ChromaDB 검색은 검색 전용 스레드 풀에서 실행
+        - LLM은 llm.ainvoke로 비동기 호출
         
         Args:
             question: 사용자 질문
             conversation_id: 대화 ID (선택사항)
             history: 대화 기록 (선택사항)
         
-        Yields:
-            답변의 청크 문자열
+        Returns:
+            답변과 소스 정보를 포함한 딕셔너리
         """
         try:
+            step_times = {}
+            total_start = time.time()
+            
             # 1. 사용자 선호도 추출
+            start = time.time()
             preferences = self._extract_preferences(question)
+            step_times['preference_extraction'] = time.time() - start
+            record_span("preference_extraction", start)
+            logger.info(f"추출된 선호도: {preferences}")
             
-            # 2. 벡터 검색 (필터링 적용)
-            if preferences.get("category") or preferences.get("max_price") or preferences.get("max_calories"):
-                search_results = self.vectorstore.search_with_filters(
-                    query=question,
-                    category=preferences.get("category"),
-                    max_price=preferences.get("max_price"),
-                    max_calories=preferences.get("max_calories"),
-                    k=5  # 8 → 5로 줄여서 프롬프트 길이 단축
-                )
-            else:
-                search_results = self.vectorstore.similarity_search(question, k=5)  # 8 → 5로 줄임
+            # 2. 벡터 검색 (스레드 풀에서 실행)
+            start = time.time()
+            logger.info(f"질문 검색 중: {question}")
+            search_results = await self.run_in_executor(self._retrieve, question, preferences)
+            step_times['vector_search'] = time.time() - start
+            record_span("retrieval", start)
             
+            # 3. 컨텍스트 포맷팅
+            start = time.time()
             context = self._format_context(search_results)
+            step_times['context_formatting'] = time.time() - start
             
-            # 2. 대화 기록 준비
-            memory = self._get_memory(conversation_id)
-            if history:
-                for msg in history:
-                    if msg.get("role") == "user":
-                        memory.append(HumanMessage(content=msg.get("content", "")))
-                    elif msg.get("role") == "assistant":
-                        memory.append(AIMessage(content=msg.get("content", "")))
-            
-            chat_history = memory[-6:] if len(memory) > 6 else memory
+            # 4. 대화 기록 준비
+            start = time.time()
+            memory = await self.run_in_executor(self._prepare_memory, conversation_id, history)
+            step_times['memory_preparation'] = time.time() - start
             
-            # 3. 프롬프트 생성
-            prompt = self.prompt_template.format_messages(
-                context=context,
-                history="\n".join([f"{'사용자' if isinstance(m, HumanMessage) else '챗봇'}: {m.content}" 
-                                  for m in chat_history]),
-                question=question,
-                chat_history=chat_history
+            # 4-1. 답변 캐시 조회 (히트 시 LLM 호출 생략)
+            start = time.time()
+            cache_key, cached_answer = await self.run_in_executor(
+                self._lookup_answer_cache, question, preferences, search_results, memory
             )
+            step_times['answer_cache_lookup'] = time.time() - start
+            record_span("answer_cache_lookup", start)
+            if cached_answer is not None:
+                step_times['total'] = time.time() - total_start
+                self._log_step_times(step_times, "ainvoke")
+                return self._cached_result(question, cached_answer, search_results, conversation_id)
+            
+            # 5. 프롬프트 생성
+            start = time.time()
+            prompt = self._build_prompt(question, context, memory)
+            step_times['prompt_creation'] = time.time() - start
+            record_span("prompt_build", start)
+            
+            # 6. LLM 비동기 호출
+            start = time.time()
+            logger.info("LLM 호출 중...")
+            response = await self.llm.ainvoke(prompt)
+            answer = response.content if hasattr(response, 'content') else str(response)
+            step_times['llm_call'] = time.time() - start
+            record_span("llm_completion", start)
+            self._store_answer_cache(cache_key, answer)
+            
+            # 7. 대화 기록에 추가 및 결과 준비
+            start = time.time()
+            self._remember(conversation_id, question, answer)
+            result = self._build_result(answer, search_results)
+            step_times['result_preparation'] = time.time() - start
             
-            # 4. 스트리밍 호출
+            step_times['total'] = time.time() - total_start
+            self._log_step_times(step_times, "ainvoke")
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"RAG 체인 실행 오류: {e}", exc_info=True)
+            return {
+                "response": f"죄송합니다. 오류가 발생했습니다: {str(e)}",
+                "sources": []
+            }
+    
+    async def astream_with_sources(
+        self,
+        question: str,
+        conversation_id: Optional[str] = None,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
+        """
+        한 번만 검색하고, 검색 결과와 답변 스트림을 함께 반환
+        
+        LLM이 실제로 본 컨텍스트와 클라이언트에 보여줄 소스가 항상 같도록
+        검색을 한 번만 수행하고 그 결과를 그대로 노출함
+        
+        Args:
+            question: 사용자 질문
+            conversation_id: 대화 ID (선택사항)
+            history: 대화 기록 (선택사항)
+        
+        Returns:
+            {"sources": [...], "recommended_menus": [...], "stream": 답변 청크 AsyncIterator}
+        """
+        step_times = {}
+        total_start = time.time()
+        
+        # 1. 사용자 선호도 추출
+        start = time.time()
+        preferences = self._extract_preferences(question)
+        step_times['preference_extraction'] = time.time() - start
+        record_span("preference_extraction", start)
+        
+        # 2. 벡터 검색 (스레드 풀에서 실행하여 이벤트 루프 블로킹 방지)
+        start = time.time()
+        search_results = await self.run_in_executor(self._retrieve, question, preferences)
+        step_times['vector_search'] = time.time() - start
+        record_span("retrieval", start)
+        start = time.time()
+        context = self._format_context(search_results)
+        step_times['context_formatting'] = time.time() - start
+        
+        # 3. 대화 기록 준비
+        start = time.time()
+        memory = await self.run_in_executor(self._prepare_memory, conversation_id, history)
+        step_times['memory_preparation'] = time.time() - start
+        
+        # 3-1. 답변 캐시 조회 (히트 시 캐시된 답변을 청크로 나눠 재생)
+        start = time.time()
+        cache_key, cached_answer = await self.run_in_executor(
+            self._lookup_answer_cache, question, preferences, search_results, memory
+        )
+        step_times['answer_cache_lookup'] = time.time() - start
+        record_span("answer_cache_lookup", start)
+        if cached_answer is not None:
+            step_times['total'] = time.time() - total_start
+            self._log_step_times(step_times, "stream")
+            result = self._cached_result(question, cached_answer, search_results, conversation_id)
+            result["stream"] = self._replay_answer(cached_answer)
+            return result
+        
+        # 4. 프롬프트 생성
+        start = time.time()
+        prompt = self._build_prompt(question, context, memory)
+        step_times['prompt_creation'] = time.time() - start
+        record_span("prompt_build", start)
+        
+        # 스트리밍 전 단계 시간 (LLM 시간과 요청 전체 total은 스트림이 끝난 뒤 _stream_answer에서 기록)
+        step_times['pre_llm_total'] = time.time() - total_start
+        self._log_step_times(step_times, "stream")
+        
+        result = self._build_result("", search_results)
+        result["stream"] = self._stream_answer(question, prompt, conversation_id, cache_key, total_start)
+        return result
+    
+    async def _replay_answer(self, answer: str, chunk_size: int = 20) -> AsyncIterator[str]:
+        """캐시된 답변을 SSE 청크 단위로 나눠 전달"""
+        for start in range(0, len(answer), chunk_size):
+            yield answer[start:start + chunk_size]
+    
+    async def _stream_answer(
+        self,
+        question: str,
+        prompt: List[BaseMessage],
+        conversation_id: Optional[str],
+        cache_key: Optional[Dict[str, Any]] = None,
+        total_start: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        준비된 프롬프트로 LLM 스트리밍 호출 후 대화 기록 및 답변 캐시에 추가
+        
+        total_start(astream_with_sources 시작 시각)가 있으면 스트림 종료 시점까지를 total로 기록
+        (invoke/ainvoke의 total과 같은 의미)
+        """
+        try:
             full_response = ""
+            start = time.time()
+            first_token_time = None
             async for chunk in self.llm.astream(prompt):
+                if first_token_time is None:
+                    first_token_time = time.time() - start
                 # chunk가 AIMessageChunk인 경우 처리
                 if hasattr(chunk, 'content'):
                     content = chunk.content
@@ -370,13 +622,50 @@ class RAGChain:
                     full_response += content
                     yield content
             
-            # 5. 대화 기록에 추가
-            memory.append(HumanMessage(content=question))
-            memory.append(AIMessage(content=full_response))
+            # 첫 토큰까지 시간(TTFT)과 전체 생성 시간 기록
+            stream_times = {'llm_call': time.time() - start}
+            if first_token_time is not None:
+                stream_times['llm_first_token'] = first_token_time
+                record_span("llm_ttft", start, start + first_token_time)
+            record_span("llm_completion", start)
+            if total_start is not None:
+                stream_times['total'] = time.time() - total_start
+            observe_stage_times("stream", stream_times)
+            
+            # 대화 기록 및 답변 캐시에 추가
+            self._remember(conversation_id, question, full_response)
+            self._store_answer_cache(cache_key, full_response)
             
         except Exception as e:
             logger.error(f"스트리밍 오류: {e}", exc_info=True)
             yield f"죄송합니다. 오류가 발생했습니다: {str(e)}"
+    
+    async def stream(
+        self,
+        question: str,
+        conversation_id: Optional[str] = None,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        """
+        스트리밍 방식으로 답변 생성 (소스가 필요 없을 때)
+        
+        Args:
+            question: 사용자 질문
+            conversation_id: 대화 ID (선택사항)
+            history: 대화 기록 (선택사항)
+        
+        Yields:
+            답변의 청크 문자열
+        """
+        try:
+            result = await self.astream_with_sources(question, conversation_id, history)
+        except Exception as e:
+            logger.error(f"스트리밍 오류: {e}", exc_info=True)
+            yield f"죄송합니다. 오류가 발생했습니다: {str(e)}"
+            return
+        
+        async for chunk in result["stream"]:
+            yield chunk
 
 
 # 싱글톤 인스턴스
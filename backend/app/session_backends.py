@@ -0,0 +1,498 @@
+"""
+공유 세션 저장소 백엔드 (여러 워커/노드가 대화 기록 공유)
+
+이 파일의 역할:
+- 대화 기록을 프로세스 밖(SQLite 파일 또는 Redis 프로토콜 서버)에 저장
+- SESSION_BACKEND 설정으로 memory / sqlite / redis 중 선택
+- 쓰기는 배치 write-behind로 처리하여 요청 처리 경로가 디스크/네트워크를 기다리지 않음
+- 워커별 read-through 캐시로 같은 대화의 연속 요청은 백엔드 조회 없이 처리
+
+왜 필요한가:
+- 대화 기록이 RAGChain 싱글톤의 메모리에만 있으면
+  uvicorn --workers 4 또는 여러 노드 환경에서 후속 질문이 다른 워커로 가면 기록이 없음
+- sticky session 없이 수평 확장하기 위해 워커 간 공유 저장소가 필요
+
+작동 원리:
+- 변경은 (append/replace/delete) 작업 단위로 순서대로 대기열에 쌓고 배치로 기록
+- append는 대화 전체를 다시 쓰지 않고 메시지만 원자적으로 추가
+  (SQLite: 메시지당 한 행 INSERT, Redis: RPUSH + LTRIM)
+  → 여러 워커가 같은 대화에 동시에 추가해도 턴이 사라지지 않음
+- append/replace/delete는 백엔드 I/O가 없고, 캐시 미스 시 get()만 백엔드를 조회하므로
+  RAGChain은 get()을 스레드 풀에서 호출함 (이벤트 루프 블로킹 방지)
+- 대화당 메시지 수(max_messages), 유휴 만료(idle_ttl), 전체 대화 수(max_conversations)를
+  백엔드에서도 적용 (오래 사용되지 않은 대화부터 제거)
+
+주요 클래스:
+- SQLiteSessionBackend: 로컬 SQLite (WAL 모드) - 같은 서버의 여러 워커가 공유
+- RedisSessionBackend: Redis 프로토콜 서버 (Redis, KeyDB, Dragonfly 등) - 여러 노드가 공유
+- SharedSessionStore: SessionStore와 같은 인터페이스 + read-through 캐시 + write-behind
+- create_session_store(): 설정에 맞는 세션 저장소 생성
+
+설정 (환경 변수):
+- SESSION_BACKEND: memory(기본) / sqlite / redis
+- SESSION_SQLITE_PATH: SQLite 파일 경로 (기본: backend/sessions.sqlite3)
+- SESSION_REDIS_URL: Redis 접속 URL (기본: redis://localhost:6379/0)
+- SESSION_FLUSH_INTERVAL_MS: write-behind 배치 주기 (기본 50ms)
+- SESSION_CACHE_TTL: 워커 로컬 캐시 유효 시간 (기본 2초)
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+from app.session_store import SessionStore, Message
+from app.utils import logger, BASE_DIR, get_env_optional, get_env_float
+
+# Redis 백엔드는 선택 설치
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+
+# 대기열 작업: (종류, conversation_id, 메시지 목록) - 종류는 "append" / "replace" / "delete"
+Operation = Tuple[str, str, List[Message]]
+
+
+def _encode_message(message: Message) -> str:
+    return json.dumps(list(message), ensure_ascii=False, separators=(",", ":"))
+
+
+def _decode_message(raw: Any) -> Message:
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8")
+    role, content = json.loads(raw)
+    return role, content
+
+
+def _apply(messages: Optional[List[Message]], operation: Operation, max_messages: int) -> Optional[List[Message]]:
+    """작업 하나를 메시지 목록에 적용 (None = 대화 없음)"""
+    kind, _, new_messages = operation
+    if kind == "delete":
+        return None
+    if kind == "replace":
+        return list(new_messages)[-max_messages:]
+    return ((messages or []) + list(new_messages))[-max_messages:]
+
+
+class SessionBackend:
+    """
+    세션 백엔드 기본 클래스 (write-behind 공통 로직)
+
+    append()/replace()/delete()는 대기열에 넣기만 하고 바로 반환하며,
+    백그라운드 스레드가 flush_interval마다 대기 중인 작업을 순서대로 한 번에 기록함
+    """
+
+    def __init__(
+        self,
+        idle_ttl: float,
+        max_messages: int = 20,
+        max_conversations: int = 10000,
+        flush_interval: float = 0.05
+    ):
+        self.idle_ttl = idle_ttl
+        self.max_messages = max(1, max_messages)
+        self.max_conversations = max(1, max_conversations)
+        self.flush_interval = flush_interval
+        self._pending: List[Operation] = []
+        self._pending_lock = threading.Lock()
+        # 기록 중에는 조회하지 않음 (대기열에서 꺼낸 작업이 아직 백엔드에 없는 순간 방지)
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self.flushes = 0
+        self.written = 0
+        self.evictions = 0
+        self._writer = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._writer.start()
+
+    # ----- 하위 클래스 구현 -----
+    def _load(self, conversation_id: str) -> Optional[List[Message]]:
+        raise NotImplementedError
+
+    def _write_batch(self, operations: List[Operation]):
+        raise NotImplementedError
+
+    # ----- 공통 로직 -----
+    def load(self, conversation_id: str) -> Optional[List[Message]]:
+        """대화 기록 조회 (블로킹, 아직 기록되지 않은 이 워커의 작업도 반영)"""
+        with self._flush_lock:
+            messages = self._load(conversation_id)
+            with self._pending_lock:
+                operations = [op for op in self._pending if op[1] == conversation_id]
+        for operation in operations:
+            messages = _apply(messages, operation, self.max_messages)
+        return messages
+
+    def _enqueue(self, operation: Operation):
+        with self._pending_lock:
+            self._pending.append(operation)
+
+    def append(self, conversation_id: str, messages: List[Message]):
+        """메시지 추가 예약 (write-behind, 원자적 추가)"""
+        self._enqueue(("append", conversation_id, list(messages)))
+
+    def replace(self, conversation_id: str, messages: List[Message]):
+        """대화 기록 전체 교체 예약 (write-behind)"""
+        self._enqueue(("replace", conversation_id, list(messages)[-self.max_messages:]))
+
+    def delete(self, conversation_id: str):
+        """대화 삭제 예약 (write-behind)"""
+        self._enqueue(("delete", conversation_id, []))
+
+    def pending_count(self) -> int:
+        with self._pending_lock:
+            return len(self._pending)
+
+    def flush(self):
+        """대기 중인 작업을 순서대로 즉시 기록"""
+        with self._flush_lock:
+            with self._pending_lock:
+                operations, self._pending = self._pending, []
+            if not operations:
+                return
+            try:
+                self._write_batch(operations)
+                self.flushes += 1
+                self.written += len(operations)
+            except Exception as e:
+                logger.error(f"세션 저장 실패 ({len(operations)}건): {e}")
+                # 실패한 작업은 순서를 유지하여 대기열 앞쪽에 다시 넣음
+                with self._pending_lock:
+                    self._pending = operations + self._pending
+
+    def _run(self):
+        """flush_interval마다 대기 중인 작업을 배치로 기록"""
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def close(self):
+        """남은 작업을 기록하고 백그라운드 스레드 종료"""
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join(timeout=5)
+        self.flush()
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    로컬 SQLite 세션 백엔드 (WAL 모드)
+
+    WAL 모드에서는 한 워커가 쓰는 동안에도 다른 워커들이 읽을 수 있으므로
+    같은 서버의 uvicorn 워커들이 하나의 파일을 공유하기에 적합
+    메시지는 한 행씩 저장하므로 추가는 INSERT만 하면 됨 (대화 전체를 다시 쓰지 않음)
+    """
+
+    def __init__(self, path: Path, idle_ttl: float, **kwargs):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._last_purge = 0.0
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS conversations ("
+            "conversation_id TEXT PRIMARY KEY, "
+            "updated_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_conversations_updated_at ON conversations(updated_at)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS conversation_messages ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "conversation_id TEXT NOT NULL, "
+            "role TEXT NOT NULL, "
+            "content TEXT NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_conversation_messages_id_seq "
+            "ON conversation_messages(conversation_id, seq)"
+        )
+        conn.commit()
+        super().__init__(idle_ttl=idle_ttl, **kwargs)
+
+    def _connection(self) -> sqlite3.Connection:
+        """스레드별 SQLite 연결"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=5.0)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _load(self, conversation_id: str) -> Optional[List[Message]]:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT updated_at FROM conversations WHERE conversation_id = ?",
+            (conversation_id,)
+        ).fetchone()
+        if row is None or time.time() - row[0] >= self.idle_ttl:
+            return None
+        rows = conn.execute(
+            "SELECT role, content FROM conversation_messages WHERE conversation_id = ? ORDER BY seq",
+            (conversation_id,)
+        ).fetchall()
+        return [(role, content) for role, content in rows][-self.max_messages:]
+
+    @staticmethod
+    def _delete_conversations(conn: sqlite3.Connection, conversation_ids: List[str]):
+        params = [(cid,) for cid in conversation_ids]
+        conn.executemany("DELETE FROM conversation_messages WHERE conversation_id = ?", params)
+        conn.executemany("DELETE FROM conversations WHERE conversation_id = ?", params)
+
+    def _write_batch(self, operations: List[Operation]):
+        now = time.time()
+        conn = self._connection()
+        touched = set()
+        with conn:
+            for kind, conversation_id, messages in operations:
+                if kind == "delete":
+                    self._delete_conversations(conn, [conversation_id])
+                    touched.discard(conversation_id)
+                    continue
+                if kind == "replace":
+                    conn.execute("DELETE FROM conversation_messages WHERE conversation_id = ?", (conversation_id,))
+                conn.executemany(
+                    "INSERT INTO conversation_messages (conversation_id, role, content) VALUES (?, ?, ?)",
+                    [(conversation_id, role, content) for role, content in messages]
+                )
+                conn.execute(
+                    "INSERT INTO conversations (conversation_id, updated_at) VALUES (?, ?) "
+                    "ON CONFLICT(conversation_id) DO UPDATE SET updated_at = excluded.updated_at",
+                    (conversation_id, now)
+                )
+                touched.add(conversation_id)
+
+            # 대화당 최근 max_messages개만 유지 (이번 배치에서 바뀐 대화만)
+            conn.executemany(
+                "DELETE FROM conversation_messages WHERE conversation_id = ? AND seq <= ("
+                "SELECT seq FROM conversation_messages WHERE conversation_id = ? "
+                "ORDER BY seq DESC LIMIT 1 OFFSET ?)",
+                [(cid, cid, self.max_messages) for cid in touched]
+            )
+
+            # 전체 대화 수 상한 (오래 사용되지 않은 대화부터 제거)
+            overflow = [row[0] for row in conn.execute(
+                "SELECT conversation_id FROM conversations ORDER BY updated_at DESC LIMIT -1 OFFSET ?",
+                (self.max_conversations,)
+            )]
+            if overflow:
+                self._delete_conversations(conn, overflow)
+                self.evictions += len(overflow)
+
+            # 만료된 대화 정리 (1분에 한 번)
+            if now - self._last_purge > 60:
+                expired = [row[0] for row in conn.execute(
+                    "SELECT conversation_id FROM conversations WHERE updated_at < ?",
+                    (now - self.idle_ttl,)
+                )]
+                self._delete_conversations(conn, expired)
+                self._last_purge = now
+
+
+class RedisSessionBackend(SessionBackend):
+    """
+    Redis 프로토콜 세션 백엔드
+
+    대화 하나를 리스트 키 하나로 저장 (RPUSH로 원자적 추가, LTRIM으로 최근 max_messages개 유지)
+    EXPIRE로 유휴 만료, 정렬 집합(최근 사용 시각)으로 전체 대화 수 상한을 처리
+    배치 기록은 MULTI 파이프라인 한 번으로 전송
+    """
+
+    def __init__(self, url: str, idle_ttl: float, prefix: str = "chat:session:", **kwargs):
+        if not HAS_REDIS:
+            raise RuntimeError("redis 패키지가 설치되지 않았습니다 (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.index_key = prefix + "_index"
+        super().__init__(idle_ttl=idle_ttl, **kwargs)
+
+    def _load(self, conversation_id: str) -> Optional[List[Message]]:
+        raw = self.client.lrange(self.prefix + conversation_id, -self.max_messages, -1)
+        return [_decode_message(item) for item in raw] if raw else None
+
+    def _write_batch(self, operations: List[Operation]):
+        now = time.time()
+        ttl = max(1, int(self.idle_ttl))
+        pipe = self.client.pipeline(transaction=True)
+        for kind, conversation_id, messages in operations:
+            key = self.prefix + conversation_id
+            if kind == "delete":
+                pipe.delete(key)
+                pipe.zrem(self.index_key, conversation_id)
+                continue
+            if kind == "replace":
+                pipe.delete(key)
+            if messages:
+                pipe.rpush(key, *[_encode_message(m) for m in messages])
+            pipe.ltrim(key, -self.max_messages, -1)
+            pipe.expire(key, ttl)
+            pipe.zadd(self.index_key, {conversation_id: now})
+        # 만료된 대화는 색인에서도 제거
+        pipe.zremrangebyscore(self.index_key, "-inf", now - self.idle_ttl)
+        pipe.execute()
+        self._evict_overflow()
+
+    def _evict_overflow(self):
+        """전체 대화 수 상한 (ZPOPMIN은 원자적이므로 여러 워커가 동시에 실행해도 한 번씩만 제거)"""
+        overflow = self.client.zcard(self.index_key) - self.max_conversations
+        if overflow <= 0:
+            return
+        popped = self.client.zpopmin(self.index_key, overflow)
+        if popped:
+            ids = [cid.decode("utf-8") if isinstance(cid, bytes) else cid for cid, _ in popped]
+            self.client.delete(*[self.prefix + cid for cid in ids])
+            self.evictions += len(ids)
+
+
+class SharedSessionStore:
+    """
+    공유 백엔드 기반 세션 저장소 (SessionStore와 같은 인터페이스)
+
+    - 읽기(get): 워커 로컬 캐시가 cache_ttl 이내면 그대로 사용, 아니면 백엔드 조회 후 캐시 (블로킹)
+    - 쓰기(append/replace/delete): 로컬 캐시만 갱신하고 백엔드에는 write-behind로 기록 (I/O 없음)
+    """
+
+    def __init__(
+        self,
+        backend: SessionBackend,
+        max_messages: int = 20,
+        max_cached: int = 10000,
+        cache_ttl: float = 2.0
+    ):
+        self.backend = backend
+        self.max_messages = max(1, max_messages)
+        self.max_cached = max(1, max_cached)
+        self.cache_ttl = cache_ttl
+        # conversation_id → (메시지 튜플, 캐시 시각)
+        self._cache: "OrderedDict[str, Tuple[Tuple[Message, ...], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _cache_put(self, conversation_id: str, messages: List[Message], cached_at: Optional[float] = None):
+        with self._lock:
+            self._cache[conversation_id] = (tuple(messages), cached_at or time.time())
+            self._cache.move_to_end(conversation_id)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+    def get(self, conversation_id: str) -> List[Message]:
+        """대화 기록 조회 (read-through 캐시, 캐시 미스 시 백엔드 조회로 블로킹)"""
+        with self._lock:
+            cached = self._cache.get(conversation_id)
+            if cached is not None and time.time() - cached[1] < self.cache_ttl:
+                self._cache.move_to_end(conversation_id)
+                self.cache_hits += 1
+                return list(cached[0])
+            self.cache_misses += 1
+
+        messages = (self.backend.load(conversation_id) or [])[-self.max_messages:]
+        self._cache_put(conversation_id, messages)
+        return messages
+
+    def replace(self, conversation_id: str, messages: Iterable[Message]):
+        """대화 기록 전체 교체"""
+        messages = list(messages)[-self.max_messages:]
+        self._cache_put(conversation_id, messages)
+        self.backend.replace(conversation_id, messages)
+
+    def append(self, conversation_id: str, messages: Iterable[Message]):
+        """
+        대화 기록 뒤에 메시지 추가 (백엔드 조회 없음)
+
+        캐시에 있으면 캐시 시각은 그대로 두고 메시지만 추가
+        (다른 워커가 추가한 메시지는 cache_ttl이 지나면 백엔드에서 다시 읽음)
+        """
+        messages = list(messages)
+        with self._lock:
+            cached = self._cache.get(conversation_id)
+            if cached is not None:
+                combined = (cached[0] + tuple(messages))[-self.max_messages:]
+                self._cache[conversation_id] = (combined, cached[1])
+        self.backend.append(conversation_id, messages)
+
+    def delete(self, conversation_id: str):
+        """대화 삭제"""
+        with self._lock:
+            self._cache.pop(conversation_id, None)
+        self.backend.delete(conversation_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """저장소 통계 (로컬 캐시 + write-behind 대기열)"""
+        with self._lock:
+            cached = len(self._cache)
+            messages = sum(len(entry[0]) for entry in self._cache.values())
+            total = self.cache_hits + self.cache_misses
+        return {
+            "backend": type(self.backend).__name__,
+            "cached_conversations": cached,
+            "cached_messages": messages,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": (self.cache_hits / total) if total > 0 else 0.0,
+            "pending_writes": self.backend.pending_count(),
+            "flushes": self.backend.flushes,
+            "written": self.backend.written,
+            "evictions": self.backend.evictions,
+            "max_messages": self.max_messages
+        }
+
+    def close(self):
+        """남은 변경 기록 후 종료"""
+        self.backend.close()
+
+
+def create_session_store(
+    max_messages: int = 20,
+    idle_ttl: float = 1800.0,
+    max_conversations: int = 10000
+):
+    """
+    설정(SESSION_BACKEND)에 맞는 세션 저장소 생성
+
+    공유 백엔드를 만들 수 없으면 경고를 남기고 프로세스 내 메모리 저장소로 대체함
+    """
+    backend_name = get_env_optional("SESSION_BACKEND", "memory").lower()
+    backend_options = {
+        "max_messages": max_messages,
+        "max_conversations": max_conversations,
+        "flush_interval": get_env_float("SESSION_FLUSH_INTERVAL_MS", 50.0) / 1000.0
+    }
+
+    try:
+        if backend_name == "sqlite":
+            path = Path(get_env_optional("SESSION_SQLITE_PATH", str(BASE_DIR / "sessions.sqlite3")))
+            backend = SQLiteSessionBackend(path, idle_ttl=idle_ttl, **backend_options)
+        elif backend_name == "redis":
+            url = get_env_optional("SESSION_REDIS_URL", "redis://localhost:6379/0")
+            backend = RedisSessionBackend(url, idle_ttl=idle_ttl, **backend_options)
+        else:
+            if backend_name != "memory":
+                logger.warning(f"알 수 없는 SESSION_BACKEND: {backend_name} (메모리 저장소 사용)")
+            return SessionStore(
+                max_messages=max_messages,
+                idle_ttl=idle_ttl,
+                max_conversations=max_conversations
+            )
+    except Exception as e:
+        logger.warning(f"세션 백엔드({backend_name}) 초기화 실패, 메모리 저장소로 대체합니다: {e}")
+        return SessionStore(
+            max_messages=max_messages,
+            idle_ttl=idle_ttl,
+            max_conversations=max_conversations
+        )
+
+    logger.info(f"세션 백엔드 사용: {type(backend).__name__}")
+    return SharedSessionStore(
+        backend=backend,
+        max_messages=max_messages,
+        max_cached=max_conversations,
+        cache_ttl=get_env_float("SESSION_CACHE_TTL", 2.0)
+    )
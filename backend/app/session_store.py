@@ -0,0 +1,178 @@
+"""
+대화 기록 세션 저장소 (메모리 상한 포함)
+
+이 파일의 역할:
+- conversation_id별 대화 기록을 보관
+- 대화당 메시지 수 상한, 유휴 만료(TTL), 전체 대화 수 LRU 제거로 메모리 사용량 제한
+- 메시지를 LangChain 객체 대신 (role, content) 튜플로 보관하여 메모리 절약
+- 현재 보관 중인 대화/메시지 수와 대략적인 메모리 사용량 제공
+
+왜 필요한가:
+- 예전 RAGChain.memories는 제거 없이 계속 커지는 dict였음
+- 매 요청마다 클라이언트가 보낸 history 전체를 다시 추가하여 대화당 메모리가 제곱으로 증가
+- conversation_id가 없는 사용자들이 모두 "default" 대화를 공유하는 문제
+
+사용 규칙 (RAGChain):
+- 클라이언트가 history를 보내면 그것을 기준으로 대화 기록을 교체 (중복 추가 없음)
+- history가 없으면 서버에 저장된 기록 사용
+- conversation_id가 없으면 저장하지 않음 (요청에 포함된 history만 사용)
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import List, Dict, Any, Tuple, Iterable, Optional
+
+
+# (role, content) - role은 "user" 또는 "assistant"
+Message = Tuple[str, str]
+
+
+def _message_size(message: Message) -> int:
+    """메시지의 대략적인 메모리 크기 (UTF-8 바이트 기준)"""
+    return len(message[0]) + len(message[1].encode("utf-8"))
+
+
+class _Session:
+    """대화 하나의 메시지 목록과 마지막 접근 시각"""
+
+    __slots__ = ("messages", "last_access", "size_bytes")
+
+    def __init__(self, max_messages: int):
+        self.messages: "deque[Message]" = deque(maxlen=max_messages)
+        self.last_access = time.time()
+        self.size_bytes = 0
+
+
+class SessionStore:
+    """
+    대화 기록 세션 저장소 (스레드 안전)
+
+    - 대화당 최근 max_messages개 메시지만 유지
+    - idle_ttl초 동안 접근이 없는 대화는 만료
+    - 대화 수가 max_conversations를 넘으면 가장 오래 사용되지 않은 대화부터 제거
+    """
+
+    def __init__(
+        self,
+        max_messages: int = 20,
+        idle_ttl: float = 1800.0,
+        max_conversations: int = 10000
+    ):
+        self.max_messages = max(1, max_messages)
+        self.idle_ttl = idle_ttl
+        self.max_conversations = max(1, max_conversations)
+        # 접근 순서대로 정렬 (앞쪽이 가장 오래 사용되지 않은 대화)
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_messages = 0
+        self._total_bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _drop(self, conversation_id: str):
+        """대화 제거 및 카운터 갱신 (락을 잡은 상태에서 호출)"""
+        session = self._sessions.pop(conversation_id)
+        self._total_messages -= len(session.messages)
+        self._total_bytes -= session.size_bytes
+
+    def _expire(self, now: float):
+        """만료된 대화 제거 (LRU 순서이므로 앞쪽만 확인하면 됨)"""
+        while self._sessions:
+            conversation_id, session = next(iter(self._sessions.items()))
+            if now - session.last_access < self.idle_ttl:
+                break
+            self._drop(conversation_id)
+            self.expirations += 1
+
+    def _touch(self, conversation_id: str, now: float) -> _Session:
+        """대화 가져오기 또는 생성 후 최근 사용으로 갱신 (락을 잡은 상태에서 호출)"""
+        session = self._sessions.get(conversation_id)
+        if session is None:
+            session = _Session(self.max_messages)
+            self._sessions[conversation_id] = session
+            while len(self._sessions) > self.max_conversations:
+                oldest_id = next(iter(self._sessions))
+                self._drop(oldest_id)
+                self.evictions += 1
+        else:
+            self._sessions.move_to_end(conversation_id)
+        session.last_access = now
+        return session
+
+    def _append(self, session: _Session, message: Message):
+        """메시지 추가 (상한 초과 시 가장 오래된 메시지 제거, 락을 잡은 상태에서 호출)"""
+        if len(session.messages) == session.messages.maxlen:
+            dropped = session.messages[0]
+            session.size_bytes -= _message_size(dropped)
+            self._total_bytes -= _message_size(dropped)
+            self._total_messages -= 1
+        session.messages.append(message)
+        size = _message_size(message)
+        session.size_bytes += size
+        self._total_bytes += size
+        self._total_messages += 1
+
+    def get(self, conversation_id: str) -> List[Message]:
+        """대화 기록 조회 (없거나 만료되었으면 빈 리스트)"""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(conversation_id)
+            if session is None:
+                return []
+            self._sessions.move_to_end(conversation_id)
+            session.last_access = now
+            return list(session.messages)
+
+    def replace(self, conversation_id: str, messages: Iterable[Message]):
+        """대화 기록 전체 교체 (클라이언트가 보낸 history 기준으로 동기화)"""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            if conversation_id in self._sessions:
+                self._drop(conversation_id)
+            session = self._touch(conversation_id, now)
+            for message in messages:
+                self._append(session, message)
+
+    def append(self, conversation_id: str, messages: Iterable[Message]):
+        """대화 기록 뒤에 메시지 추가"""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            session = self._touch(conversation_id, now)
+            for message in messages:
+                self._append(session, message)
+
+    def delete(self, conversation_id: str):
+        """대화 삭제"""
+        with self._lock:
+            if conversation_id in self._sessions:
+                self._drop(conversation_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """저장소 통계 (대화 수, 메시지 수, 대략적인 메모리 사용량)"""
+        with self._lock:
+            return {
+                "conversations": len(self._sessions),
+                "messages": self._total_messages,
+                "approx_bytes": self._total_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "max_conversations": self.max_conversations,
+                "max_messages": self.max_messages
+            }
+
+    def close(self):
+        """프로세스 내 저장소는 정리할 외부 자원이 없음"""
+
+
+def history_to_messages(history: Optional[List[Dict[str, str]]]) -> List[Message]:
+    """API 요청의 history([{"role": ..., "content": ...}])를 메시지 튜플 목록으로 변환"""
+    messages: List[Message] = []
+    for msg in history or []:
+        role = msg.get("role")
+        if role in ("user", "assistant"):
+            messages.append((role, msg.get("content", "")))
+    return messages
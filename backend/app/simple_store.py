@@ -0,0 +1,300 @@
+"""
+NumPy 기반 인메모리 벡터 검색 엔진 (simple_store)
+
+이 파일의 역할:
+- scripts/import_csv_simple.py가 만든 simple_store 파일을 읽어 검색 서비스 제공
+  (embeddings.npy, documents.json, metadatas.json)
+- VectorStore와 같은 인터페이스(similarity_search, search_with_filters, search)를 제공하여
+  설정만 바꾸면 ChromaDB 대신 사용할 수 있음
+
+왜 필요한가:
+- 수십만 건 이하의 메뉴 데이터는 정확한 전수 검색(exact search)이
+  ChromaDB의 HNSW + SQLite 왕복보다 빠름
+- ChromaDB 프로세스 상태(SQLite 파일 잠금 등) 없이 읽기 전용으로 동작
+
+작동 원리:
+1. 시작 시 정규화된 임베딩 행렬을 한 번만 메모리에 로드
+2. 질문 벡터와 행렬의 곱 한 번으로 전체 코사인 유사도 계산
+3. 메타데이터 필터(where)와 문서 내용 조건(where_document)은 top-k 선택 전에 불리언 마스크로 적용
+4. argpartition으로 상위 k개만 부분 정렬
+
+설정 (환경 변수):
+- VECTORSTORE_ENGINE=simple: 이 엔진 사용 (기본값은 chroma)
+- SIMPLE_STORE_PATH: simple_store 디렉토리 (기본: chroma_db/simple_store)
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+import numpy as np
+from app.vectorstore import VectorStore, NUMERIC_METADATA_FIELDS, build_where_filter
+from app.metrics import observe_vector_query
+from app.tracing import record_span
+from app.utils import logger, CHROMA_DB_PATH, get_env_optional
+
+
+class ReadOnlyStoreError(RuntimeError):
+    """읽기 전용 simple_store에 쓰기/삭제를 요청했을 때"""
+
+
+def _to_float(value: Any) -> float:
+    """메타데이터 값을 숫자로 변환 (실패 시 NaN → 숫자 비교에서 항상 제외)"""
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return float("nan")
+
+
+class SimpleVectorStore(VectorStore):
+    """NumPy 행렬 기반 정확 검색 엔진 (읽기 전용)"""
+
+    def __init__(self, store_path: Optional[str] = None):
+        self.store_path = Path(
+            store_path or get_env_optional("SIMPLE_STORE_PATH", str(CHROMA_DB_PATH / "simple_store"))
+        )
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.matrix: Optional[np.ndarray] = None
+        self.columns: Dict[str, np.ndarray] = {}
+        super().__init__(collection_name="simple_store")
+
+    def _initialize(self):
+        """simple_store 파일 로드 및 검색용 행렬/필터 컬럼 준비"""
+        try:
+            start = time.time()
+            with open(self.store_path / "documents.json", 'r', encoding='utf-8') as f:
+                self.documents = json.load(f)
+            with open(self.store_path / "metadatas.json", 'r', encoding='utf-8') as f:
+                self.metadatas = json.load(f)
+
+            matrix = np.load(self.store_path / "embeddings.npy").astype(np.float32, copy=False)
+            if matrix.ndim != 2 or len(matrix) != len(self.documents):
+                raise ValueError(
+                    f"임베딩 행렬 크기({matrix.shape})와 문서 수({len(self.documents)})가 맞지 않습니다"
+                )
+
+            # 코사인 유사도를 행렬곱 한 번으로 계산할 수 있도록 행 단위 정규화
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            self.matrix = np.ascontiguousarray(matrix / np.clip(norms, 1e-12, None))
+
+            self._build_columns()
+            logger.info(
+                f"simple_store 로드: {len(self.documents)}개 문서, "
+                f"{self.matrix.shape[1]}차원 ({time.time() - start:.2f}초)"
+            )
+        except Exception as e:
+            logger.error(f"simple_store 초기화 실패: {e}")
+            raise
+
+    def _ensure_numeric_metadata(self) -> bool:
+        """가격/칼로리 컬럼은 로드할 때 숫자로 변환하므로 숫자 where 절을 항상 그대로 적용"""
+        return True
+
+    def _build_columns(self):
+        """메타데이터를 필드별 NumPy 배열로 변환 (필터 마스크 계산용)"""
+        fields = set()
+        for metadata in self.metadatas:
+            fields.update(metadata.keys())
+
+        self.columns = {}
+        for field in fields:
+            values = [metadata.get(field) for metadata in self.metadatas]
+            if field in NUMERIC_METADATA_FIELDS:
+                self.columns[field] = np.array([_to_float(v) for v in values], dtype=np.float64)
+            else:
+                self.columns[field] = np.array(values, dtype=object)
+
+    def _mask_from_where(self, where: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        ChromaDB where 형식의 필터를 불리언 마스크로 변환
+
+        지원 형식:
+        - {"category": "한식"}
+        - {"price": {"$lte": 10000}} ($eq, $ne, $lt, $lte, $gt, $gte, $in, $nin)
+        - {"$and": [...]}, {"$or": [...]}
+        """
+        if not where:
+            return None
+
+        n = len(self.documents)
+        mask = np.ones(n, dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for sub in condition:
+                    sub_mask = self._mask_from_where(sub)
+                    if sub_mask is not None:
+                        mask &= sub_mask
+            elif key == "$or":
+                any_mask = np.zeros(n, dtype=bool)
+                for sub in condition:
+                    sub_mask = self._mask_from_where(sub)
+                    any_mask |= sub_mask if sub_mask is not None else True
+                mask &= any_mask
+            else:
+                mask &= self._field_mask(key, condition)
+        return mask
+
+    def _field_mask(self, field: str, condition: Any) -> np.ndarray:
+        """필드 하나에 대한 조건 마스크"""
+        column = self.columns.get(field)
+        if column is None:
+            return np.zeros(len(self.documents), dtype=bool)
+
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        numeric = column.dtype != object
+        mask = np.ones(len(column), dtype=bool)
+        for op, value in condition.items():
+            if numeric and op not in ("$in", "$nin"):
+                value = _to_float(value)
+            if op == "$eq":
+                mask &= column == value
+            elif op == "$ne":
+                mask &= column != value
+            elif op == "$lt":
+                mask &= column < value
+            elif op == "$lte":
+                mask &= column <= value
+            elif op == "$gt":
+                mask &= column > value
+            elif op == "$gte":
+                mask &= column >= value
+            elif op == "$in":
+                values = [_to_float(v) for v in value] if numeric else list(value)
+                mask &= np.isin(column, values)
+            elif op == "$nin":
+                values = [_to_float(v) for v in value] if numeric else list(value)
+                mask &= ~np.isin(column, values)
+            else:
+                raise ValueError(f"지원하지 않는 필터 연산자: {op}")
+        return mask
+
+    def _mask_from_where_document(self, where_document: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        ChromaDB where_document 형식의 문서 내용 조건을 불리언 마스크로 변환
+        
+        지원 형식: {"$contains": "..."}, {"$not_contains": "..."}, {"$and": [...]}, {"$or": [...]}
+        """
+        if not where_document:
+            return None
+
+        n = len(self.documents)
+        mask = np.ones(n, dtype=bool)
+        for key, condition in where_document.items():
+            if key in ("$and", "$or"):
+                sub_masks = [self._mask_from_where_document(sub) for sub in condition]
+                sub_masks = [m for m in sub_masks if m is not None]
+                if not sub_masks:
+                    continue
+                combined = np.logical_and.reduce(sub_masks) if key == "$and" else np.logical_or.reduce(sub_masks)
+                mask &= combined
+            elif key in ("$contains", "$not_contains"):
+                contains = np.fromiter((condition in doc for doc in self.documents), dtype=bool, count=n)
+                mask &= contains if key == "$contains" else ~contains
+            else:
+                raise ValueError(f"지원하지 않는 문서 조건 연산자: {key}")
+        return mask
+
+    def _top_k(
+        self,
+        query_embedding: List[float],
+        k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
+        """행렬-벡터 곱 한 번 + argpartition으로 상위 k개 선택"""
+        query = np.array(query_embedding, dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+
+        if mask is None:
+            candidates = None
+            scores = self.matrix @ query
+        else:
+            candidates = np.flatnonzero(mask)
+            if len(candidates) == 0:
+                return []
+            # 선택적인 필터는 후보 행만 계산, 넓은 필터는 전체 계산 후 추림
+            if len(candidates) < len(self.documents) // 4:
+                scores = self.matrix[candidates] @ query
+            else:
+                scores = (self.matrix @ query)[candidates]
+
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for i in top:
+            row = int(candidates[i]) if candidates is not None else int(i)
+            results.append({
+                "content": self.documents[row],
+                "metadata": self.metadatas[row],
+                # ChromaDB 기본 거리(제곱 L2)와 같은 척도: 정규화 벡터에서 2 - 2cos
+                "score": float(2.0 - 2.0 * scores[i])
+            })
+        return results
+
+    def load_all_documents(self):
+        """전체 문서/메타데이터 (이미 메모리에 있음)"""
+        return self.documents, self.metadatas
+
+    def add_documents(self, *args, **kwargs):
+        """simple_store는 읽기 전용 (scripts/import_csv_simple.py로 생성)"""
+        raise ReadOnlyStoreError("simple_store는 읽기 전용입니다. scripts/import_csv_simple.py로 생성하세요")
+
+    def similarity_search(
+        self,
+        query: str,
+        k: int = 8,
+        filter: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """유사도 검색 (메타데이터/문서 내용 조건은 top-k 이전에 마스크로 적용)"""
+        try:
+            start = time.time()
+            query_embedding = self._embed_text(query)
+            embedding_time = time.time() - start
+            record_span("embedding", start)
+            logger.info(f"[벡터DB] 임베딩 생성 시간: {embedding_time:.2f}초 (캐시 히트율: {self.embedding_cache.stats()['hit_rate']:.1%})")
+
+            start = time.time()
+            mask = self._mask_from_where(filter)
+            document_mask = self._mask_from_where_document(where_document)
+            if document_mask is not None:
+                mask = document_mask if mask is None else mask & document_mask
+            results = self._top_k(query_embedding, k, mask)
+            search_time = time.time() - start
+            record_span("vector_query", start, filtered=bool(filter or where_document))
+            logger.info(f"[벡터DB] 검색 시간: {search_time:.4f}초 (simple_store)")
+            observe_vector_query("simple", embedding_time, search_time, bool(filter or where_document))
+            return results
+        except Exception as e:
+            logger.error(f"유사도 검색 실패: {e}")
+            return []
+
+    def search_with_filters(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        max_price: Optional[int] = None,
+        max_calories: Optional[int] = None,
+        k: int = 8,
+        min_price: Optional[int] = None,
+        min_calories: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """필터링이 포함된 검색 (모든 조건을 top-k 이전에 마스크로 적용)"""
+        where = build_where_filter(
+            category=category,
+            max_price=max_price,
+            max_calories=max_calories,
+            min_price=min_price,
+            min_calories=min_calories
+        )
+        return self.similarity_search(query, k=k, filter=where)
+
+    def delete_collection(self):
+        """simple_store는 파일 기반이므로 컬렉션 삭제를 지원하지 않음"""
+        raise ReadOnlyStoreError("simple_store는 컬렉션 삭제를 지원하지 않습니다")
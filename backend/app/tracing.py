@@ -0,0 +1,337 @@
+"""
+요청 단위 추적 구간(span)
+
+이 파일의 역할:
+- 요청 하나 안에서 검증, 선호도 추출, 임베딩, 벡터 검색, 프롬프트 생성,
+  LLM 첫 토큰(TTFT), LLM 완료 시간을 구간(span)으로 기록
+- 기록한 구간을 Server-Timing 헤더(/chat), SSE 완료 청크의 timings 필드(/chat/stream),
+  OpenTelemetry 호환 JSON Lines 파일(선택)로 내보냄
+- TracingMiddleware: 요청마다 Trace를 만들고, 응답 헤더에 Server-Timing을 붙이고, 요청이 끝나면 기록
+
+왜 필요한가:
+- /metrics 히스토그램은 전체 분포만 보여줘서, 사용자가 "방금 답변이 느렸다"고 할 때
+  그 요청에서 임베딩/ChromaDB/LLM 중 무엇이 느렸는지 알 수 없음
+- 브라우저 개발자 도구(Network → Timing)는 Server-Timing 헤더를 바로 보여줌
+
+작동 원리:
+- 현재 요청의 Trace와 현재 구간 ID를 contextvars에 저장 → 함수 인자를 바꾸지 않고
+  RAGChain/벡터 저장소 어디서든 span("이름")으로 구간 추가
+- 스레드 풀 작업은 contextvars.copy_context()로 실행해야 같은 Trace에 기록됨 (RAGChain.run_in_executor)
+- Trace가 없으면(추적 비활성화, 스크립트 실행 등) span()은 아무것도 하지 않음
+- 같은 이름의 구간이 여러 번 나오면 Server-Timing/timings에서는 합산
+- Server-Timing 헤더는 미들웨어가 응답 시작 시점에 붙이므로 HTTPException 등 오류 응답에도 포함됨
+- 파일 기록은 백그라운드 스레드가 대기열에서 꺼내 처리 (이벤트 루프에서 디스크 I/O 없음)
+
+설정 (환경 변수):
+- TRACING: 0이면 추적 비활성화 (기본 1)
+- TRACE_LOG_PATH: 설정하면 요청마다 OTLP JSON(ExportTraceServiceRequest) 한 줄을 이 파일에 추가
+  (OpenTelemetry Collector otlpjsonfile 리시버로 읽을 수 있음)
+"""
+
+import contextvars
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from app.utils import logger, get_env_int, get_env_optional
+
+
+# 서비스 이름 (OpenTelemetry resource 속성)
+SERVICE_NAME = "jeonju-restaurant-chatbot"
+
+# 추적할 경로와 Server-Timing 헤더를 붙일 경로
+# (SSE는 헤더가 스트림 시작 전에 나가므로 완료 청크의 timings 필드로 전달)
+TRACED_PATHS = {"/chat", "/chat/stream"}
+SERVER_TIMING_PATHS = {"/chat"}
+
+# 파일 기록 대기열 상한 (디스크가 느려도 메모리가 계속 늘지 않도록 넘치면 버림)
+TRACE_LOG_QUEUE_SIZE = 10000
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("current_trace", default=None)
+_current_span_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_span_id", default=None)
+
+
+def _new_id(num_bytes: int) -> str:
+    return os.urandom(num_bytes).hex()
+
+
+@dataclass
+class Span:
+    """완료된 구간 하나 (시간은 Unix epoch 나노초)"""
+    name: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_otlp(self, trace_id: str) -> Dict[str, Any]:
+        return {
+            "traceId": trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+        }
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    result = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        result.append({"key": key, "value": typed})
+    return result
+
+
+class Trace:
+    """요청 하나의 구간 모음 (루트 구간 = 요청 전체)"""
+
+    def __init__(self, name: str, **attributes: Any):
+        self.name = name
+        self.trace_id = _new_id(16)
+        self.root_id = _new_id(8)
+        self.start_ns = time.time_ns()
+        self.attributes = attributes
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._finished = False
+
+    def add(self, name: str, start_ns: int, end_ns: int, parent_id: Optional[str] = None, **attributes: Any) -> Span:
+        span = Span(name, _new_id(8), parent_id or self.root_id, start_ns, end_ns, attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def set_attributes(self, **attributes: Any):
+        """루트 구간 속성 추가 (예: 스트림 종류, 전송 청크 수)"""
+        self.attributes.update(attributes)
+
+    def elapsed_ms(self) -> float:
+        return (time.time_ns() - self.start_ns) / 1e6
+
+    def timings(self) -> Dict[str, float]:
+        """구간 이름 → 시간(ms), 같은 이름은 합산 + 요청 시작부터 지금까지 total"""
+        with self._lock:
+            spans = list(self.spans)
+        result: Dict[str, float] = {}
+        for span in spans:
+            result[span.name] = result.get(span.name, 0.0) + span.duration_ms
+        result = {name: round(ms, 2) for name, ms in result.items()}
+        result["total"] = round(self.elapsed_ms(), 2)
+        return result
+
+    def server_timing(self) -> str:
+        """Server-Timing 헤더 값 (예: "embedding;dur=12.3, vector_query;dur=4.1, total;dur=850.2")"""
+        return ", ".join(f"{name};dur={ms}" for name, ms in self.timings().items())
+
+    def finish(self, **attributes: Any):
+        """요청 종료: TRACE_LOG_PATH가 설정되어 있으면 기록 대기열에 넣음 (한 번만, 블로킹 없음)"""
+        if self._finished:
+            return
+        self._finished = True
+        self.attributes.update(attributes)
+        path = get_env_optional("TRACE_LOG_PATH")
+        if path:
+            with self._lock:
+                spans = list(self.spans)
+            root = Span(self.name, self.root_id, None, self.start_ns, time.time_ns(), dict(self.attributes))
+            _trace_writer().submit(path, self.trace_id, [root] + spans)
+
+
+def _otlp_record(trace_id: str, spans: List[Span]) -> Dict[str, Any]:
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+            "scopeSpans": [{
+                "scope": {"name": "app.tracing"},
+                "spans": [span.to_otlp(trace_id) for span in spans],
+            }],
+        }]
+    }
+
+
+class _TraceLogWriter:
+    """
+    추적 로그 파일 기록 스레드
+
+    submit()은 대기열에 넣기만 하고 바로 반환, 스레드가 모인 기록을 한 번에 직렬화/기록
+    """
+
+    def __init__(self, max_queue: int = TRACE_LOG_QUEUE_SIZE):
+        self._queue: "queue.Queue[Tuple[str, str, List[Span]]]" = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="trace-log-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, path: str, trace_id: str, spans: List[Span]):
+        try:
+            self._queue.put_nowait((path, trace_id, spans))
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"추적 로그 대기열이 가득 차 기록을 버렸습니다 (누적 {self.dropped}건)")
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # 밀려 있는 기록을 모아 파일을 한 번만 열고 씀
+            while not self._queue.empty() and len(batch) < 1000:
+                batch.append(self._queue.get_nowait())
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    @staticmethod
+    def _write(batch: List[Tuple[str, str, List[Span]]]):
+        lines_by_path: Dict[str, List[str]] = {}
+        for path, trace_id, spans in batch:
+            line = json.dumps(_otlp_record(trace_id, spans), ensure_ascii=False)
+            lines_by_path.setdefault(path, []).append(line)
+        for path, lines in lines_by_path.items():
+            try:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+            except OSError as e:
+                logger.warning(f"추적 로그 기록 실패 ({path}): {e}")
+
+    def flush(self):
+        """대기 중인 기록이 모두 파일에 쓰일 때까지 대기 (종료 시)"""
+        self._queue.join()
+
+
+_writer: Optional[_TraceLogWriter] = None
+_writer_lock = threading.Lock()
+
+
+def _trace_writer() -> _TraceLogWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = _TraceLogWriter()
+    return _writer
+
+
+def flush_trace_log():
+    """대기 중인 추적 로그 기록 (서버 종료 시 호출, 블로킹)"""
+    if _writer is not None:
+        _writer.flush()
+
+
+def tracing_enabled() -> bool:
+    """TRACING 설정 (0이면 비활성화)"""
+    return bool(get_env_int("TRACING", 1))
+
+
+def start_trace(name: str, **attributes: Any) -> Optional[Trace]:
+    """새 Trace를 만들어 현재 컨텍스트에 연결 (비활성화면 None)"""
+    if not tracing_enabled():
+        return None
+    trace = Trace(name, **attributes)
+    activate(trace)
+    return trace
+
+
+def activate(trace: Optional[Trace]):
+    """
+    이미 만든 Trace를 현재 컨텍스트에 연결
+
+    SSE 생성기는 엔드포인트와 다른 태스크에서 돌 수 있으므로 생성기 시작 시 다시 연결함
+    """
+    _current_trace.set(trace)
+    _current_span_id.set(trace.root_id if trace is not None else None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[None]:
+    """현재 Trace에 구간 추가 (Trace가 없으면 아무것도 하지 않음)"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    parent_id = _current_span_id.get()
+    span_id = _new_id(8)
+    token = _current_span_id.set(span_id)
+    start_ns = time.time_ns()
+    try:
+        yield
+    finally:
+        _current_span_id.reset(token)
+        recorded = Span(name, span_id, parent_id or trace.root_id, start_ns, time.time_ns(), attributes)
+        with trace._lock:
+            trace.spans.append(recorded)
+
+
+def record_span(name: str, start: float, end: Optional[float] = None, **attributes: Any):
+    """
+    이미 잰 시간으로 구간 추가 (start/end: time.time() 초)
+
+    with 블록으로 감쌀 수 없는 경우용 (예: 스트리밍 중 첫 토큰 도착 시점)
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    end = time.time() if end is None else end
+    trace.add(name, int(start * 1e9), int(end * 1e9), _current_span_id.get(), **attributes)
+
+
+class TracingMiddleware:
+    """
+    요청 단위 Trace 생성 + Server-Timing 헤더 + 종료 시 기록 (순수 ASGI 미들웨어)
+
+    - TRACED_PATHS 요청마다 Trace를 만들어 컨텍스트에 연결 (엔드포인트는 current_trace()로 사용)
+    - SERVER_TIMING_PATHS는 응답 시작(http.response.start) 시점에 헤더를 붙임
+      → 예외 처리기가 만든 오류 응답(HTTPException 등)에도 포함
+    - 응답 본문 전송이 끝나면(SSE는 스트림 종료 후) finish()로 기록
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "") if scope["type"] == "http" else ""
+        if path not in TRACED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        trace = start_trace(f"{scope.get('method', '')} {path}")
+        if trace is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                trace.set_attributes(**{"http.status_code": message["status"]})
+                if path in SERVER_TIMING_PATHS:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            trace.finish()
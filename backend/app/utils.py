@@ -17,12 +17,19 @@
 주요 기능:
 - get_env(): 필수 환경변수 가져오기 (없으면 에러 발생)
 - get_env_optional(): 선택적 환경변수 가져오기 (기본값 제공)
+- get_env_int() / get_env_float(): 숫자형 설정값 가져오기 (캐시 크기, 배치 크기 등)
+- coerce_numeric_metadata(): 가격/칼로리 메타데이터를 정수로 변환 (범위 필터용)
+- validate_question() / classify_question(): 질문 키워드 검증 (question_keywords.json, 시작 시 한 번 컴파일)
 - logger: 전역 로거 인스턴스 (로깅 설정 포함)
 - 데이터베이스, API 키, 경로 등의 환경 설정값들
 """
 
+import json
 import logging
+import os
+import re
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 # 프로젝트 루트 디렉토리
 BASE_DIR = Path(__file__).parent.parent
@@ -45,6 +52,203 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def get_env_optional(key: str, default: Optional[str] = None) -> Optional[str]:
+    """선택적 환경변수 가져오기 (없거나 빈 값이면 기본값 반환)"""
+    value = os.getenv(key)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip()
+
+
+def get_env_int(key: str, default: int) -> int:
+    """정수형 환경변수 가져오기 (변환 실패 시 기본값 반환)"""
+    value = get_env_optional(key)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"환경변수 {key}의 값이 정수가 아닙니다: {value} (기본값 {default} 사용)")
+        return default
+
+
+def get_env_float(key: str, default: float) -> float:
+    """실수형 환경변수 가져오기 (변환 실패 시 기본값 반환)"""
+    value = get_env_optional(key)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"환경변수 {key}의 값이 숫자가 아닙니다: {value} (기본값 {default} 사용)")
+        return default
+
+
+# 정수로 저장하여 범위 필터($lte/$gte)를 적용하는 메타데이터 필드
+NUMERIC_METADATA_FIELDS = ("price", "calories")
+
+
+def parse_int(value: Any) -> Optional[int]:
+    """숫자 문자열을 정수로 변환 (예: "8,000" → 8000, 실패 시 None)"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    try:
+        return int(float(str(value).replace(",", "").strip()))
+    except (ValueError, TypeError):
+        return None
+
+
+def coerce_numeric_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    메타데이터의 가격/칼로리를 정수로 변환한 복사본 반환
+    
+    변환할 수 없는 값은 제거함 (ChromaDB 메타데이터는 None을 허용하지 않고,
+    숫자 필터 조건에서는 어차피 제외되어야 하므로)
+    """
+    typed = dict(metadata)
+    for field in NUMERIC_METADATA_FIELDS:
+        if field in typed:
+            value = parse_int(typed[field])
+            if value is None:
+                typed.pop(field)
+            else:
+                typed[field] = value
+    return typed
+
+
+# 질문 검증 거절 메시지 (고정)
+REJECTION_MESSAGE = "이 서비스는 전주 지역 음식점 추천만 제공하고 있어요.\n전주 맛집이나 음식 관련 질문을 해 주세요 🙂"
+
+# 기본 금지/허용 키워드 설정 파일 (QUESTION_KEYWORDS_PATH로 교체 가능)
+DEFAULT_QUESTION_KEYWORDS_PATH = Path(__file__).parent / "question_keywords.json"
+
+
+class QuestionClassifier:
+    """
+    금지/허용 키워드 분류기 (생성 시 정규식을 한 번만 컴파일)
+
+    - 금지 키워드가 하나라도 있으면 거절 (허용 키워드보다 우선)
+    - 금지 키워드가 없고 허용 키워드가 하나라도 있으면 허용
+    - 한 글자 금지 키워드("비", "눈", "곡")는 단어로 쓰였을 때만 일치
+      ("비 오는 날", "비가" → 일치 / "비빔밥", "비용", "눈꽃빙수" → 불일치)
+    - 키워드는 {"forbidden": {카테고리: [...]}, "allowed": {카테고리: [...]}} 형식
+    """
+
+    GROUPS = ("forbidden", "allowed")
+
+    # 이 길이 이하의 금지 키워드는 다른 단어 안에서는 일치하지 않음
+    SHORT_KEYWORD_LENGTH = 1
+    # 짧은 키워드 바로 뒤에 붙어도 같은 단어로 보는 글자 (조사, "비오는"/"눈오는"의 "오")
+    SHORT_KEYWORD_FOLLOWERS = "가는은이을를도에의와랑오"
+
+    def __init__(self, keywords: Dict[str, Dict[str, List[str]]]):
+        # 키워드 → [(그룹, 카테고리), ...]
+        owners: Dict[str, List[Tuple[str, str]]] = {}
+        for group in self.GROUPS:
+            for category, words in keywords.get(group, {}).items():
+                for word in words:
+                    word = word.lower()
+                    if word:
+                        owners.setdefault(word, []).append((group, category))
+        self._token_words = frozenset(
+            word for word, o in owners.items()
+            if len(word) <= self.SHORT_KEYWORD_LENGTH and any(g == "forbidden" for g, _ in o)
+        )
+
+        # 판정용: 그룹별 alternation 정규식 (C 레벨에서 한 번 스캔, 첫 일치에서 종료)
+        self._group_patterns = {
+            group: self._compile([w for w, o in owners.items() if any(g == group for g, _ in o)], self._token_words)
+            for group in self.GROUPS
+        }
+
+        # 분류용: 전체 키워드를 한 번에 스캔하는 겹침 허용 패턴
+        # 같은 위치에서는 가장 긴 키워드만 일치하므로 ("전주시" vs "전주")
+        # 그 위치에서 시작하는 더 짧은 키워드(접두사)의 카테고리도 미리 합쳐 둠
+        self._categories: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+        for word in owners:
+            merged = []
+            for other, other_owners in owners.items():
+                # 단어로만 일치하는 짧은 키워드는 더 긴 키워드("비용"의 "비") 안에서는 제외
+                if word.startswith(other) and (other == word or other not in self._token_words):
+                    merged.extend(o for o in other_owners if o not in merged)
+            self._categories[word] = tuple(merged)
+        all_words = self._compile(list(owners), self._token_words)
+        self._scan_pattern = re.compile(f"(?=({all_words.pattern}))") if all_words else None
+
+    @classmethod
+    def _compile(cls, words: List[str], token_words: frozenset = frozenset()) -> Optional["re.Pattern"]:
+        """
+        키워드 목록을 하나의 alternation 정규식으로 컴파일 (긴 키워드 우선)
+
+        token_words에 있는 키워드는 앞이 단어 시작이고 뒤가 단어 끝 또는 조사일 때만 일치
+        """
+        if not words:
+            return None
+        ordered = sorted(set(words), key=len, reverse=True)
+        followers = re.escape(cls.SHORT_KEYWORD_FOLLOWERS)
+        alternatives = [
+            rf"(?<!\w){re.escape(w)}(?=$|\W|[{followers}])" if w in token_words else re.escape(w)
+            for w in ordered
+        ]
+        return re.compile("|".join(alternatives))
+
+    @classmethod
+    def from_file(cls, path: Path) -> "QuestionClassifier":
+        """JSON 설정 파일에서 분류기 생성"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def classify(self, question: str) -> Dict[str, List[str]]:
+        """질문에서 일치한 카테고리를 그룹별로 반환 (예: {"forbidden": [], "allowed": ["region", "recommend"]})"""
+        result: Dict[str, List[str]] = {group: [] for group in self.GROUPS}
+        if self._scan_pattern is None:
+            return result
+        for match in self._scan_pattern.finditer(question.lower()):
+            for group, category in self._categories[match.group(1)]:
+                if category not in result[group]:
+                    result[group].append(category)
+        return result
+
+    def is_allowed(self, question: str) -> bool:
+        """허용 여부만 판정 (요청마다 호출되는 빠른 경로)"""
+        question_lower = question.lower()
+        forbidden = self._group_patterns["forbidden"]
+        if forbidden is not None and forbidden.search(question_lower):
+            return False
+        allowed = self._group_patterns["allowed"]
+        return allowed is not None and allowed.search(question_lower) is not None
+
+
+def load_question_classifier(path: Optional[str] = None) -> QuestionClassifier:
+    """
+    질문 분류기 로드 (QUESTION_KEYWORDS_PATH 설정 파일 우선)
+
+    운영자가 지정한 파일을 읽을 수 없으면 경고 후 기본 설정 파일 사용
+    """
+    path = path or get_env_optional("QUESTION_KEYWORDS_PATH")
+    if path:
+        try:
+            classifier = QuestionClassifier.from_file(Path(path))
+            logger.info(f"질문 키워드 설정 로드: {path}")
+            return classifier
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"질문 키워드 설정 로드 실패: {path} ({e}) - 기본 설정 사용")
+    return QuestionClassifier.from_file(DEFAULT_QUESTION_KEYWORDS_PATH)
+
+
+# 시작 시 한 번만 생성 (요청마다 키워드 목록을 다시 만들지 않음)
+question_classifier = load_question_classifier()
+
+
+def classify_question(question: str) -> Dict[str, List[str]]:
+    """질문에서 일치한 금지/허용 카테고리 반환 (로그/분석용)"""
+    return question_classifier.classify(question)
+
+
 def validate_question(question: str) -> tuple[bool, str]:
     """
     질문이 전주 음식점/음식 관련인지 검증
@@ -57,40 +261,9 @@ def validate_question(question: str) -> tuple[bool, str]:
         - is_valid: True면 허용, False면 거절
         - rejection_message: 거절 시 출력할 메시지
     """
-    # 거절 메시지 (고정)
-    REJECTION_MESSAGE = "이 서비스는 전주 지역 음식점 추천만 제공하고 있어요.\n전주 맛집이나 음식 관련 질문을 해 주세요 🙂"
-    
-    question_lower = question.lower()
-    
-    # 1. 금지 키워드 체크 (무조건 거절)
-    forbidden_keywords = [
-        "노래", "음악", "가수", "앨범", "곡", "뮤직",
-        "영화", "드라마", "배우", "감독", "영화관", "극장",
-        "번역", "translate", "translation",
-        "코딩", "프로그래밍", "코드", "개발", "프로그래머",
-        "수학", "수식", "계산", "방정식",
-        "날씨", "기상", "온도", "비", "눈",
-        "뉴스", "시사", "정치", "경제"
-    ]
-    
-    for keyword in forbidden_keywords:
-        if keyword in question_lower:
-            return (False, REJECTION_MESSAGE)
-    
-    # 2. 허용 키워드 체크 (하나라도 있으면 허용)
-    allowed_keywords = [
-        "음식", "식당", "맛집", "음식점", "레스토랑",
-        "메뉴", "음식 메뉴", "요리",
-        "가격", "비용", "돈", "원",
-        "칼로리", "열량", "다이어트",
-        "전주", "전주시",
-        "배달", "포장", "테이크아웃",
-        "추천", "어디", "어떤", "맛있는", "좋은"
-    ]
-    
-    for keyword in allowed_keywords:
-        if keyword in question_lower:
-            return (True, "")
-    
+    # 1. 금지 키워드가 있으면 무조건 거절
+    # 2. 허용 키워드가 하나라도 있으면 허용
     # 3. 허용 키워드가 없으면 거절
-    return (False, REJECTION_MESSAGE)
\ No newline at end of file
+    if question_classifier.is_allowed(question):
+        return (True, "")
+    return (False, REJECTION_MESSAGE)
@@ -15,14 +15,26 @@ ChromaDB 벡터 저장소 관리
 
 주요 기능:
 - VectorStore 클래스: 벡터 저장소 관리 및 검색
-- add_documents(): 문서를 벡터로 변환하여 저장
+- add_documents(): 문서를 배치 단위로 벡터화하여 저장
 - similarity_search(): 유사도 기반 검색 (점수 포함)
 - similarity_search_with_retriever(): LangChain Retriever 사용 검색
-- delete_collection(): 컬렉션 삭제 (초기화용)
+- delete_collection() / reset_collection(): 컬렉션 삭제 (초기화용)
+- get_content_hashes() / delete_documents(): 증분 동기화용 (scripts/init_vectorstore.py --sync)
+- write_embeddings(): 미리 계산한 임베딩 저장 (스트리밍 적재 파이프라인 app/ingestion.py용)
+- EmbeddingCache: 질문 임베딩 LRU 캐시 (반복 질문의 모델 추론 생략)
+- 문서/질문 임베딩은 디스크 임베딩 캐시(app/embedding_store.py)를 먼저 조회
+- EmbeddingBatcher: 동시 요청의 질문 임베딩을 짧은 시간 창 안에서 모아 한 번에 추론
+- get_vectorstore(): 설정(VECTORSTORE_ENGINE)에 맞는 검색 엔진 싱글톤 반환
+- build_where_filter(): 카테고리/가격/칼로리 조건을 ChromaDB where 절로 변환 (검색 전 필터링)
+- search(): 질문에서 추출한 SearchFilter(app/preferences.py)를 where/where_document 절로 적용한 검색
+  (어휘 인덱스 app/lexical_index.py와 RRF 결합, 요리명이 그대로 일치하면 임베딩 생략)
+- migrate_numeric_metadata(): 문자열로 저장된 가격/칼로리를 정수로 변환 (기존 컬렉션용)
+  시작 시 문자열 값을 감지하면 자동으로 변환하고, 변환하지 못하면 가격/칼로리 조건만
+  검색 후에 걸러냄 (NUMERIC_METADATA_AUTO_MIGRATE)
 
 기술 스택:
 - ChromaDB: 벡터 데이터베이스 (로컬 파일 기반)
-- SentenceTransformers: 로컬 임베딩 모델 (한국어 지원)
+- SentenceTransformers: 로컬 임베딩 모델 (한국어 지원, ONNX int8 백엔드 선택 가능)
 - LangChain: RAG 시스템 구축
 
 작동 원리:
@@ -34,35 +46,318 @@ ChromaDB 벡터 저장소 관리
 
 import chromadb
 from chromadb.config import Settings
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import Future
+import queue
+import re
+import threading
 import time
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from chromadb.utils import embedding_functions
-from app.utils import logger, CHROMA_DB_PATH
+from app.embeddings import create_embeddings, embedding_model_id
+from app.embedding_store import wrap_embeddings
+from app.preferences import SearchFilter
+from app.lexical_index import LazyLexicalIndex, reciprocal_rank_fusion
+from app.metrics import observe_vector_query
+from app.tracing import record_span
+from app.utils import (
+    logger,
+    CHROMA_DB_PATH,
+    get_env_int,
+    get_env_float,
+    get_env_optional,
+    NUMERIC_METADATA_FIELDS,
+    parse_int,
+    coerce_numeric_metadata
+)
+
+
+# 캐시 키 정규화용 패턴 (모듈 로드 시 한 번만 컴파일)
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_TRAILING_PUNCT_PATTERN = re.compile(r'[\s?!.,~…？！。，]+$')
+
+
+# 숫자 where 절을 쓸 수 없는 컬렉션에서 가격/칼로리 조건을 검색 후 적용할 때의 과다 조회 배수
+NUMERIC_POST_FILTER_FACTOR = 3
+
+
+def normalize_query(text: str) -> str:
+    """
+    임베딩 캐시 키용 질문 정규화
+    
+    - 앞뒤 공백 제거, 연속 공백을 하나로
+    - 소문자 변환
+    - 끝의 문장부호 제거 (예: "전주 비빔밥 추천?" → "전주 비빔밥 추천")
+    """
+    text = _WHITESPACE_PATTERN.sub(' ', text.strip()).lower()
+    return _TRAILING_PUNCT_PATTERN.sub('', text)
+
+
+def build_where_filter(
+    category: Optional[str] = None,
+    max_price: Optional[int] = None,
+    max_calories: Optional[int] = None,
+    min_price: Optional[int] = None,
+    min_calories: Optional[int] = None,
+    categories: Optional[List[str]] = None,
+    exclude_categories: Optional[List[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    검색 조건을 ChromaDB where 절로 변환
+    
+    예: category="디저트", max_price=5000
+    → {"$and": [{"category": "디저트"}, {"price": {"$lte": 5000}}]}
+    
+    categories(여러 카테고리 중 하나)는 $in, exclude_categories는 $nin으로 변환
+    조건이 하나면 $and 없이 그대로, 없으면 None 반환
+    """
+    conditions: List[Dict[str, Any]] = []
+    if category:
+        conditions.append({"category": category})
+    if categories:
+        if len(categories) == 1:
+            conditions.append({"category": categories[0]})
+        else:
+            conditions.append({"category": {"$in": list(categories)}})
+    if exclude_categories:
+        conditions.append({"category": {"$nin": list(exclude_categories)}})
+    if min_price is not None:
+        conditions.append({"price": {"$gte": int(min_price)}})
+    if max_price is not None:
+        conditions.append({"price": {"$lte": int(max_price)}})
+    if min_calories is not None:
+        conditions.append({"calories": {"$gte": int(min_calories)}})
+    if max_calories is not None:
+        conditions.append({"calories": {"$lte": int(max_calories)}})
+    
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+def build_where_document(exclude_terms: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    제외 단어를 ChromaDB where_document 절로 변환
+    
+    예: ["고추", "짬뽕"] → {"$and": [{"$not_contains": "고추"}, {"$not_contains": "짬뽕"}]}
+    """
+    conditions = [{"$not_contains": term} for term in exclude_terms or [] if term]
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+def build_search_filter(search_filter: Optional[SearchFilter]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """SearchFilter를 (where, where_document) 절로 변환"""
+    if search_filter is None or search_filter.is_empty():
+        return None, None
+    where = build_where_filter(
+        categories=search_filter.categories,
+        exclude_categories=search_filter.exclude_categories,
+        min_price=search_filter.min_price,
+        max_price=search_filter.max_price,
+        min_calories=search_filter.min_calories,
+        max_calories=search_filter.max_calories
+    )
+    return where, build_where_document(search_filter.exclude_terms)
+
+
+class EmbeddingCache:
+    """
+    질문 임베딩 LRU 캐시 (스레드 안전)
+    
+    - 정규화된 질문 텍스트를 키로 사용
+    - 최대 크기를 넘으면 가장 오래 사용되지 않은 항목부터 제거
+    - 히트/미스 횟수를 집계하여 stats()로 제공
+    """
+    
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[List[float]]:
+        """캐시 조회 (히트 시 최근 사용으로 갱신)"""
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+    
+    def put(self, key: str, embedding: List[float]):
+        """캐시 저장 (최대 크기 초과 시 LRU 항목 제거)"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """캐시 비우기 (카운터는 유지)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계 (크기, 히트/미스, 히트율)"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total > 0 else 0.0
+            }
+
+
+class EmbeddingBatcher:
+    """
+    질문 임베딩 마이크로 배치 스케줄러
+    
+    동시에 들어온 요청들이 각자 배치 크기 1로 모델을 호출하는 대신,
+    짧은 시간 창(window_ms) 안에 도착한 질문을 최대 max_batch_size개까지 모아
+    한 번의 encode 호출로 처리한 뒤 각 호출자에게 자신의 벡터를 돌려줌
+    
+    - 전용 데몬 스레드 하나가 큐를 비우며 배치를 구성
+    - 같은 배치 안의 중복 질문은 한 번만 추론
+    - 모델 호출 실패 시 해당 배치의 모든 호출자에게 예외 전달
+    """
+    
+    def __init__(self, embed_fn, window_ms: float = 3.0, max_batch_size: int = 32):
+        self.embed_fn = embed_fn
+        self.window = max(0.0, window_ms) / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+    
+    def embed(self, text: str) -> List[float]:
+        """질문 하나를 큐에 넣고 배치 처리 결과를 기다림"""
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((text, future))
+        return future.result()
+    
+    def _ensure_worker(self):
+        """워커 스레드를 처음 사용할 때 시작"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run,
+                    name="embedding-batcher",
+                    daemon=True
+                )
+                self._worker.start()
+    
+    def _collect_batch(self) -> List[tuple]:
+        """첫 요청을 기다린 뒤 시간 창이 끝나거나 최대 크기가 될 때까지 추가 요청 수집"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    # 시간 창이 끝나도 이미 큐에 쌓인 요청은 함께 처리
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        """배치 수집 → 한 번의 모델 호출 → 결과 분배 반복"""
+        while True:
+            batch = self._collect_batch()
+            unique_texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                vectors = self.embed_fn(unique_texts)
+                by_text = dict(zip(unique_texts, vectors))
+                for text, future in batch:
+                    future.set_result(by_text[text])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            self.batches += 1
+            self.items += len(batch)
+    
+    def stats(self) -> Dict[str, Any]:
+        """배치 통계 (배치 수, 처리 질문 수, 평균 배치 크기)"""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": (self.items / self.batches) if self.batches > 0 else 0.0,
+            "window_ms": self.window * 1000.0,
+            "max_batch_size": self.max_batch_size
+        }
 
 
 class VectorStore:
     """ChromaDB 벡터 저장소 관리 클래스"""
     
-    def __init__(self, collection_name: str = "restaurant_menu"):
+    def __init__(self, collection_name: str = "restaurant_menu", persist_directory: Optional[str] = None):
         self.collection_name = collection_name
-        self.persist_directory = str(CHROMA_DB_PATH)
+        # 저장 위치 (벤치마크 등 별도 DB를 쓸 때만 지정)
+        self.persist_directory = str(persist_directory or CHROMA_DB_PATH)
+        
+        # 질문 임베딩 캐시 (EMBEDDING_CACHE_SIZE=0이면 비활성화)
+        self.embedding_cache = EmbeddingCache(
+            max_size=get_env_int("EMBEDDING_CACHE_SIZE", 1024)
+        )
         
         # 로컬 임베딩 모델 사용 (한국어 지원)
         # jhgan/ko-sroberta-multitask: 한국어 전용 임베딩 모델
         # 또는 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2' (다국어)
+        # 문서 임베딩 배치 크기 / ChromaDB 저장 배치 크기
+        self.embedding_batch_size = get_env_int("EMBEDDING_BATCH_SIZE", 64)
+        self.write_batch_size = get_env_int("CHROMA_WRITE_BATCH_SIZE", 1000)
+        
         logger.info("로컬 임베딩 모델 로딩 중...")
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="jhgan/ko-sroberta-multitask",
-            model_kwargs={'device': 'cpu'},  # GPU가 있으면 'cuda'로 변경 가능
-            encode_kwargs={'normalize_embeddings': True}
-        )
+        # EMBEDDING_BACKEND 설정에 따라 PyTorch 또는 ONNX int8 백엔드 사용
+        # 디스크 임베딩 캐시(EMBEDDING_STORE)가 켜져 있으면 저장된 벡터를 먼저 조회
+        embeddings = create_embeddings(batch_size=self.embedding_batch_size)
+        self.embeddings = wrap_embeddings(embeddings, embedding_model_id(embeddings))
         logger.info("로컬 임베딩 모델 로딩 완료")
         
+        # 동시 요청 질문 임베딩 마이크로 배치 (EMBEDDING_BATCH_WINDOW_MS=0이면 비활성화)
+        window_ms = get_env_float("EMBEDDING_BATCH_WINDOW_MS", 3.0)
+        self.embedding_batcher: Optional[EmbeddingBatcher] = None
+        if window_ms > 0:
+            self.embedding_batcher = EmbeddingBatcher(
+                embed_fn=self._embed_queries,
+                window_ms=window_ms,
+                max_batch_size=get_env_int("EMBEDDING_MAX_BATCH", 32)
+            )
+        
+        # 메뉴명/음식점명/재료 어휘 인덱스 (첫 검색 시 구축, LEXICAL_INDEX=0이면 비활성화)
+        self.lexical_index: Optional[LazyLexicalIndex] = None
+        if get_env_int("LEXICAL_INDEX", 1):
+            self.lexical_index = LazyLexicalIndex(self.load_all_documents)
+        self.lexical_fast_path = bool(get_env_int("LEXICAL_FAST_PATH", 1))
+        
         self.client = None
         self.collection = None
         self._initialize()
+        
+        # 가격/칼로리 where 절($lte/$gte) 사용 가능 여부 (문자열로 저장된 예전 컬렉션이면 변환 시도)
+        self.numeric_filters = self._ensure_numeric_metadata()
     
     def _initialize(self):
         """벡터 저장소 초기화"""
@@ -92,66 +387,219 @@ class VectorStore:
             logger.error(f"벡터 저장소 초기화 실패: {e}")
             raise
     
+    def _has_string_numeric_metadata(self, sample_size: int = 200) -> bool:
+        """앞쪽 문서 일부를 조회하여 가격/칼로리가 문자열로 저장되어 있는지 확인"""
+        batch = self.collection.get(limit=sample_size, include=["metadatas"])
+        for metadata in batch.get("metadatas") or []:
+            for field in NUMERIC_METADATA_FIELDS:
+                if isinstance((metadata or {}).get(field), str):
+                    return True
+        return False
+    
+    def _ensure_numeric_metadata(self) -> bool:
+        """
+        가격/칼로리가 문자열로 저장된 예전 컬렉션 감지 및 변환
+        
+        문자열 메타데이터에는 where 절의 $lte/$gte가 하나도 일치하지 않아
+        "만원 이하 한식" 같은 질문의 결과가 0건이 됨
+        - NUMERIC_METADATA_AUTO_MIGRATE=1(기본값)이면 그 자리에서 정수로 변환
+        - 변환하지 않거나 실패하면 False를 반환하여 가격/칼로리 조건은 검색 후에 걸러냄
+        """
+        try:
+            if not self._has_string_numeric_metadata():
+                return True
+        except Exception as e:
+            logger.warning(f"[벡터DB] 메타데이터 형식 확인 실패: {e}")
+            return True
+        
+        logger.warning(f"[벡터DB] 컬렉션 {self.collection_name}의 가격/칼로리가 문자열로 저장되어 있습니다")
+        if get_env_int("NUMERIC_METADATA_AUTO_MIGRATE", 1):
+            try:
+                self.migrate_numeric_metadata()
+                return True
+            except Exception as e:
+                logger.error(f"[벡터DB] 가격/칼로리 메타데이터 자동 변환 실패: {e}")
+        logger.error(
+            "[벡터DB] 가격/칼로리 조건을 where 절 대신 검색 후 필터로 적용합니다. "
+            "python scripts/migrate_numeric_metadata.py 로 컬렉션을 변환하세요"
+        )
+        return False
+    
     def _embed_text(self, text: str) -> List[float]:
-        """텍스트를 벡터로 변환"""
-        return self.embeddings.embed_query(text)
+        """
+        질문 텍스트를 벡터로 변환 (LRU 캐시 사용)
+        
+        정규화된 텍스트를 키이자 임베딩 입력으로 사용하므로
+        "전주 비빔밥 추천?"과 "전주  비빔밥 추천"은 같은 벡터를 공유함
+        """
+        key = normalize_query(text) or text
+        cached = self.embedding_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        if self.embedding_batcher is not None:
+            embedding = self.embedding_batcher.embed(key)
+        else:
+            embedding = self.embeddings.embed_query(key)
+        self.embedding_cache.put(key, embedding)
+        return embedding
+    
+    def embed_query(self, text: str) -> List[float]:
+        """질문 임베딩 (캐시/마이크로 배치 포함, 외부 모듈용)"""
+        return self._embed_text(text)
+    
+    def _embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서 텍스트 목록을 한 번의 배치 호출로 벡터화 (질문 캐시를 거치지 않음, 디스크 캐시에 저장)"""
+        return self.embeddings.embed_documents(texts)
+    
+    def _embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """질문 목록을 한 번의 배치 호출로 벡터화 (디스크 캐시는 조회만, 마이크로 배치용)"""
+        embed_queries = getattr(self.embeddings, "embed_queries", None)
+        if embed_queries is not None:
+            return embed_queries(texts)
+        return self.embeddings.embed_documents(texts)
+    
+    def _max_write_batch_size(self) -> int:
+        """ChromaDB 한 번의 add 호출에 넣을 최대 문서 수"""
+        write_batch_size = self.write_batch_size
+        try:
+            # chromadb 버전에 따라 속성/메서드 이름이 다름
+            max_batch = getattr(self.client, "max_batch_size", None)
+            if max_batch is None and hasattr(self.client, "get_max_batch_size"):
+                max_batch = self.client.get_max_batch_size()
+            if max_batch:
+                write_batch_size = min(write_batch_size, int(max_batch))
+        except Exception as e:
+            logger.debug(f"ChromaDB 최대 배치 크기 조회 실패: {e}")
+        return max(1, write_batch_size)
+    
+    def _write_chunk(
+        self,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str],
+        embeddings: List[List[float]],
+        upsert: bool
+    ):
+        """최대 배치 크기 이하의 청크 하나를 ChromaDB에 저장"""
+        write = self.collection.upsert if upsert else self.collection.add
+        write(embeddings=embeddings, documents=texts, metadatas=metadatas, ids=ids)
+    
+    def write_embeddings(
+        self,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str],
+        embeddings: List[List[float]],
+        upsert: bool = True
+    ):
+        """
+        이미 계산된 임베딩을 그대로 저장 (스트리밍 적재 파이프라인 app/ingestion.py용)
+        
+        ChromaDB 최대 배치 크기 단위로 나누어 저장하고 어휘 인덱스를 무효화함
+        """
+        try:
+            write_batch_size = self._max_write_batch_size()
+            for start in range(0, len(texts), write_batch_size):
+                end = start + write_batch_size
+                self._write_chunk(texts[start:end], metadatas[start:end], ids[start:end], embeddings[start:end], upsert)
+        finally:
+            if self.lexical_index is not None:
+                self.lexical_index.invalidate()
     
     def add_documents(
         self, 
         texts: List[str], 
         metadatas: Optional[List[Dict[str, Any]]] = None,
-        ids: Optional[List[str]] = None
+        ids: Optional[List[str]] = None,
+        batch_size: Optional[int] = None,
+        upsert: bool = False
     ):
-        """문서 추가"""
+        """
+        문서 추가 (배치 임베딩 + 청크 단위 저장)
+        
+        - 임베딩은 batch_size개씩 묶어 모델을 한 번에 호출
+        - ChromaDB에는 최대 배치 크기 이하의 청크 단위로 바로 저장하므로
+          전체 임베딩 목록을 메모리에 모아두지 않음
+        
+        Args:
+            texts: 문서 텍스트 목록
+            metadatas: 메타데이터 목록 (선택사항)
+            ids: 문서 ID 목록 (없으면 자동 생성)
+            batch_size: 임베딩 배치 크기 (없으면 EMBEDDING_BATCH_SIZE 설정값)
+            upsert: True면 같은 ID의 기존 문서를 덮어씀 (증분 동기화용)
+        """
         try:
-            # 텍스트를 벡터로 변환
-            logger.info(f"{len(texts)}개 문서를 벡터로 변환 중...")
-            embeddings_list = []
-            for i, text in enumerate(texts):
-                if (i + 1) % 50 == 0:
-                    logger.info(f"진행 중: {i + 1}/{len(texts)}")
-                embedding = self._embed_text(text)
-                embeddings_list.append(embedding)
+            total = len(texts)
+            batch_size = max(1, batch_size or self.embedding_batch_size)
+            write_batch_size = self._max_write_batch_size()
             
             # ID가 없으면 자동 생성
             if ids is None:
-                ids = [f"doc_{i}" for i in range(len(texts))]
+                ids = [f"doc_{i}" for i in range(total)]
+            if metadatas is None:
+                metadatas = [{}] * total
             
-            # ChromaDB에 추가
-            self.collection.add(
-                embeddings=embeddings_list,
-                documents=texts,
-                metadatas=metadatas or [{}] * len(texts),
-                ids=ids
-            )
-            logger.info(f"{len(texts)}개 문서 추가 완료")
+            logger.info(f"{total}개 문서를 벡터로 변환 중... (임베딩 배치: {batch_size}, 저장 배치: {write_batch_size})")
+            start = time.time()
+            
+            for write_start in range(0, total, write_batch_size):
+                write_end = min(write_start + write_batch_size, total)
+                chunk_texts = texts[write_start:write_end]
+                
+                # 청크 내부를 임베딩 배치 단위로 변환
+                chunk_embeddings = []
+                for batch_start in range(0, len(chunk_texts), batch_size):
+                    chunk_embeddings.extend(
+                        self._embed_documents(chunk_texts[batch_start:batch_start + batch_size])
+                    )
+                
+                # ChromaDB에 추가 (upsert면 같은 ID 덮어쓰기)
+                self._write_chunk(
+                    chunk_texts, metadatas[write_start:write_end], ids[write_start:write_end],
+                    chunk_embeddings, upsert
+                )
+                
+                elapsed = time.time() - start
+                rate = write_end / elapsed if elapsed > 0 else 0.0
+                logger.info(f"진행 중: {write_end}/{total} ({rate:.1f}문서/초)")
+            
+            logger.info(f"{total}개 문서 추가 완료 ({time.time() - start:.2f}초)")
         except Exception as e:
             logger.error(f"문서 추가 실패: {e}")
             raise
+        finally:
+            if self.lexical_index is not None:
+                self.lexical_index.invalidate()
     
     def similarity_search(
         self, 
         query: str, 
         k: int = 8,
-        filter: Optional[Dict[str, Any]] = None
+        filter: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
-        """유사도 검색"""
+        """유사도 검색 (filter: 메타데이터 where 절, where_document: 문서 내용 조건)"""
         try:
             # 쿼리를 벡터로 변환 (시간 측정)
             start = time.time()
             query_embedding = self._embed_text(query)
             embedding_time = time.time() - start
-            logger.info(f"[벡터DB] 임베딩 생성 시간: {embedding_time:.2f}초")
+            record_span("embedding", start)
+            logger.info(f"[벡터DB] 임베딩 생성 시간: {embedding_time:.2f}초 (캐시 히트율: {self.embedding_cache.stats()['hit_rate']:.1%})")
             
             # ChromaDB에서 검색 (시간 측정)
             start = time.time()
             results = self.collection.query(
                 query_embeddings=[query_embedding],
                 n_results=k,
-                where=filter
+                where=filter,
+                where_document=where_document
             )
             search_time = time.time() - start
+            record_span("vector_query", start, filtered=bool(filter or where_document))
             logger.info(f"[벡터DB] 검색 시간: {search_time:.2f}초")
+            observe_vector_query("chroma", embedding_time, search_time, bool(filter or where_document))
             logger.info(f"[벡터DB] 총 벡터 검색 시간: {embedding_time + search_time:.2f}초")
             
             # 결과 포맷팅
@@ -175,79 +623,110 @@ class VectorStore:
         category: Optional[str] = None,
         max_price: Optional[int] = None,
         max_calories: Optional[int] = None,
+        k: int = 8,
+        min_price: Optional[int] = None,
+        min_calories: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        필터링이 포함된 검색
+        
+        가격/칼로리는 정수 메타데이터로 저장되어 있으므로 모든 조건을 where 절로
+        ChromaDB에 전달하여 순위 계산 전에 적용함 (과다 조회 후 후처리 없음)
+        → 조건에 맞는 문서가 k개 이상이면 항상 k개를 반환
+        """
+        search_filter = SearchFilter(
+            categories=[category] if category else [],
+            min_price=min_price,
+            max_price=max_price,
+            min_calories=min_calories,
+            max_calories=max_calories
+        )
+        return self._vector_search(query, search_filter, k)
+    
+    def _vector_search(
+        self,
+        query: str,
+        search_filter: Optional[SearchFilter],
+        k: int
+    ) -> List[Dict[str, Any]]:
+        """
+        SearchFilter를 where/where_document 절로 적용한 벡터 검색
+        
+        숫자 where 절을 쓸 수 없는 컬렉션(self.numeric_filters=False)이면
+        가격/칼로리 조건을 빼고 k * NUMERIC_POST_FILTER_FACTOR개를 조회한 뒤 걸러냄
+        """
+        post_filter = None
+        if not self.numeric_filters and search_filter is not None and search_filter.has_numeric_bounds():
+            post_filter = search_filter
+            search_filter = search_filter.without_numeric_bounds()
+        
+        fetch_k = k * NUMERIC_POST_FILTER_FACTOR if post_filter is not None else k
+        where, where_document = build_search_filter(search_filter)
+        if where is None and where_document is None:
+            results = self.similarity_search(query, k=fetch_k)
+        else:
+            logger.info(f"[벡터DB] 필터 조건: where={where}, where_document={where_document}")
+            results = self.similarity_search(query, k=fetch_k, filter=where, where_document=where_document)
+        
+        if post_filter is not None:
+            results = [r for r in results if post_filter.matches(r["metadata"], r["content"])][:k]
+        return results
+    
+    def search(
+        self,
+        query: str,
+        search_filter: Optional[SearchFilter] = None,
         k: int = 8
     ) -> List[Dict[str, Any]]:
-        """필터링이 포함된 검색"""
-        try:
-            # 필터 조건 구성
-            where_filter = {}
-            
-            if category:
-                where_filter["category"] = category
-            
-            # 가격 필터 (ChromaDB는 숫자 비교를 위해 문자열로 저장된 경우 처리 필요)
-            # 실제 구현에서는 메타데이터의 price를 숫자로 변환하여 필터링
-            
-            # 쿼리를 벡터로 변환 (시간 측정)
-            start = time.time()
-            query_embedding = self._embed_text(query)
-            embedding_time = time.time() - start
-            logger.info(f"[벡터DB] 임베딩 생성 시간: {embedding_time:.2f}초")
-            
-            # ChromaDB에서 검색 (시간 측정)
-            start = time.time()
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=k * 2 if where_filter else k,  # 필터링 시 더 많이 가져와서 필터링
-                where=where_filter if where_filter else None
+        """
+        SearchFilter(질문에서 추출한 필터 스펙)를 적용한 검색
+        
+        카테고리/가격/칼로리는 where 절, 제외 단어는 where_document 절로
+        ChromaDB에 전달하여 순위 계산 전에 후보를 줄임 (과다 조회 후 후처리 없음)
+        
+        어휘 인덱스가 켜져 있으면:
+        - 질문에 메뉴명이 단어 경계에 맞게 있고 나머지가 가격/추천 요청 같은 군말뿐이면(강한 일치)
+          임베딩 없이 어휘 검색 결과 반환 ("비빔밥이랑 비슷한 거 추천"처럼 의도가 있으면 RRF)
+        - 아니면 벡터 검색 결과와 BM25 결과를 RRF로 결합
+        """
+        lexical_results = None
+        if self.lexical_index is not None:
+            try:
+                start = time.time()
+                lexical_results, strong = self.lexical_index.get().search(query, k=k, search_filter=search_filter)
+                record_span("lexical_search", start, strong=strong)
+                logger.info(f"[어휘 인덱스] 검색 시간: {(time.time() - start) * 1000:.1f}ms (강한 일치: {strong})")
+                if strong and self.lexical_fast_path:
+                    return lexical_results
+            except Exception as e:
+                logger.error(f"어휘 검색 실패: {e}")
+                lexical_results = None
+        
+        vector_results = self._vector_search(query, search_filter, k)
+        
+        if not lexical_results:
+            return vector_results
+        return reciprocal_rank_fusion([vector_results, lexical_results], k=k)
+    
+    def load_all_documents(self) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """컬렉션의 전체 문서/메타데이터를 페이지 단위로 조회 (어휘 인덱스, 메뉴 직접 조회 구축용)"""
+        documents: List[str] = []
+        metadatas: List[Dict[str, Any]] = []
+        page_size = self._max_write_batch_size()
+        offset = 0
+        while True:
+            batch = self.collection.get(
+                limit=page_size,
+                offset=offset,
+                include=["documents", "metadatas"]
             )
-            search_time = time.time() - start
-            logger.info(f"[벡터DB] 검색 시간: {search_time:.2f}초")
-            
-            # 결과 포맷팅 및 추가 필터링 (시간 측정)
-            filter_start = time.time()
-            formatted_results = []
-            if results['documents'] and len(results['documents'][0]) > 0:
-                for i in range(len(results['documents'][0])):
-                    metadata = results['metadatas'][0][i] if results['metadatas'] else {}
-                    
-                    # 가격 필터링
-                    if max_price:
-                        try:
-                            price = int(metadata.get("price", "999999"))
-                            if price > max_price:
-                                continue
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    # 칼로리 필터링
-                    if max_calories:
-                        try:
-                            calories = int(metadata.get("calories", "999999"))
-                            if calories > max_calories:
-                                continue
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    formatted_results.append({
-                        "content": results['documents'][0][i],
-                        "metadata": metadata,
-                        "score": results['distances'][0][i] if results['distances'] else 0.0
-                    })
-                    
-                    # k개만 반환
-                    if len(formatted_results) >= k:
-                        break
-            
-            filter_time = time.time() - filter_start
-            total_time = embedding_time + search_time + filter_time
-            logger.info(f"[벡터DB] 필터링 시간: {filter_time:.2f}초")
-            logger.info(f"[벡터DB] 총 벡터 검색 시간: {total_time:.2f}초")
-            
-            return formatted_results
-        except Exception as e:
-            logger.error(f"필터링 검색 실패: {e}")
-            return self.similarity_search(query, k=k)  # 필터링 실패 시 일반 검색
+            ids = batch.get("ids") or []
+            if not ids:
+                break
+            documents.extend(batch.get("documents") or [""] * len(ids))
+            metadatas.extend(batch.get("metadatas") or [{}] * len(ids))
+            offset += len(ids)
+        return documents, metadatas
     
     def similarity_search_with_retriever(
         self,
@@ -264,10 +743,114 @@ class VectorStore:
             for r in results
         ]
     
+    def migrate_numeric_metadata(self, batch_size: int = 500) -> Dict[str, int]:
+        """
+        기존 컬렉션의 가격/칼로리 메타데이터를 문자열에서 정수로 변환
+        
+        예전 init_vectorstore.py는 CSV 문자열을 그대로 저장했기 때문에
+        where 절의 $lte/$gte 비교가 동작하지 않음. 임베딩은 그대로 두고
+        메타데이터만 배치 단위로 갱신함
+        
+        Returns:
+            {"scanned": 조회한 문서 수, "updated": 변환한 문서 수, "invalid": 숫자가 아닌 값 수}
+        """
+        stats = {"scanned": 0, "updated": 0, "invalid": 0}
+        offset = 0
+        while True:
+            batch = self.collection.get(
+                limit=batch_size,
+                offset=offset,
+                include=["metadatas"]
+            )
+            ids = batch.get("ids") or []
+            if not ids:
+                break
+            
+            update_ids = []
+            update_metadatas = []
+            for doc_id, metadata in zip(ids, batch.get("metadatas") or []):
+                metadata = metadata or {}
+                needs_update = False
+                for field in NUMERIC_METADATA_FIELDS:
+                    value = metadata.get(field)
+                    if value is None or isinstance(value, int):
+                        continue
+                    if parse_int(value) is None:
+                        stats["invalid"] += 1
+                    else:
+                        needs_update = True
+                if needs_update:
+                    typed = dict(metadata)
+                    for field in NUMERIC_METADATA_FIELDS:
+                        value = parse_int(typed.get(field))
+                        if value is not None:
+                            typed[field] = value
+                    update_ids.append(doc_id)
+                    update_metadatas.append(typed)
+            
+            if update_ids:
+                self.collection.update(ids=update_ids, metadatas=update_metadatas)
+            
+            stats["scanned"] += len(ids)
+            stats["updated"] += len(update_ids)
+            offset += len(ids)
+            logger.info(f"메타데이터 변환 진행 중: {stats['scanned']}개 확인, {stats['updated']}개 변환")
+        
+        if stats["updated"] and self.lexical_index is not None:
+            self.lexical_index.invalidate()
+        self.numeric_filters = True
+        logger.info(f"메타데이터 변환 완료: {stats}")
+        return stats
+    
+    def get_content_hashes(self, batch_size: int = 1000) -> Dict[str, Optional[str]]:
+        """
+        저장된 문서 ID → content_hash 메타데이터 조회 (증분 동기화용)
+        
+        content_hash가 없는 예전 문서는 None (변경된 것으로 취급되어 한 번 다시 임베딩됨)
+        """
+        hashes: Dict[str, Optional[str]] = {}
+        offset = 0
+        while True:
+            batch = self.collection.get(
+                limit=batch_size,
+                offset=offset,
+                include=["metadatas"]
+            )
+            ids = batch.get("ids") or []
+            if not ids:
+                break
+            for doc_id, metadata in zip(ids, batch.get("metadatas") or [{}] * len(ids)):
+                hashes[doc_id] = (metadata or {}).get("content_hash")
+            offset += len(ids)
+        return hashes
+    
+    def delete_documents(self, ids: List[str]):
+        """ID 목록의 문서 삭제 (ChromaDB 최대 배치 크기 단위)"""
+        write_batch_size = self._max_write_batch_size()
+        for start in range(0, len(ids), write_batch_size):
+            self.collection.delete(ids=ids[start:start + write_batch_size])
+        if ids and self.lexical_index is not None:
+            self.lexical_index.invalidate()
+        logger.info(f"{len(ids)}개 문서 삭제 완료")
+    
+    def reset_collection(self):
+        """컬렉션을 삭제하고 빈 컬렉션으로 다시 생성 (임베딩 모델은 다시 로드하지 않음)"""
+        try:
+            self.delete_collection()
+        except Exception:
+            logger.info("기존 컬렉션이 없거나 삭제 불가")
+        self.collection = self.client.create_collection(
+            name=self.collection_name,
+            metadata={"description": "음식점 메뉴 데이터"}
+        )
+        logger.info(f"새 컬렉션 생성: {self.collection_name}")
+    
     def delete_collection(self):
         """컬렉션 삭제"""
         try:
             self.client.delete_collection(name=self.collection_name)
+            if self.lexical_index is not None:
+                self.lexical_index.invalidate()
             logger.info(f"컬렉션 삭제 완료: {self.collection_name}")
         except Exception as e:
             logger.error(f"컬렉션 삭제 실패: {e}")
@@ -279,8 +862,19 @@ vectorstore_instance: Optional[VectorStore] = None
 
 
 def get_vectorstore() -> VectorStore:
-    """벡터 저장소 인스턴스 가져오기"""
+    """
+    벡터 저장소 인스턴스 가져오기
+    
+    VECTORSTORE_ENGINE 설정으로 검색 엔진 선택:
+    - chroma (기본): ChromaDB
+    - simple: NumPy 인메모리 정확 검색 (app/simple_store.py)
+    """
     global vectorstore_instance
     if vectorstore_instance is None:
-        vectorstore_instance = VectorStore()
+        engine = get_env_optional("VECTORSTORE_ENGINE", "chroma").lower()
+        if engine == "simple":
+            from app.simple_store import SimpleVectorStore
+            vectorstore_instance = SimpleVectorStore()
+        else:
+            vectorstore_instance = VectorStore()
     return vectorstore_instance
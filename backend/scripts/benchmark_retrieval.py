@@ -0,0 +1,343 @@
+"""
+검색(VectorStore) 지연 시간 벤치마크 (코퍼스 크기별)
+
+이 파일의 역할:
+- 재현 가능한 합성 메뉴 데이터(scripts/generate_dummy_data.py)로 크기별 ChromaDB 컬렉션 생성
+  (기본 10^3, 10^4, 10^5, 10^6 문서, 한 번 만든 컬렉션은 다음 실행 때 재사용)
+- similarity_search / search_with_filters 호출당 지연 시간 p50/p95/p99, QPS 측정
+- 호출 시간을 질문 임베딩 시간과 인덱스(ChromaDB 검색) 시간으로 나눠 기록
+- 최대 메모리 사용량(peak RSS) 기록
+- 결과를 JSON으로 저장하여 커밋별로 비교 (커밋 해시 포함)
+
+왜 필요한가:
+- test_api.py/run_test.py는 실제 서버와 OpenAI 키로 HTTP 호출 한 번의 시간만 잼
+- 전국 단위 데이터로 늘어났을 때 현재 ChromaDB 설정이 어디서부터 느려지는지 알아야 함
+
+사용 방법:
+- python scripts/benchmark_retrieval.py                                  # 실제 임베딩 모델, 10^3~10^6
+- python scripts/benchmark_retrieval.py --embedder hash                  # 모델 없이 빠르게 코퍼스 생성 (인덱스 시간만 의미 있음)
+- python scripts/benchmark_retrieval.py --sizes 1000,10000 --queries 500 --concurrency 4
+- python scripts/benchmark_retrieval.py --output benchmark_results/main.json
+
+참고:
+- 질문 임베딩 캐시와 마이크로 배치는 끄고 측정 (매 호출이 실제로 임베딩하도록)
+- peak RSS는 프로세스 전체 최댓값이므로 크기 오름차순으로 측정하며,
+  크기별로 따로 보려면 --sizes에 하나씩 지정하여 실행
+- 10^6 문서를 실제 모델로 임베딩하면 CPU에서 수 시간 걸리므로 --embedder hash 권장
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 프로젝트 루트 경로 설정
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(Path(__file__).parent))
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:  # Windows
+    HAS_RESOURCE = False
+
+
+# 측정용 질문 (실제 서비스 질문 형태)
+QUERIES = [
+    "전주 비빔밥 맛집 추천해줘",
+    "콩나물국밥 잘하는 곳 어디야",
+    "만원 이하로 먹을 수 있는 점심 메뉴",
+    "다이어트 중인데 칼로리 낮은 메뉴 알려줘",
+    "매운 음식 먹고 싶어",
+    "아이랑 같이 갈 만한 양식집",
+    "비 오는 날 먹기 좋은 국물 요리",
+    "치킨 순살로 시킬 수 있는 곳",
+    "디저트 카페 추천",
+    "회식하기 좋은 중식당 코스 요리",
+    "혼밥하기 좋은 분식집",
+    "돈까스 맛있는 일식집",
+    "한정식 코스 가격이 궁금해",
+    "해물 들어간 메뉴 추천",
+    "가볍게 먹을 샐러드",
+    "팥빙수 파는 곳 있어?",
+]
+
+# search_with_filters 조건 (카테고리/가격/칼로리 조합)
+FILTER_CASES = [
+    {"category": "한식", "max_price": 10000},
+    {"max_calories": 500},
+    {"category": "카페/디저트", "max_price": 6000},
+    {"min_price": 15000, "category": "양식"},
+    {"max_price": 8000, "max_calories": 600},
+]
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+DEFAULT_OUTPUT_DIR = project_root / "benchmark_results"
+
+
+def configure_environment(embedder: str):
+    """
+    VectorStore를 만들기 전에 측정용 설정 적용
+
+    - 질문 임베딩 캐시/마이크로 배치/어휘 인덱스 끔 (캐시 히트로 임베딩 시간이 0이 되지 않도록)
+    - hash 임베딩은 디스크 임베딩 캐시에 저장하지 않음
+    """
+    os.environ["EMBEDDING_CACHE_SIZE"] = "0"
+    os.environ["EMBEDDING_BATCH_WINDOW_MS"] = "0"
+    os.environ["LEXICAL_INDEX"] = "0"
+    if embedder == "hash":
+        os.environ["EMBEDDING_BACKEND"] = "hash"
+        os.environ["EMBEDDING_STORE"] = "0"
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def peak_rss_mb() -> float:
+    """프로세스 최대 RSS (MB, Linux는 KB 단위, macOS는 바이트 단위)"""
+    if not HAS_RESOURCE:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if platform.system() == "Darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def percentile(values, q: float) -> float:
+    """선형 보간 백분위수 (values는 정렬된 목록)"""
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def summarize_ms(samples) -> dict:
+    ordered = sorted(samples)
+    return {
+        "mean": round(statistics.fmean(ordered) * 1000, 3) if ordered else 0.0,
+        "p50": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99": round(percentile(ordered, 0.99) * 1000, 3),
+        "max": round(ordered[-1] * 1000, 3) if ordered else 0.0
+    }
+
+
+def generate_corpus_csv(csv_path: Path, size: int, seed: int):
+    """합성 메뉴 CSV를 정확히 size행으로 생성 (generate_dummy_data.py와 같은 규칙)"""
+    import csv
+    from generate_dummy_data import (
+        parse_args, generate_restaurant_rows, build_menu_pool, FIELDNAMES, MENU_ITEMS, DEFAULT_CATEGORY_WEIGHTS
+    )
+
+    options = parse_args(["--seed", str(seed), "--menus-per-restaurant", "8-12"])
+    categories = list(MENU_ITEMS)
+    weights = [DEFAULT_CATEGORY_WEIGHTS[c] for c in categories]
+    menu_pools = {c: build_menu_pool(c) for c in categories}
+
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(csv_path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        written = 0
+        restaurant_id = 1
+        while written < size:
+            rows = generate_restaurant_rows(restaurant_id, written + 1, options, categories, weights, menu_pools)
+            rows = rows[:size - written]
+            writer.writerows(rows)
+            written += len(rows)
+            restaurant_id += 1
+
+
+def open_corpus(size: int, args):
+    """
+    크기별 벤치마크 컬렉션 열기 (없거나 문서 수가 다르면 생성)
+
+    Returns:
+        (VectorStore, 적재 통계 또는 None(재사용))
+    """
+    from app.vectorstore import VectorStore
+    from app.ingestion import create_ingestion_pipeline, ChromaSink
+    from init_vectorstore import build_menu_document
+
+    collection_name = f"bench_{args.embedder}_s{args.seed}_{size}"
+    vectorstore = VectorStore(collection_name=collection_name, persist_directory=str(args.db_path))
+    if not args.rebuild and vectorstore.collection.count() == size:
+        print(f"  기존 컬렉션 재사용: {collection_name}")
+        return vectorstore, None
+
+    print(f"  코퍼스 생성: {size}개 문서 → {collection_name}")
+    csv_path = Path(args.db_path) / f"{collection_name}.csv"
+    generate_corpus_csv(csv_path, size, args.seed)
+    vectorstore.reset_collection()
+    pipeline = create_ingestion_pipeline(
+        csv_path=csv_path,
+        format_row=lambda row: [build_menu_document(row)],
+        embed_fn=vectorstore.embeddings.embed_documents,
+        sink=ChromaSink(vectorstore),
+        checkpoint_path=None,
+        batch_size=args.batch_size
+    )
+    stats = pipeline.run(resume=False)
+    csv_path.unlink(missing_ok=True)
+    return vectorstore, {
+        "elapsed_seconds": stats["elapsed_seconds"],
+        "documents_per_second": stats["documents_per_second"],
+        "stage_seconds": stats["stage_seconds"]
+    }
+
+
+def run_case(vectorstore, call, queries, args) -> dict:
+    """
+    한 검색 방식의 지연 시간/처리량 측정
+
+    VectorStore._embed_text를 감싸 호출마다 임베딩 시간을 기록하고,
+    전체 호출 시간에서 빼서 인덱스 시간을 계산
+    """
+    import threading
+
+    local = threading.local()
+    original_embed = vectorstore._embed_text
+
+    def timed_embed(text):
+        start = time.perf_counter()
+        try:
+            return original_embed(text)
+        finally:
+            local.embed_seconds = time.perf_counter() - start
+
+    def one_call(query):
+        local.embed_seconds = 0.0
+        start = time.perf_counter()
+        results = call(query)
+        total = time.perf_counter() - start
+        return total, local.embed_seconds, len(results)
+
+    vectorstore._embed_text = timed_embed
+    try:
+        for query in queries[:args.warmup]:
+            one_call(query)
+
+        workload = [queries[i % len(queries)] for i in range(args.queries)]
+        started = time.perf_counter()
+        if args.concurrency > 1:
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                measurements = list(executor.map(one_call, workload))
+        else:
+            measurements = [one_call(query) for query in workload]
+        wall = time.perf_counter() - started
+    finally:
+        del vectorstore._embed_text
+
+    totals = [m[0] for m in measurements]
+    embeds = [m[1] for m in measurements]
+    return {
+        "calls": len(measurements),
+        "qps": round(len(measurements) / wall, 2) if wall > 0 else 0.0,
+        "empty_results": sum(1 for m in measurements if m[2] == 0),
+        "latency_ms": summarize_ms(totals),
+        "embedding_ms": summarize_ms(embeds),
+        "index_ms": summarize_ms([t - e for t, e in zip(totals, embeds)])
+    }
+
+
+def benchmark_size(size: int, args) -> dict:
+    print(f"\n[{size}개 문서]")
+    vectorstore, ingest = open_corpus(size, args)
+
+    cases = {}
+    cases["similarity_search"] = run_case(
+        vectorstore, lambda q: vectorstore.similarity_search(q, k=args.k), QUERIES, args
+    )
+    # 질문과 필터 조건을 번갈아 조합
+    filter_queries = [(q, FILTER_CASES[i % len(FILTER_CASES)]) for i, q in enumerate(QUERIES)]
+    cases["search_with_filters"] = run_case(
+        vectorstore, lambda qf: vectorstore.search_with_filters(qf[0], k=args.k, **qf[1]), filter_queries, args
+    )
+
+    for name, case in cases.items():
+        print(f"  {name}: p50 {case['latency_ms']['p50']}ms, p95 {case['latency_ms']['p95']}ms, "
+              f"p99 {case['latency_ms']['p99']}ms, {case['qps']} QPS "
+              f"(임베딩 p50 {case['embedding_ms']['p50']}ms, 인덱스 p50 {case['index_ms']['p50']}ms)")
+
+    result = {
+        "size": size,
+        "documents": vectorstore.collection.count(),
+        "ingest": ingest,
+        "cases": cases,
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+    print(f"  peak RSS: {result['peak_rss_mb']}MB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VectorStore 검색 지연 시간 벤치마크 (코퍼스 크기별)")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="문서 수 목록, 쉼표 구분 (기본 1000,10000,100000,1000000)")
+    parser.add_argument("--embedder", choices=["model", "hash"], default="model",
+                        help="model: 설정된 임베딩 모델, hash: 모델 없는 해시 벡터 (빠른 코퍼스 생성)")
+    parser.add_argument("--queries", type=int, default=200, help="검색 방식별 측정 호출 수")
+    parser.add_argument("--warmup", type=int, default=5, help="측정 전 워밍업 호출 수")
+    parser.add_argument("--concurrency", type=int, default=1, help="동시 호출 스레드 수 (1이면 순차)")
+    parser.add_argument("--k", type=int, default=8, help="검색 결과 수")
+    parser.add_argument("--seed", type=int, default=42, help="합성 데이터 시드")
+    parser.add_argument("--batch-size", type=int, default=None, help="코퍼스 적재 배치 크기")
+    parser.add_argument("--rebuild", action="store_true", help="기존 벤치마크 컬렉션을 지우고 다시 생성")
+    parser.add_argument("--db-path", default=str(project_root / "chroma_db" / "benchmark"),
+                        help="벤치마크 전용 ChromaDB 경로 (서비스 DB와 분리)")
+    parser.add_argument("--output", default=None,
+                        help="결과 JSON 경로 (기본 benchmark_results/retrieval_<커밋>_<시각>.json)")
+    args = parser.parse_args()
+
+    configure_environment(args.embedder)
+    from app.utils import logger
+    # 검색마다 남기는 INFO 로그는 측정에서 제외
+    logger.setLevel("WARNING")
+
+    sizes = sorted(int(s) for s in args.sizes.split(",") if s.strip())
+    commit = current_commit()
+    report = {
+        "benchmark": "retrieval",
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()},
+        "config": {
+            "embedder": args.embedder,
+            "embedding_backend": os.environ.get("EMBEDDING_BACKEND", "torch"),
+            "queries": args.queries,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "k": args.k,
+            "seed": args.seed
+        },
+        "results": []
+    }
+
+    for size in sizes:
+        report["results"].append(benchmark_size(size, args))
+
+    output = Path(args.output) if args.output else \
+        DEFAULT_OUTPUT_DIR / f"retrieval_{commit}_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+질문 검증(validate_question) 마이크로 벤치마크
+
+이 파일의 역할:
+- 예전 구현(키워드 목록을 요청마다 만들고 `in`으로 하나씩 검사)과
+  현재 구현(시작 시 컴파일한 키워드 정규식)의 호출당 시간 비교
+- 실제 질문 + 경계/악의적 입력(긴 입력, 대소문자, 키워드 겹침) 코퍼스에서
+  두 구현의 판정이 모두 같은지 확인 (다르면 종료 코드 1)
+
+사용 방법:
+- python scripts/benchmark_validate_question.py
+- python scripts/benchmark_validate_question.py --repeat 5000
+- QUESTION_KEYWORDS_PATH=my_keywords.json python scripts/benchmark_validate_question.py --skip-legacy-check
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# 프로젝트 루트 경로 설정
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils import validate_question, classify_question
+
+
+def legacy_validate_question(question: str) -> tuple:
+    """예전 구현 (비교 기준, 기본 키워드 설정과 동일한 목록)"""
+    REJECTION_MESSAGE = "이 서비스는 전주 지역 음식점 추천만 제공하고 있어요.\n전주 맛집이나 음식 관련 질문을 해 주세요 🙂"
+    question_lower = question.lower()
+    forbidden_keywords = [
+        "노래", "음악", "가수", "앨범", "곡", "뮤직",
+        "영화", "드라마", "배우", "감독", "영화관", "극장",
+        "번역", "translate", "translation",
+        "코딩", "프로그래밍", "코드", "개발", "프로그래머",
+        "수학", "수식", "계산", "방정식",
+        "날씨", "기상", "온도", "비", "눈",
+        "뉴스", "시사", "정치", "경제"
+    ]
+    for keyword in forbidden_keywords:
+        if keyword in question_lower:
+            return (False, REJECTION_MESSAGE)
+    allowed_keywords = [
+        "음식", "식당", "맛집", "음식점", "레스토랑",
+        "메뉴", "음식 메뉴", "요리",
+        "가격", "비용", "돈", "원",
+        "칼로리", "열량", "다이어트",
+        "전주", "전주시",
+        "배달", "포장", "테이크아웃",
+        "추천", "어디", "어떤", "맛있는", "좋은"
+    ]
+    for keyword in allowed_keywords:
+        if keyword in question_lower:
+            return (True, "")
+    return (False, REJECTION_MESSAGE)
+
+
+# 실제 서비스 질문 형태
+REAL_QUESTIONS = [
+    "전주 비빔밥 맛집 추천해줘",
+    "전주에서 저렴한 한식 어디가 좋아?",
+    "500칼로리 이하 메뉴 알려줘",
+    "1만원 이하로 먹을 수 있는 점심 추천",
+    "객사 근처 맛있는 콩나물국밥집",
+    "다이어트 중인데 가벼운 음식 있을까?",
+    "한옥마을 디저트 카페 추천",
+    "배달 되는 중식당 있어?",
+    "아이랑 같이 갈만한 식당",
+    "전주시 덕진구 일식 레스토랑",
+    "오늘 저녁 뭐 먹지",
+    "포장 가능한 분식 메뉴",
+    "가격 착한 순대국밥",
+    "어떤 떡갈비가 유명해?",
+    "열량 낮은 요리 추천해줘",
+]
+
+# 경계/악의적 입력 (금지 키워드 우선, 대소문자, 키워드 겹침, 긴 입력)
+ADVERSARIAL_QUESTIONS = [
+    "비빔밥 추천",                      # "비"가 금지 키워드라 거절 (기존 동작 유지)
+    "비용 얼마야?",
+    "눈꽃빙수 맛집",
+    "전주시사 관련 맛집",                # 허용 키워드 뒤에 금지 키워드가 겹침
+    "TRANSLATE 전주 맛집 메뉴",
+    "Translation please",
+    "맛집 노래 추천",
+    "영화관 근처 식당",
+    "파이썬 코드 짜줘",
+    "hello",
+    "",
+    "   ",
+    "🍜🍜🍜",
+    "ㅋ" * 2000,
+    "ㅋ" * 2000 + "맛집",
+    "맛집" + "ㅋ" * 2000 + "날씨",
+    ("전주 맛집 " * 300).strip(),
+    "음식 메뉴",
+    "원",
+]
+
+
+def time_per_call(func, questions, repeat: int) -> float:
+    """호출당 평균 시간 (마이크로초)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for question in questions:
+            func(question)
+    return (time.perf_counter() - start) / (repeat * len(questions)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="validate_question 마이크로 벤치마크")
+    parser.add_argument("--repeat", type=int, default=2000, help="코퍼스 반복 횟수")
+    parser.add_argument("--skip-legacy-check", action="store_true",
+                        help="판정 일치 확인 생략 (키워드 설정을 바꾼 경우)")
+    args = parser.parse_args()
+
+    corpus = REAL_QUESTIONS + ADVERSARIAL_QUESTIONS
+
+    # 1. 판정 일치 확인
+    if not args.skip_legacy_check:
+        mismatches = [
+            q for q in corpus
+            if validate_question(q)[0] != legacy_validate_question(q)[0]
+        ]
+        if mismatches:
+            print(f"[ERROR] 예전 구현과 판정이 다른 질문 {len(mismatches)}개:")
+            for q in mismatches:
+                print(f"  - {q[:60]!r}")
+            sys.exit(1)
+        print(f"[OK] {len(corpus)}개 질문에서 예전 구현과 판정 일치")
+
+    # 2. 분류 결과 예시
+    print("\n분류 결과 예시:")
+    for q in REAL_QUESTIONS[:3] + ADVERSARIAL_QUESTIONS[:4]:
+        print(f"  {q!r}: {classify_question(q)}")
+
+    # 3. 호출당 시간
+    print(f"\n호출당 평균 시간 (반복 {args.repeat}회):")
+    for name, questions in (("실제 질문", REAL_QUESTIONS), ("경계/악의적 입력", ADVERSARIAL_QUESTIONS)):
+        legacy = time_per_call(legacy_validate_question, questions, args.repeat)
+        current = time_per_call(validate_question, questions, args.repeat)
+        classify = time_per_call(classify_question, questions, args.repeat)
+        print(f"- {name}: 예전 {legacy:.2f}µs → 현재 {current:.2f}µs "
+              f"({legacy / current:.1f}배), classify_question {classify:.2f}µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+임베딩 모델 ONNX 변환 + int8 양자화 스크립트
+
+이 파일의 역할:
+- jhgan/ko-sroberta-multitask 모델을 ONNX 형식으로 변환
+- ONNX Runtime 동적 양자화로 가중치를 int8로 변환 (CPU 추론 가속, 메모리 절감)
+- 변환된 모델이 PyTorch 모델과 같은 벡터를 만드는지 메뉴 데이터로 검증
+
+왜 필요한가:
+- EMBEDDING_BACKEND=onnx 설정으로 서버가 사용할 로컬 ONNX 모델을 준비해야 함
+- 양자화 후에도 검색 품질이 유지되는지(코사인 일치도) 확인 후 배포하기 위함
+
+사용 방법:
+- python scripts/export_onnx_embeddings.py               # 변환 + 양자화 + 검증
+- python scripts/export_onnx_embeddings.py --check-only  # 기존 모델 검증만
+- python scripts/export_onnx_embeddings.py --output models/my-onnx
+
+필요 패키지:
+- pip install "optimum[onnxruntime]" onnxruntime
+"""
+
+import sys
+import csv
+import json
+import argparse
+from pathlib import Path
+
+# 프로젝트 루트 경로 설정
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils import logger
+from app.embeddings import (
+    MODEL_NAME,
+    DEFAULT_ONNX_PATH,
+    create_torch_embeddings,
+    create_onnx_embeddings,
+    compare_embedding_backends
+)
+from init_vectorstore import format_restaurant_document  # 벡터 DB와 같은 문서 형식 사용
+
+
+def export_onnx_model(output_dir: Path):
+    """PyTorch 모델을 ONNX로 변환하고 int8 동적 양자화 수행"""
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    from transformers import AutoTokenizer
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # 1. ONNX 변환 (토크나이저도 함께 저장)
+    print(f"ONNX 변환 중: {MODEL_NAME}")
+    model = ORTModelForFeatureExtraction.from_pretrained(MODEL_NAME, export=True)
+    model.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(MODEL_NAME).save_pretrained(output_dir)
+
+    # 2. int8 동적 양자화
+    print("int8 동적 양자화 중...")
+    quantize_dynamic(
+        model_input=str(output_dir / "model.onnx"),
+        model_output=str(output_dir / "model_quantized.onnx"),
+        weight_type=QuantType.QInt8
+    )
+
+    size_fp32 = (output_dir / "model.onnx").stat().st_size / 1024 / 1024
+    size_int8 = (output_dir / "model_quantized.onnx").stat().st_size / 1024 / 1024
+    print(f"변환 완료: {output_dir}")
+    print(f"- model.onnx: {size_fp32:.1f}MB → model_quantized.onnx: {size_int8:.1f}MB")
+
+
+def load_menu_texts(csv_path: Path, limit: int) -> list:
+    """메뉴 CSV에서 검증용 문서 텍스트 로드 (벡터 DB와 같은 형식)"""
+    texts = []
+    with open(csv_path, 'r', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            texts.append(format_restaurant_document(row))
+            if limit and len(texts) >= limit:
+                break
+    return texts
+
+
+def check_agreement(model_dir: Path, csv_path: Path, limit: int, min_cosine: float) -> bool:
+    """PyTorch 백엔드와 ONNX 백엔드의 코사인 일치도 확인"""
+    texts = load_menu_texts(csv_path, limit)
+    # 실제 질문 형태도 함께 검증
+    texts += ["전주 비빔밥 추천", "저렴한 한식", "500칼로리 이하 메뉴", "콩나물국밥 맛집"]
+
+    print(f"\n일치도 검증: {len(texts)}개 텍스트")
+    reference = create_torch_embeddings()
+    candidate = create_onnx_embeddings(model_path=str(model_dir))
+    report = compare_embedding_backends(reference, candidate, texts)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    passed = report["cosine_min"] >= min_cosine
+    if passed:
+        print(f"[OK] 최소 코사인 유사도 {report['cosine_min']:.4f} ≥ {min_cosine}")
+    else:
+        print(f"[WARNING] 최소 코사인 유사도 {report['cosine_min']:.4f} < {min_cosine}")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 모델 ONNX 변환 + int8 양자화")
+    parser.add_argument("--output", type=Path, default=DEFAULT_ONNX_PATH, help="ONNX 모델 저장 디렉토리")
+    parser.add_argument("--csv", type=Path, default=project_root / "data" / "restaurant_menu_data.csv",
+                        help="검증용 메뉴 CSV")
+    parser.add_argument("--limit", type=int, default=0, help="검증에 사용할 최대 문서 수 (0이면 전체)")
+    parser.add_argument("--min-cosine", type=float, default=0.98, help="허용 최소 코사인 유사도")
+    parser.add_argument("--check-only", action="store_true", help="변환 없이 기존 모델 검증만 수행")
+    args = parser.parse_args()
+
+    try:
+        if not args.check_only:
+            export_onnx_model(args.output)
+        if not check_agreement(args.output, args.csv, args.limit, args.min_cosine):
+            sys.exit(1)
+    except Exception as e:
+        logger.error(f"ONNX 변환/검증 실패: {e}", exc_info=True)
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,27 @@
 """
 더미 데이터 생성 스크립트
-전주시 기준 50개 음식점, 500개 메뉴 데이터 생성
+기본값: 전주시 기준 50개 음식점, 약 500개 메뉴 데이터 생성
+
+벤치마크용 대용량 합성 데이터:
+- 같은 옵션(--seed 포함)이면 항상 같은 CSV가 생성됨 (재현 가능)
+- 음식점마다 (seed, restaurant_id)로 난수를 따로 만들므로
+  --restaurants만 늘린 큰 데이터의 앞부분은 작은 데이터와 같음 (규모별 비교용)
+- 행을 만드는 즉시 CSV에 쓰므로 1천만 행도 메모리 사용량이 일정함
+- 카테고리 비율, 가격/칼로리 분포, 음식점 간 메뉴 이름 중복 정도를 조절 가능
+
+사용법:
+- python scripts/generate_dummy_data.py                       # 기본 데이터 (data/restaurant_menu_data.csv)
+- python scripts/generate_dummy_data.py --restaurants 100000 --menus-per-restaurant 10 --output data/bench_1m.csv
+  (약 100만 행)
+- python scripts/generate_dummy_data.py --category-weights "한식=5,카페/디저트=1" --price-sigma 0.4 --unique-menu-ratio 0.5
+  (카테고리 비율, 가격 분포, 메뉴 이름 중복 정도 조절)
 """
 
+import argparse
 import csv
 import random
+import time
+from collections import Counter
 from pathlib import Path
 
 # 전주시 주요 지역 및 주소
@@ -132,31 +149,56 @@ JEONJU_SPECIAL = [
     ("전주피순대", ["순대(전주산)", "콩나물(전주산)", "양파(국내산)"], 12000, 580),
 ]
 
-def generate_restaurant_name(category):
+# 기본 카테고리 비율 (기존 데이터의 카테고리별 음식점 수)
+DEFAULT_CATEGORY_WEIGHTS = {
+    "한식": 10, "중식": 8, "일식": 8, "양식": 8, "분식": 8, "치킨/닭강정": 5, "카페/디저트": 3
+}
+
+# 메뉴가 카테고리 기본 목록(10개)보다 많이 필요할 때 붙이는 변형 접두사
+MENU_VARIANTS = [
+    ("특", 3000, 120), ("매운", 500, 30), ("순한", 0, -20), ("곱빼기 ", 2000, 250),
+    ("미니", -1500, -150), ("세트 ", 4000, 300), ("수제", 1500, 40), ("시그니처 ", 2500, 60)
+]
+
+# CSV 컬럼 순서
+FIELDNAMES = [
+    "restaurant_id",
+    "restaurant_name",
+    "address",
+    "category",
+    "menu_id",
+    "menu_name",
+    "ingredients_origin",
+    "price",
+    "calories"
+]
+
+
+def generate_restaurant_name(rng, category):
     """음식점 이름 생성"""
     names = RESTAURANT_TYPES.get(category, RESTAURANT_TYPES["한식"])
-    base_name = random.choice(names)
+    base_name = rng.choice(names)
     prefixes = ["맛있는", "전주", "오래된", "유명한", "전통", "향토", "고향", "정통", "명가", "본가"]
     suffix_numbers = ["", "1호점", "2호점", "", "", ""]  # 일부만 번호 추가
     
-    if random.random() < 0.3:  # 30% 확률로 접두사 추가
-        prefix = random.choice(prefixes)
+    if rng.random() < 0.3:  # 30% 확률로 접두사 추가
+        prefix = rng.choice(prefixes)
         name = f"{prefix}{base_name}"
     else:
         name = base_name
     
-    if random.random() < 0.2:  # 20% 확률로 번호 추가
-        suffix = random.choice(suffix_numbers)
+    if rng.random() < 0.2:  # 20% 확률로 번호 추가
+        suffix = rng.choice(suffix_numbers)
         if suffix:
             name = f"{name} {suffix}"
     
     return name
 
-def generate_address():
+def generate_address(rng):
     """전주시 주소 생성"""
-    district = random.choice(JEONJU_DISTRICTS)
-    building_number = random.randint(1, 999)
-    detail_number = random.choice([None, None, None, random.randint(101, 599)])  # 일부만 상세번호
+    district = rng.choice(JEONJU_DISTRICTS)
+    building_number = rng.randint(1, 999)
+    detail_number = rng.choice([None, None, None, rng.randint(101, 599)])  # 일부만 상세번호
     
     address = f"전주시 {district} {building_number}"
     if detail_number:
@@ -164,117 +206,190 @@ def generate_address():
     
     return address
 
-def generate_restaurant_data():
-    """음식점 데이터 생성"""
-    restaurants = []
+def build_menu_pool(category):
+    """카테고리 메뉴 목록 (기본 10개 + 변형 메뉴, 메뉴 수가 많을 때 사용)"""
+    base_items = MENU_ITEMS[category]
+    pool = list(base_items)
+    for prefix, price_delta, calories_delta in MENU_VARIANTS:
+        for menu_name, ingredients, price, calories in base_items:
+            pool.append((f"{prefix}{menu_name}", ingredients, price + price_delta, calories + calories_delta))
+    return pool
+
+# 음식점당 최대 메뉴 수 (가장 작은 카테고리 메뉴 목록 크기, 같은 음식점 안에서 메뉴 이름이 겹치지 않도록)
+MAX_MENUS_PER_RESTAURANT = min(len(build_menu_pool(category)) for category in MENU_ITEMS)
+
+def parse_count_range(value):
+    """"10" 또는 "8-12" → (최소, 최대) (최대는 MAX_MENUS_PER_RESTAURANT 이하)"""
+    low, _, high = value.partition("-")
+    low = int(low)
+    high = int(high) if high else low
+    if low < 1 or high < low:
+        raise argparse.ArgumentTypeError(f"잘못된 개수 범위: {value}")
+    if high > MAX_MENUS_PER_RESTAURANT:
+        raise argparse.ArgumentTypeError(
+            f"음식점당 메뉴는 최대 {MAX_MENUS_PER_RESTAURANT}개입니다: {value}")
+    return low, high
+
+def parse_category_weights(value):
+    """"한식=5,중식=2" → {카테고리: 비율} (지정하지 않은 카테고리는 0)"""
+    weights = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in MENU_ITEMS:
+            raise argparse.ArgumentTypeError(f"알 수 없는 카테고리: {name} (가능: {', '.join(MENU_ITEMS)})")
+        weights[name] = float(weight)
+    if sum(weights.values()) <= 0:
+        raise argparse.ArgumentTypeError("카테고리 비율 합이 0보다 커야 합니다")
+    return weights
+
+def vary(rng, base, jitter, sigma, minimum):
+    """
+    가격/칼로리 변동
+    
+    sigma가 0이면 기존처럼 ±jitter 균등 분포,
+    0보다 크면 로그정규 분포 배수(중앙값 1)를 곱해 꼬리가 긴 분포를 만듦
+    """
+    if sigma > 0:
+        value = base * rng.lognormvariate(0.0, sigma)
+    else:
+        value = base + rng.randint(-jitter, jitter)
+    return max(minimum, int(round(value)))
+
+def generate_restaurant_rows(restaurant_id, first_menu_id, options, categories, weights, menu_pools):
+    """
+    음식점 하나의 메뉴 행 목록 생성
     
-    # 카테고리별로 음식점 분배
-    categories = list(MENU_ITEMS.keys())
-    restaurant_count_per_category = [10, 8, 8, 8, 8, 5, 3]  # 카테고리별 개수
+    난수는 (seed, restaurant_id)로 만들어 다른 음식점 수와 관계없이 같은 음식점은 항상 같은 내용
+    """
+    rng = random.Random(f"{options.seed}:{restaurant_id}")
+    category = rng.choices(categories, weights=weights)[0]
+    restaurant_name = generate_restaurant_name(rng, category)
+    address = generate_address(rng)
     
-    restaurant_id = 1
-    menu_id = 1
+    menu_min, menu_max = options.menus_per_restaurant
+    pool = menu_pools[category]
+    menu_count = rng.randint(menu_min, menu_max)
+    # 기본 메뉴 우선, 부족하면 변형 메뉴까지 사용 (같은 음식점 안에서는 메뉴 이름이 겹치지 않음)
+    base_count = len(MENU_ITEMS[category])
+    if menu_count <= base_count:
+        menus = rng.sample(pool[:base_count], menu_count)
+    else:
+        menus = pool[:base_count] + rng.sample(pool[base_count:], menu_count - base_count)
+        rng.shuffle(menus)
     
-    for cat_idx, category in enumerate(categories):
-        count = restaurant_count_per_category[cat_idx]
+    # 전주 특색 음식점인 경우 추가 메뉴
+    if category == "한식" and rng.random() < 0.3:
+        special_menu = rng.choice(JEONJU_SPECIAL)
+        if special_menu not in menus:
+            menus.append(special_menu)
+    
+    rows = []
+    for offset, (menu_name, ingredients, price, calories) in enumerate(menus):
+        # 일부 메뉴는 음식점 고유 이름으로 바꿈 (음식점 간 메뉴 이름 중복 정도 조절)
+        if options.unique_menu_ratio > 0 and rng.random() < options.unique_menu_ratio:
+            menu_name = f"{restaurant_name.split()[0]} {menu_name} #{restaurant_id}"
         
-        for i in range(count):
-            restaurant_name = generate_restaurant_name(category)
-            address = generate_address()
-            
-            # 각 음식점마다 8-12개 메뉴 생성
-            menu_count = random.randint(8, 12)
-            menus = random.sample(MENU_ITEMS[category], min(menu_count, len(MENU_ITEMS[category])))
-            
-            # 전주 특색 음식점인 경우 추가 메뉴
-            if category == "한식" and random.random() < 0.3:
-                special_menu = random.choice(JEONJU_SPECIAL)
-                if special_menu not in menus:
-                    menus.append(special_menu)
-            
-            for menu_item in menus:
-                menu_name, ingredients, price, calories = menu_item
-                
-                # 가격에 약간의 변동성 추가 (±500원)
-                price_variation = random.randint(-500, 500)
-                final_price = max(5000, price + price_variation)  # 최소 5000원
-                
-                # 칼로리에 약간의 변동성 추가 (±30kcal)
-                calories_variation = random.randint(-30, 30)
-                final_calories = max(50, calories + calories_variation)
-                
-                ingredients_str = ", ".join(ingredients)
-                
-                restaurants.append({
-                    "restaurant_id": restaurant_id,
-                    "restaurant_name": restaurant_name,
-                    "address": address,
-                    "category": category,
-                    "menu_id": menu_id,
-                    "menu_name": menu_name,
-                    "ingredients_origin": ingredients_str,
-                    "price": final_price,
-                    "calories": final_calories
-                })
-                menu_id += 1
-            
-            restaurant_id += 1
+        rows.append({
+            "restaurant_id": restaurant_id,
+            "restaurant_name": restaurant_name,
+            "address": address,
+            "category": category,
+            "menu_id": first_menu_id + offset,
+            "menu_name": menu_name,
+            "ingredients_origin": ", ".join(ingredients),
+            # 가격: 기본 ±500원 (최소 5000원), 칼로리: 기본 ±30kcal (최소 50kcal)
+            "price": vary(rng, price, 500, options.price_sigma, 5000),
+            "calories": vary(rng, calories, 30, options.calorie_sigma, 50)
+        })
     
-    return restaurants
+    return rows
 
-def main():
-    """메인 함수"""
-    print("전주시 음식점 더미 데이터 생성 시작...")
-    
-    # 데이터 디렉토리 확인 및 생성
-    data_dir = Path(__file__).parent.parent / "data"
-    data_dir.mkdir(parents=True, exist_ok=True)
+def write_dataset(options):
+    """
+    음식점 데이터를 만들면서 바로 CSV에 기록 (전체 목록을 메모리에 두지 않음)
     
-    # 음식점 데이터 생성
-    restaurants = generate_restaurant_data()
+    Returns:
+        통계 (음식점 수, 메뉴 수, 카테고리별 음식점/메뉴 수)
+    """
+    weights_by_category = options.category_weights or DEFAULT_CATEGORY_WEIGHTS
+    categories = [c for c in MENU_ITEMS if weights_by_category.get(c, 0) > 0]
+    weights = [weights_by_category[c] for c in categories]
+    menu_pools = {c: build_menu_pool(c) for c in categories}
     
-    # CSV 파일로 저장
-    output_file = data_dir / "restaurant_menu_data.csv"
+    output_file = Path(options.output)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
     
-    fieldnames = [
-        "restaurant_id",
-        "restaurant_name",
-        "address",
-        "category",
-        "menu_id",
-        "menu_name",
-        "ingredients_origin",
-        "price",
-        "calories"
-    ]
+    restaurant_stats = Counter()
+    menu_stats = Counter()
+    menu_id = 1
+    started = time.time()
     
     with open(output_file, 'w', newline='', encoding='utf-8-sig') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
         writer.writeheader()
-        writer.writerows(restaurants)
+        
+        for restaurant_id in range(1, options.restaurants + 1):
+            rows = generate_restaurant_rows(restaurant_id, menu_id, options, categories, weights, menu_pools)
+            writer.writerows(rows)
+            menu_id += len(rows)
+            
+            category = rows[0]["category"]
+            restaurant_stats[category] += 1
+            menu_stats[category] += len(rows)
+            
+            # 대용량 생성 시 진행 상황 출력
+            if restaurant_id % 100000 == 0:
+                elapsed = time.time() - started
+                print(f"  {restaurant_id}개 음식점, {menu_id - 1}개 메뉴 ({(menu_id - 1) / elapsed:.0f}행/초)")
+    
+    return {
+        "restaurants": options.restaurants,
+        "menus": menu_id - 1,
+        "categories": {c: (restaurant_stats[c], menu_stats[c]) for c in categories}
+    }
+
+def parse_args(argv=None):
+    """명령줄 옵션"""
+    default_output = Path(__file__).parent.parent / "data" / "restaurant_menu_data.csv"
+    parser = argparse.ArgumentParser(description="전주시 음식점 더미 데이터 생성 (재현 가능한 합성 데이터)")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="난수 시드 (같은 시드와 옵션이면 같은 CSV 생성, 기본 42)")
+    parser.add_argument("--restaurants", type=int, default=50,
+                        help="음식점 수 (기본 50)")
+    parser.add_argument("--menus-per-restaurant", type=parse_count_range, default=(8, 12),
+                        help=f"음식점당 메뉴 수, 숫자 또는 범위 (기본 8-12, 최대 {MAX_MENUS_PER_RESTAURANT}개)")
+    parser.add_argument("--category-weights", type=parse_category_weights, default=None,
+                        help='카테고리 비율, 예: "한식=5,중식=2" (기본: 한식 10, 중식/일식/양식/분식 8, 치킨 5, 카페 3)')
+    parser.add_argument("--price-sigma", type=float, default=0.0,
+                        help="가격 로그정규 분포 표준편차 (0이면 기본 가격 ±500원)")
+    parser.add_argument("--calorie-sigma", type=float, default=0.0,
+                        help="칼로리 로그정규 분포 표준편차 (0이면 기본 칼로리 ±30kcal)")
+    parser.add_argument("--unique-menu-ratio", type=float, default=0.0,
+                        help="음식점 고유 이름으로 바꿀 메뉴 비율 0~1 (0이면 메뉴 이름이 음식점 간에 많이 겹침)")
+    parser.add_argument("--output", default=str(default_output),
+                        help="출력 CSV 경로 (기본 data/restaurant_menu_data.csv)")
+    return parser.parse_args(argv)
+
+def main():
+    """메인 함수"""
+    options = parse_args()
+    print("전주시 음식점 더미 데이터 생성 시작...")
+    print(f"- 시드: {options.seed}, 음식점: {options.restaurants}개, "
+          f"음식점당 메뉴: {options.menus_per_restaurant[0]}-{options.menus_per_restaurant[1]}개")
     
-    # 통계 출력
-    unique_restaurants = len(set(r["restaurant_id"] for r in restaurants))
-    total_menus = len(restaurants)
+    # 음식점 데이터 생성 + CSV 파일로 저장
+    stats = write_dataset(options)
     
     print(f"\n데이터 생성 완료!")
-    print(f"- 음식점 개수: {unique_restaurants}개")
-    print(f"- 메뉴 개수: {total_menus}개")
-    print(f"- 파일 위치: {output_file}")
+    print(f"- 음식점 개수: {stats['restaurants']}개")
+    print(f"- 메뉴 개수: {stats['menus']}개")
+    print(f"- 파일 위치: {options.output}")
     
     # 카테고리별 통계
-    category_stats = {}
-    for r in restaurants:
-        cat = r["category"]
-        if cat not in category_stats:
-            category_stats[cat] = {"restaurants": set(), "menus": 0}
-        category_stats[cat]["restaurants"].add(r["restaurant_id"])
-        category_stats[cat]["menus"] += 1
-    
     print("\n카테고리별 통계:")
-    for cat, stats in category_stats.items():
-        print(f"  {cat}: 음식점 {len(stats['restaurants'])}개, 메뉴 {stats['menus']}개")
+    for cat, (restaurant_count, menu_count) in stats["categories"].items():
+        print(f"  {cat}: 음식점 {restaurant_count}개, 메뉴 {menu_count}개")
 
 if __name__ == "__main__":
     main()
-
@@ -22,7 +22,22 @@
 5. 테스트 검색 수행하여 정상 작동 확인
 
 사용 방법:
-- python scripts/init_vectorstore.py
+- python scripts/init_vectorstore.py            # 전체 재구축 (컬렉션 삭제 후 전부 임베딩)
+- python scripts/init_vectorstore.py --sync     # 증분 동기화 (바뀐 메뉴만 임베딩, 삭제된 메뉴 제거)
+- python scripts/init_vectorstore.py --dry-run  # 증분 동기화 시 바뀔 내용만 출력 (저장하지 않음)
+- python scripts/init_vectorstore.py --no-resume  # 중단된 전체 재구축을 이어서 하지 않고 처음부터
+- python scripts/init_vectorstore.py --workers 4  # 전체 재구축 임베딩을 워커 프로세스 4개로 나눠 실행
+
+전체 재구축 원리 (스트리밍 적재, app/ingestion.py):
+- CSV를 한 행씩 읽어 문서/청크로 변환 → 배치 임베딩 → 배치 upsert를 스레드별로 동시에 실행
+- CSV 전체를 메모리에 올리지 않으므로 수백만 행도 메모리 사용량이 일정함
+- 저장된 위치를 chroma_db/ingest_checkpoint_chroma.json에 기록, 중단되면 다음 실행 때 이어서 진행
+
+증분 동기화 원리:
+- 각 문서 텍스트 + 메타데이터의 SHA-256 해시를 메타데이터(content_hash)로 함께 저장
+- 다음 실행 때 컬렉션에 저장된 해시와 비교하여 새 메뉴/바뀐 메뉴만 임베딩 후 upsert
+- CSV에서 사라진 메뉴(menu_id)는 컬렉션에서 삭제
+- 매일 가격만 바뀌는 경우 바뀐 행만 다시 임베딩됨
 """
 
 # 표준 라이브러리 import: Python 기본 기능들을 사용하기 위함
@@ -31,6 +46,9 @@ import csv  # CSV 파일 읽기/쓰기 기능
 from pathlib import Path  # 파일 경로를 다루는 모듈 (Windows/Mac/Linux 호환)
 from collections import defaultdict  # 기본값이 있는 딕셔너리 생성 (음식점별로 메뉴 그룹화에 사용)
 import re  # 정규표현식 (텍스트 정제에 사용)
+import json  # 메타데이터를 정해진 순서의 문자열로 변환 (해시 계산용)
+import hashlib  # 문서 내용 해시 (증분 동기화에서 변경 여부 판단)
+import argparse  # 명령줄 옵션 처리 (--sync, --dry-run)
 from typing import List, Dict, Any, Tuple  # 타입 힌팅
 
 # LangChain import
@@ -73,8 +91,9 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 # 프로젝트 내부 모듈 import
-from app.vectorstore import VectorStore  # 벡터 저장소 클래스 (ChromaDB와 통신)
-from app.utils import logger  # 로그를 남기는 기능 (에러 추적, 디버깅용)
+from app.vectorstore import VectorStore, coerce_numeric_metadata  # 벡터 저장소 클래스 (ChromaDB와 통신)
+from app.ingestion import create_ingestion_pipeline, ChromaSink  # 스트리밍 적재 파이프라인 (메모리 사용량 고정, 멀티코어 선택)
+from app.utils import logger, CHROMA_DB_PATH  # 로그를 남기는 기능 (에러 추적, 디버깅용), 벡터 DB 경로
 
 
 def clean_text(text: str) -> str:
@@ -161,6 +180,206 @@ def format_restaurant_document(row):
     return doc_text
 
 
+def compute_content_hash(doc_text: str, metadata: Dict[str, Any]) -> str:
+    """
+    문서 텍스트와 메타데이터로 내용 해시를 계산하는 함수
+    
+    같은 내용이면 항상 같은 해시가 나오므로, 벡터 DB에 저장된 해시와 비교하여
+    메뉴가 바뀌었는지(다시 임베딩해야 하는지) 판단할 수 있음
+    
+    Args:
+        doc_text (str): format_restaurant_document로 만든 문서 텍스트
+        metadata (dict): 문서 메타데이터 (content_hash 키는 제외하고 계산)
+    
+    Returns:
+        str: SHA-256 해시 (16진수 문자열)
+    """
+    # sort_keys=True: 키 순서와 상관없이 같은 문자열이 나오도록 정렬
+    payload = json.dumps(
+        {k: v for k, v in metadata.items() if k != "content_hash"},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(f"{doc_text}\n{payload}".encode("utf-8")).hexdigest()
+
+
+def build_menu_document(row: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any]]:
+    """
+    CSV 한 행(음식점 정보 + 메뉴 정보)을 문서 하나로 변환하는 함수
+    
+    전체 적재(load_csv_data 결과)와 스트리밍 적재(CSV 행을 바로 사용)가 같은 함수를 써서
+    두 경로의 문서/메타데이터/ID가 항상 같도록 함
+    
+    Args:
+        row (dict): restaurant_id, restaurant_name, address, category,
+                    menu_id, menu_name, price, calories, ingredients_origin
+    
+    Returns:
+        (문서 ID, 문서 텍스트, 메타데이터)
+    """
+    # ===== 문서 텍스트 생성 =====
+    # format_restaurant_document 함수 호출
+    # CSV 행 데이터를 검색 가능한 텍스트 문서로 변환
+    doc_text = format_restaurant_document(row)
+    
+    # ===== 메타데이터 생성 =====
+    # 검색 결과에서 필터링하거나 표시할 때 사용할 정보
+    # 예: "가격이 10000원 이하인 메뉴만" 같은 필터링에 사용
+    metadata = {
+        "restaurant_id": row["restaurant_id"],  # 음식점 ID
+        "restaurant_name": row["restaurant_name"],  # 음식점 이름
+        "address": row["address"],  # 주소
+        "category": row["category"],  # 카테고리
+        "menu_id": row["menu_id"],  # 메뉴 ID
+        "menu_name": row["menu_name"],  # 메뉴 이름
+        "price": row["price"],  # 가격 (필터링에 사용 가능)
+        "calories": row["calories"]  # 칼로리 (필터링에 사용 가능)
+    }
+    # 가격/칼로리는 정수로 저장해야 where 절의 $lte/$gte 범위 필터가 동작함
+    metadata = coerce_numeric_metadata(metadata)
+    # 내용 해시 (다음 증분 동기화 때 바뀐 메뉴인지 비교하는 데 사용)
+    metadata["content_hash"] = compute_content_hash(doc_text, metadata)
+    
+    # ===== 고유 ID 생성 =====
+    # 벡터 DB에서 각 문서를 식별하기 위한 고유한 ID
+    # 예: "restaurant_1_menu_101" (음식점 1번의 메뉴 101번)
+    doc_id = f"restaurant_{row['restaurant_id']}_menu_{row['menu_id']}"
+    return doc_id, doc_text, metadata
+
+
+def parent_document_id(chunk_id: str) -> str:
+    """청크 ID에서 원본 문서 ID 추출 (예: "restaurant_1_menu_2_chunk_0" → "restaurant_1_menu_2")"""
+    return chunk_id.rsplit("_chunk_", 1)[0]
+
+
+def diff_documents(
+    existing_hashes: Dict[str, Any],
+    chunked_metadatas: List[Dict[str, Any]],
+    chunked_ids: List[str]
+) -> Dict[str, Any]:
+    """
+    벡터 DB에 저장된 해시와 새로 만든 청크를 비교하여 변경 사항을 계산하는 함수
+    
+    Args:
+        existing_hashes: 저장된 청크 ID → content_hash (VectorStore.get_content_hashes)
+        chunked_metadatas: 새 청크 메타데이터 리스트 (content_hash 포함)
+        chunked_ids: 새 청크 ID 리스트
+    
+    Returns:
+        dict: {
+            "added": 새 메뉴 문서 ID 목록,
+            "changed": 내용이 바뀐 메뉴 문서 ID 목록,
+            "removed": CSV에서 사라진 메뉴 문서 ID 목록,
+            "unchanged": 바뀌지 않은 메뉴 수,
+            "upsert_indices": 임베딩 후 upsert할 청크 번호 목록,
+            "delete_ids": 삭제할 청크 ID 목록
+        }
+    """
+    # 저장된 청크를 원본 문서(메뉴) 단위로 묶기
+    existing_by_doc = defaultdict(list)
+    for chunk_id in existing_hashes:
+        existing_by_doc[parent_document_id(chunk_id)].append(chunk_id)
+    
+    # 새 청크도 원본 문서 단위로 묶기 (청크 번호 보관)
+    new_by_doc = defaultdict(list)
+    for index, chunk_id in enumerate(chunked_ids):
+        new_by_doc[parent_document_id(chunk_id)].append(index)
+    
+    diff = {"added": [], "changed": [], "removed": [], "unchanged": 0, "upsert_indices": [], "delete_ids": []}
+    
+    for doc_id, indices in new_by_doc.items():
+        old_chunk_ids = existing_by_doc.get(doc_id)
+        new_chunk_ids = {chunked_ids[i] for i in indices}
+        new_hash = chunked_metadatas[indices[0]]["content_hash"]
+        
+        if old_chunk_ids is None:
+            # 새로 추가된 메뉴
+            diff["added"].append(doc_id)
+            diff["upsert_indices"].extend(indices)
+        elif set(old_chunk_ids) != new_chunk_ids or any(existing_hashes[c] != new_hash for c in old_chunk_ids):
+            # 내용(또는 청크 구성)이 바뀐 메뉴: 다시 임베딩하고 남는 예전 청크는 삭제
+            diff["changed"].append(doc_id)
+            diff["upsert_indices"].extend(indices)
+            diff["delete_ids"].extend(c for c in old_chunk_ids if c not in new_chunk_ids)
+        else:
+            diff["unchanged"] += 1
+    
+    # CSV에서 사라진 메뉴는 모든 청크 삭제
+    for doc_id, old_chunk_ids in existing_by_doc.items():
+        if doc_id not in new_by_doc:
+            diff["removed"].append(doc_id)
+            diff["delete_ids"].extend(old_chunk_ids)
+    
+    return diff
+
+
+def print_diff_report(diff: Dict[str, Any], chunked_metadatas: List[Dict[str, Any]], chunked_ids: List[str], limit: int = 10):
+    """증분 동기화 변경 사항 요약 출력 (dry-run 보고서)"""
+    names = {
+        parent_document_id(chunk_id): f"{m.get('restaurant_name', '')} - {m.get('menu_name', '')}"
+        for chunk_id, m in zip(chunked_ids, chunked_metadatas)
+    }
+    print("증분 동기화 변경 사항:")
+    print(f"- 추가: {len(diff['added'])}개 메뉴")
+    print(f"- 변경: {len(diff['changed'])}개 메뉴")
+    print(f"- 삭제: {len(diff['removed'])}개 메뉴")
+    print(f"- 유지: {diff['unchanged']}개 메뉴")
+    print(f"- 임베딩할 청크: {len(diff['upsert_indices'])}개, 삭제할 청크: {len(diff['delete_ids'])}개")
+    for label, key in (("추가", "added"), ("변경", "changed"), ("삭제", "removed")):
+        for doc_id in diff[key][:limit]:
+            print(f"  [{label}] {doc_id} {names.get(doc_id, '')}")
+        if len(diff[key]) > limit:
+            print(f"  [{label}] ... 외 {len(diff[key]) - limit}개")
+
+
+def sync_documents(
+    vectorstore: VectorStore,
+    chunked_texts: List[str],
+    chunked_metadatas: List[Dict[str, Any]],
+    chunked_ids: List[str],
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    증분 동기화: 바뀐 메뉴만 임베딩하여 upsert하고, 사라진 메뉴는 삭제하는 함수
+    
+    Args:
+        vectorstore: 벡터 저장소
+        chunked_texts / chunked_metadatas / chunked_ids: 새로 만든 청크
+        dry_run: True면 변경 사항만 출력하고 저장하지 않음
+    
+    Returns:
+        dict: diff_documents의 결과
+    """
+    # 저장된 해시 조회 (임베딩 없이 메타데이터만 읽음)
+    existing_hashes = vectorstore.get_content_hashes()
+    logger.info(f"저장된 청크 {len(existing_hashes)}개의 해시 조회 완료")
+    
+    diff = diff_documents(existing_hashes, chunked_metadatas, chunked_ids)
+    print_diff_report(diff, chunked_metadatas, chunked_ids)
+    
+    if dry_run:
+        print("dry-run: 벡터 저장소는 변경하지 않았습니다")
+        return diff
+    
+    # 바뀐/새 청크만 임베딩 후 upsert (같은 ID면 덮어씀)
+    indices = diff["upsert_indices"]
+    if indices:
+        vectorstore.add_documents(
+            texts=[chunked_texts[i] for i in indices],
+            metadatas=[chunked_metadatas[i] for i in indices],
+            ids=[chunked_ids[i] for i in indices],
+            upsert=True
+        )
+    
+    # 사라진 메뉴, 줄어든 청크 삭제
+    if diff["delete_ids"]:
+        vectorstore.delete_documents(diff["delete_ids"])
+    
+    print(f"증분 동기화 완료: {len(indices)}개 청크 임베딩, {len(diff['delete_ids'])}개 청크 삭제")
+    logger.info(f"증분 동기화 완료: {len(indices)}개 청크 임베딩, {len(diff['delete_ids'])}개 청크 삭제")
+    return diff
+
+
 def load_csv_data(csv_path):
     """
     CSV 파일에서 음식점과 메뉴 데이터를 읽어서 구조화하는 함수
@@ -234,6 +453,43 @@ def load_csv_data(csv_path):
     return restaurants
 
 
+def create_text_splitter(chunk_size: int = 500, chunk_overlap: int = 50):
+    """청크 분할기 생성 (LangChain의 RecursiveCharacterTextSplitter 사용)"""
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        separators=["\n\n", "\n", " ", ""]  # 한국어에 적합한 구분자
+    )
+
+
+def chunk_document(
+    text: str,
+    metadata: Dict[str, Any],
+    doc_id: str,
+    text_splitter
+) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """
+    문서 하나를 청크로 분할하는 함수
+    
+    Returns:
+        [(청크 ID, 청크 텍스트, 청크 메타데이터), ...]
+    """
+    # 텍스트를 청크로 분할
+    chunks = text_splitter.split_text(text)
+    
+    results = []
+    for chunk_idx, chunk in enumerate(chunks):
+        # 메타데이터에 청크 정보 추가
+        chunk_metadata = metadata.copy()
+        chunk_metadata["chunk_index"] = chunk_idx
+        chunk_metadata["total_chunks"] = len(chunks)
+        
+        # 청크 ID 생성 (원본 ID + 청크 인덱스)
+        results.append((f"{doc_id}_chunk_{chunk_idx}", chunk, chunk_metadata))
+    return results
+
+
 def chunk_documents(
     texts: List[str],
     metadatas: List[Dict[str, Any]],
@@ -254,34 +510,17 @@ def chunk_documents(
     Returns:
         (청크된 텍스트 리스트, 청크된 메타데이터 리스트, 청크된 ID 리스트)
     """
-    # LangChain의 RecursiveCharacterTextSplitter 사용
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        length_function=len,
-        separators=["\n\n", "\n", " ", ""]  # 한국어에 적합한 구분자
-    )
+    text_splitter = create_text_splitter(chunk_size, chunk_overlap)
     
     chunked_texts = []
     chunked_metadatas = []
     chunked_ids = []
     
-    for i, (text, metadata, doc_id) in enumerate(zip(texts, metadatas, ids)):
-        # 텍스트를 청크로 분할
-        chunks = text_splitter.split_text(text)
-        
+    for text, metadata, doc_id in zip(texts, metadatas, ids):
         # 각 청크에 대해 메타데이터와 ID 생성
-        for chunk_idx, chunk in enumerate(chunks):
+        for chunk_id, chunk, chunk_metadata in chunk_document(text, metadata, doc_id, text_splitter):
             chunked_texts.append(chunk)
-            
-            # 메타데이터에 청크 정보 추가
-            chunk_metadata = metadata.copy()
-            chunk_metadata["chunk_index"] = chunk_idx
-            chunk_metadata["total_chunks"] = len(chunks)
             chunked_metadatas.append(chunk_metadata)
-            
-            # 청크 ID 생성 (원본 ID + 청크 인덱스)
-            chunk_id = f"{doc_id}_chunk_{chunk_idx}"
             chunked_ids.append(chunk_id)
     
     logger.info(f"문서 청킹 완료: {len(texts)}개 문서 → {len(chunked_texts)}개 청크")
@@ -289,10 +528,85 @@ def chunk_documents(
     return chunked_texts, chunked_metadatas, chunked_ids
 
 
-def init_vectorstore_from_csv():
+# 스트리밍 적재 체크포인트 (중단된 전체 재구축을 이어서 실행할 때 사용)
+CHECKPOINT_PATH = CHROMA_DB_PATH / "ingest_checkpoint_chroma.json"
+
+
+def stream_csv_to_vectorstore(
+    vectorstore: VectorStore,
+    csv_path: Path,
+    resume: bool = True,
+    batch_size: int = None,
+    queue_size: int = None,
+    workers: int = None,
+    threads_per_worker: int = None
+) -> Dict[str, Any]:
+    """
+    전체 재구축: CSV를 한 행씩 읽어 청크 → 배치 임베딩 → 배치 upsert (app/ingestion.py)
+    
+    - CSV 전체나 전체 임베딩 목록을 메모리에 올리지 않으므로 수백만 행도 메모리 사용량이 일정함
+    - 읽기/임베딩/저장이 서로 다른 스레드에서 동시에 진행됨
+    - 중간에 멈추면 다음 실행 때 체크포인트부터 이어서 진행 (컬렉션을 초기화하지 않음)
+    - workers가 2 이상이면 restaurant_id 기준으로 나눠 여러 프로세스가 임베딩
+      (저장은 이 프로세스 하나가 CSV 순서대로 하므로 결과는 직렬 적재와 같음)
+    
+    Returns:
+        처리 통계 (행 수, 문서 수, 처리량 등)
+    """
+    text_splitter = create_text_splitter(chunk_size=500, chunk_overlap=50)
+    
+    def format_row(row):
+        # CSV 한 행 → 문서 하나 → 청크 목록
+        doc_id, doc_text, metadata = build_menu_document(row)
+        return chunk_document(doc_text, metadata, doc_id, text_splitter)
+    
+    pipeline = create_ingestion_pipeline(
+        csv_path=csv_path,
+        format_row=format_row,
+        embed_fn=vectorstore.embeddings.embed_documents,  # 디스크 임베딩 캐시 포함 (직렬 모드)
+        sink=ChromaSink(vectorstore),
+        checkpoint_path=CHECKPOINT_PATH,
+        batch_size=batch_size,
+        queue_size=queue_size,
+        workers=workers,  # 2 이상이면 워커 프로세스마다 임베딩 모델을 따로 로드
+        threads_per_worker=threads_per_worker
+    )
+    
+    checkpoint = pipeline.load_checkpoint() if resume else None
+    if checkpoint is None:
+        # 처음부터 시작: 기존 컬렉션을 삭제하고 빈 컬렉션을 다시 만듦
+        vectorstore.reset_collection()
+    else:
+        print(f"중단된 적재를 이어서 진행합니다: {checkpoint['rows']}행 처리됨")
+    
+    stats = pipeline.run(resume=resume)
+    print(f"벡터 저장소 초기화 완료: {stats['rows']}행 → {stats['documents']}개 청크 저장 "
+          f"({stats['rows_per_second']}행/초, {stats['elapsed_seconds']}초)")
+    logger.info(f"벡터 저장소 초기화 완료: {stats}")
+    for worker in stats.get("workers", []):
+        print(f"  워커 {worker['worker']}: {worker['rows']}행 ({worker['rows_per_second']}행/초)")
+    return stats
+
+
+def init_vectorstore_from_csv(
+    sync: bool = False,
+    dry_run: bool = False,
+    resume: bool = True,
+    batch_size: int = None,
+    queue_size: int = None,
+    workers: int = None,
+    threads_per_worker: int = None
+):
     """
     CSV 파일에서 데이터를 읽어서 벡터 데이터베이스에 저장하는 메인 함수
     
+    Args:
+        sync: True면 증분 동기화 (컬렉션을 지우지 않고 바뀐 메뉴만 반영)
+        dry_run: True면 증분 동기화 변경 사항만 출력 (저장하지 않음)
+        resume: 전체 재구축이 중단됐으면 체크포인트부터 이어서 진행
+        batch_size / queue_size: 스트리밍 적재 배치 크기 / 큐 크기 (없으면 INGEST_* 설정값)
+        workers / threads_per_worker: 임베딩 워커 프로세스 수 / 워커별 스레드 수 (전체 재구축만)
+    
     전체 프로세스:
     1. CSV 파일에서 데이터 읽기
     2. 각 메뉴를 텍스트 문서로 변환 (구조화)
@@ -317,6 +631,19 @@ def init_vectorstore_from_csv():
             logger.error(f"CSV 파일을 찾을 수 없습니다: {csv_path}")
             return  # 파일이 없으면 함수 종료
         
+        # ===== 전체 재구축: 스트리밍 적재 =====
+        if not sync:
+            # VectorStore 객체 생성 (이때 ChromaDB와 연결되고 임베딩 모델이 로드됨)
+            vectorstore = VectorStore()
+            stream_csv_to_vectorstore(vectorstore, csv_path, resume=resume,
+                                      batch_size=batch_size, queue_size=queue_size,
+                                      workers=workers, threads_per_worker=threads_per_worker)
+            run_test_search(vectorstore)
+            return
+        
+        # ===== 이하 증분 동기화 =====
+        # 저장된 해시와 비교하려면 CSV의 전체 문서 ID 목록이 필요하므로 한 번에 읽음
+        
         # ===== 3단계: CSV 파일에서 데이터 로드 =====
         print(f"CSV 파일 로딩: {csv_path}")  # 사용자에게 진행 상황 알림
         logger.info(f"CSV 파일 로딩: {csv_path}")  # 로그 기록
@@ -328,24 +655,12 @@ def init_vectorstore_from_csv():
         print(f"총 {len(restaurants)}개 음식점 데이터 로드 완료")
         logger.info(f"총 {len(restaurants)}개 음식점 데이터 로드 완료")
         
-        # ===== 4단계: 기존 벡터 저장소 초기화 (선택적) =====
-        # VectorStore 객체 생성 (이때 ChromaDB와 연결됨)
+        # ===== 4단계: 벡터 저장소 연결 =====
+        # VectorStore 객체 생성 (이때 ChromaDB와 연결되고 임베딩 모델이 로드됨)
+        # 증분 동기화에서는 기존 데이터를 유지하고 바뀐 것만 반영
         vectorstore = VectorStore()
         
-        try:
-            # 기존 컬렉션(데이터 그룹) 삭제
-            # 이전에 저장된 데이터를 지우고 새로 시작하려면 이렇게 함
-            vectorstore.delete_collection()
-            logger.info("기존 컬렉션 삭제 완료")
-        except:
-            # 컬렉션이 없거나 삭제할 수 없으면 에러 무시하고 계속 진행
-            logger.info("기존 컬렉션이 없거나 삭제 불가")
-        
-        # ===== 5단계: 새 벡터 저장소 생성 =====
-        # 새로운 VectorStore 객체 생성 (새 컬렉션을 만들거나 기존 컬렉션에 접근)
-        vectorstore = VectorStore()
-        
-        # ===== 6단계: 문서 및 메타데이터 준비 =====
+        # ===== 5단계: 문서 및 메타데이터 준비 =====
         # 벡터 DB에 저장할 데이터를 담을 리스트들 초기화
         texts = []  # 텍스트 문서 리스트 (예: "음식점명: 전주 비빔밥집\n...")
         metadatas = []  # 메타데이터 리스트 (예: {"restaurant_name": "전주 비빔밥집", "price": "8000"})
@@ -372,36 +687,17 @@ def init_vectorstore_from_csv():
                     **menu  # 메뉴 정보 복사 (같은 키가 있으면 menu가 우선)
                 }
                 
-                # ===== 문서 텍스트 생성 =====
-                # format_restaurant_document 함수 호출
-                # CSV 행 데이터를 검색 가능한 텍스트 문서로 변환
-                doc_text = format_restaurant_document(row)
+                # ===== 문서 텍스트/메타데이터/ID 생성 =====
+                # build_menu_document: 한 행(음식점 + 메뉴)을 문서 하나로 변환
+                doc_id, doc_text, metadata = build_menu_document(row)
                 texts.append(doc_text)  # 텍스트 문서 리스트에 추가
-                
-                # ===== 메타데이터 생성 =====
-                # 검색 결과에서 필터링하거나 표시할 때 사용할 정보
-                # 예: "가격이 10000원 이하인 메뉴만" 같은 필터링에 사용
-                metadata = {
-                    "restaurant_id": restaurant_info["restaurant_id"],  # 음식점 ID
-                    "restaurant_name": restaurant_info["restaurant_name"],  # 음식점 이름
-                    "address": restaurant_info["address"],  # 주소
-                    "category": restaurant_info["category"],  # 카테고리
-                    "menu_id": menu["menu_id"],  # 메뉴 ID
-                    "menu_name": menu["menu_name"],  # 메뉴 이름
-                    "price": menu["price"],  # 가격 (필터링에 사용 가능)
-                    "calories": menu["calories"]  # 칼로리 (필터링에 사용 가능)
-                }
                 metadatas.append(metadata)  # 메타데이터 리스트에 추가
-                
-                # ===== 고유 ID 생성 =====
-                # 벡터 DB에서 각 문서를 식별하기 위한 고유한 ID
-                # 예: "restaurant_1_menu_101" (음식점 1번의 메뉴 101번)
-                ids.append(f"restaurant_{restaurant_id}_menu_{menu['menu_id']}")
+                ids.append(doc_id)  # ID 리스트에 추가
         
         print(f"총 {len(texts)}개 문서 생성 완료")
         logger.info(f"총 {len(texts)}개 문서 생성 완료")
         
-        # ===== 7단계: 문서 청킹 =====
+        # ===== 6단계: 문서 청킹 =====
         # 긴 문서를 작은 청크로 분할하여 검색 정확도 향상
         print("문서를 청크로 분할 중...")
         logger.info("문서를 청크로 분할 중...")
@@ -418,47 +714,14 @@ def init_vectorstore_from_csv():
         print(f"청킹 완료: {len(texts)}개 문서 → {len(chunked_texts)}개 청크")
         logger.info(f"청킹 완료: {len(texts)}개 문서 → {len(chunked_texts)}개 청크")
         
-        # ===== 8단계: 벡터 저장소에 추가 =====
-        # 벡터 DB에 실제로 데이터 저장
-        print(f"{len(chunked_texts)}개 청크를 벡터 저장소에 추가 중...")
-        logger.info(f"{len(chunked_texts)}개 청크를 벡터 저장소에 추가 중...")
-        
-        # add_documents 메서드 호출
-        # 이 메서드 안에서:
-        # 1. 각 텍스트를 벡터(숫자 배열)로 변환 (임베딩 모델 사용)
-        # 2. 벡터, 텍스트, 메타데이터, ID를 ChromaDB에 저장
-        vectorstore.add_documents(
-            texts=chunked_texts, 
-            metadatas=chunked_metadatas, 
-            ids=chunked_ids
-        )
-        
-        # 저장 완료 메시지
-        print(f"벡터 저장소 초기화 완료: {len(chunked_texts)}개 청크 저장")
-        logger.info(f"벡터 저장소 초기화 완료: {len(chunked_texts)}개 청크 저장")
-        
-        # ===== 9단계: 테스트 검색 =====
-        # 저장이 제대로 되었는지 테스트하기 위해 검색 실행
-        test_query = "전주비빔밥"  # 검색할 키워드
-        logger.info(f"테스트 검색 수행: '{test_query}'")
-        
-        # similarity_search: 벡터 유사도 검색
-        # "전주비빔밥"과 유사한 메뉴를 찾음
-        # k=3: 상위 3개 결과만 가져옴
-        results = vectorstore.similarity_search(test_query, k=3)
+        # ===== 7단계: 증분 동기화 =====
+        # 해시가 바뀐 메뉴만 임베딩하고, 사라진 메뉴는 삭제
+        sync_documents(vectorstore, chunked_texts, chunked_metadatas, chunked_ids, dry_run=dry_run)
+        if dry_run:
+            return
         
-        # 검색 결과 개수 로그 기록
-        logger.info(f"테스트 검색 결과: {len(results)}개 결과")
-        
-        # 각 검색 결과를 하나씩 출력
-        # enumerate(results, 1): 결과 리스트를 순회하면서 번호를 1부터 시작
-        for i, result in enumerate(results, 1):
-            # result는 딕셔너리 형태: {"content": "...", "metadata": {...}, "score": 0.95}
-            # .get('menu_name', 'N/A'): metadata에서 menu_name 가져오기, 없으면 'N/A'
-            # .get('score', 'N/A'): 유사도 점수 가져오기, 없으면 'N/A'
-            # :.4f: 소수점 4자리까지 표시
-            logger.info(f"  {i}. {result['metadata'].get('menu_name', 'N/A')} "
-                       f"(점수: {result.get('score', 'N/A'):.4f})")
+        # ===== 8단계: 테스트 검색 =====
+        run_test_search(vectorstore)
         
     except Exception as e:
         # 에러 발생 시 로그에 기록하고 다시 에러를 발생시킴
@@ -467,9 +730,60 @@ def init_vectorstore_from_csv():
         raise  # 에러를 다시 발생시켜서 프로그램이 멈추도록 함
 
 
+def run_test_search(vectorstore: VectorStore):
+    """저장이 제대로 되었는지 테스트 검색 실행"""
+    # 저장이 제대로 되었는지 테스트하기 위해 검색 실행
+    test_query = "전주비빔밥"  # 검색할 키워드
+    logger.info(f"테스트 검색 수행: '{test_query}'")
+    
+    # similarity_search: 벡터 유사도 검색
+    # "전주비빔밥"과 유사한 메뉴를 찾음
+    # k=3: 상위 3개 결과만 가져옴
+    results = vectorstore.similarity_search(test_query, k=3)
+    
+    # 검색 결과 개수 로그 기록
+    logger.info(f"테스트 검색 결과: {len(results)}개 결과")
+    
+    # 각 검색 결과를 하나씩 출력
+    # enumerate(results, 1): 결과 리스트를 순회하면서 번호를 1부터 시작
+    for i, result in enumerate(results, 1):
+        # result는 딕셔너리 형태: {"content": "...", "metadata": {...}, "score": 0.95}
+        # .get('menu_name', 'N/A'): metadata에서 menu_name 가져오기, 없으면 'N/A'
+        # .get('score', 'N/A'): 유사도 점수 가져오기, 없으면 'N/A'
+        # :.4f: 소수점 4자리까지 표시
+        logger.info(f"  {i}. {result['metadata'].get('menu_name', 'N/A')} "
+                   f"(점수: {result.get('score', 'N/A'):.4f})")
+
+
 # ===== 스크립트 실행 진입점 =====
 # 이 파일을 직접 실행할 때만 아래 코드가 실행됨
 # 다른 파일에서 import해서 사용할 때는 실행되지 않음
 if __name__ == "__main__":
+    # 명령줄 옵션 처리
+    parser = argparse.ArgumentParser(description="CSV 데이터를 벡터 데이터베이스에 저장")
+    parser.add_argument("--sync", action="store_true",
+                        help="증분 동기화 (바뀐 메뉴만 임베딩, 사라진 메뉴 삭제)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="증분 동기화 시 바뀔 내용만 출력하고 저장하지 않음 (--sync 포함)")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="중단된 전체 재구축 체크포인트를 무시하고 처음부터 다시 적재")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="스트리밍 적재 배치 크기 (기본: INGEST_BATCH_SIZE 또는 256)")
+    parser.add_argument("--queue-size", type=int, default=None,
+                        help="단계 사이 큐에 쌓아둘 최대 배치 수 (기본: INGEST_QUEUE_SIZE 또는 4)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="임베딩 워커 프로세스 수, restaurant_id 기준 샤딩 (기본: INGEST_WORKERS 또는 1)")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="워커별 torch/ONNX 스레드 수 (기본: CPU 수 ÷ 워커 수)")
+    args = parser.parse_args()
+    
     # 메인 함수 호출: CSV 파일을 읽어서 벡터 DB에 저장하는 전체 프로세스 시작
-    init_vectorstore_from_csv()
\ No newline at end of file
+    init_vectorstore_from_csv(
+        sync=args.sync or args.dry_run,
+        dry_run=args.dry_run,
+        resume=not args.no_resume,
+        batch_size=args.batch_size,
+        queue_size=args.queue_size,
+        workers=args.workers,
+        threads_per_worker=args.threads_per_worker
+    )
\ No newline at end of file
@@ -0,0 +1,453 @@
+"""
+/chat, /chat/stream 동시 부하 테스트 (asyncio + httpx)
+
+이 파일의 역할:
+- 여러 요청을 동시에 보내 서버 전체의 지연 시간 분포와 처리량 측정
+  (test_api.py/run_test.py는 한 번에 한 요청의 전체 시간만 잼)
+- 닫힌 루프(closed loop): 가상 사용자 N명이 응답을 받자마자 다음 요청
+- 열린 루프(open loop): 정해진 도착률(초당 요청 수, 포아송 도착)로 응답과 관계없이 요청
+  → 지연 시간은 예정된 도착 시각부터 계산 (서버가 밀리면 대기 시간이 그대로 드러남)
+- 질문 종류 비율(일반 추천/조건 검색/직접 조회/거절) 조절
+- SSE 프레임을 파싱하여 첫 토큰까지 시간(TTFT), 청크 간격, 전체 지연, 오류율, 처리량 기록
+- 부하 중에 /health를 주기적으로 호출하는 프로브로 이벤트 루프 블로킹 감지
+  (핸들러가 이벤트 루프를 막으면 /health 지연이 같이 튐)
+- 백분위수 보고서 출력 + JSON 저장
+
+사용 방법:
+- python scripts/load_test.py --concurrency 16 --requests 300                      # 닫힌 루프, 두 엔드포인트
+- python scripts/load_test.py --mode open --rate 20 --duration 60 --endpoint stream  # 열린 루프
+- python scripts/load_test.py --mix "search=1,direct=1" --output load_results.json
+- python scripts/load_test.py --questions-file questions.txt                       # 한 줄에 질문 하나
+
+참고:
+- 같은 --seed면 요청 순서(엔드포인트, 질문, 도착 시각)가 항상 같음
+- OpenAI 지연 시간/비용 없이 우리 서버 오버헤드만 보려면 LLM_PROVIDER=fake로 서버 실행 (app/llm.py)
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmark_retrieval import percentile
+from app.utils import validate_question
+
+
+# 질문 종류별 예시 (실제 서비스 질문 형태)
+QUESTION_MIX = {
+    # 일반 추천 (임베딩 + 벡터 검색 + LLM)
+    "search": [
+        "전주 콩나물국밥 맛집 추천해줘",
+        "쌀쌀한 날 먹기 좋은 국물 요리 추천",
+        "아이랑 같이 갈 만한 양식집 어디야?",
+        "혼밥하기 좋은 분식집 추천해줘",
+        "해물 들어간 메뉴 추천",
+        "회식하기 좋은 중식당 추천",
+        "디저트 카페 추천해줘",
+        "매운 음식 먹고 싶어, 추천해줘",
+    ],
+    # 가격/칼로리/카테고리 조건 (where 절 필터)
+    "filter": [
+        "만원 이하 한식 메뉴 추천해줘",
+        "500칼로리 이하 다이어트 메뉴 추천",
+        "8000원 이하로 먹을 수 있는 점심 메뉴",
+        "2만원 넘는 양식 메뉴 알려줘",
+        "칼로리 낮은 카페 디저트 추천",
+    ],
+    # 음식점명/메뉴명 직접 조회 (LLM 없는 빠른 경로)
+    "direct": [
+        "전주한정식 메뉴 뭐 있어?",
+        "전주한정식 닭볶음탕 가격 얼마야?",
+        "고향라멘 주소 어디야?",
+        "한옥마을 메뉴 알려줘",
+    ],
+    # 서비스 범위 밖 질문 (질문 검증에서 거절)
+    "reject": [
+        "오늘 날씨 어때?",
+        "파이썬 코딩 좀 도와줘",
+        "요즘 인기 있는 노래 추천해줘",
+    ],
+}
+
+DEFAULT_MIX = "search=6,filter=2,direct=1,reject=1"
+
+
+def check_question_mix() -> List[str]:
+    """
+    QUESTION_MIX가 이름표대로의 경로를 타는지 질문 검증(validate_question)으로 확인
+
+    reject 외의 질문이 거절되면 그 종류의 백분위수가 거절 경로 시간으로 섞이므로
+    어긋난 질문 목록을 반환 (비어 있으면 정상)
+    """
+    problems = []
+    for category, questions in QUESTION_MIX.items():
+        for question in questions:
+            is_valid, _ = validate_question(question)
+            if is_valid != (category != "reject"):
+                expected = "거절" if category == "reject" else "허용"
+                problems.append(f"{category}: \"{question}\" (예상: {expected})")
+    return problems
+
+ENDPOINTS = {"chat": "/chat", "stream": "/chat/stream"}
+
+# 스트리밍 오류 청크 (서버가 done=True와 함께 보내는 오류 메시지)
+STREAM_ERROR_PREFIXES = ("오류가 발생했습니다", "응답을 생성하는 중 오류가 발생했습니다")
+
+
+@dataclass
+class RequestResult:
+    """요청 하나의 측정 결과 (시간 단위: 초)"""
+    endpoint: str
+    category: str
+    ok: bool = False
+    error: Optional[str] = None
+    latency: float = 0.0
+    queue_delay: float = 0.0
+    ttft: Optional[float] = None
+    gaps: List[float] = field(default_factory=list)
+    chunks: int = 0
+    chars: int = 0
+
+
+def parse_mix(value: str) -> List[Tuple[str, float]]:
+    """"search=6,direct=1" → [(종류, 비율), ...]"""
+    mix = []
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in QUESTION_MIX:
+            raise argparse.ArgumentTypeError(f"알 수 없는 질문 종류: {name} (가능: {', '.join(QUESTION_MIX)})")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+def build_request_picker(args):
+    """
+    요청 번호 → (엔드포인트, 질문 종류, 질문)
+
+    번호마다 (seed, 번호)로 난수를 만들어 동시 실행 순서와 관계없이 같은 번호는 같은 요청
+    """
+    if args.questions_file:
+        lines = Path(args.questions_file).read_text(encoding="utf-8").splitlines()
+        pools = {"file": [line.strip() for line in lines if line.strip()]}
+        mix = [("file", 1.0)]
+    else:
+        pools = QUESTION_MIX
+        mix = args.mix
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    endpoints = list(ENDPOINTS) if args.endpoint == "both" else [args.endpoint]
+
+    def pick(index: int) -> Tuple[str, str, str]:
+        rng = random.Random(f"{args.seed}:{index}")
+        category = rng.choices(names, weights=weights)[0]
+        return rng.choice(endpoints), category, rng.choice(pools[category])
+
+    return pick
+
+
+def parse_sse_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    SSE data 줄 → StreamChunk 딕셔너리
+
+    서버가 "data: {...}" 문자열을 EventSourceResponse로 한 번 더 감싸므로
+    프론트엔드(src/services/api.ts)처럼 앞의 "data: "를 모두 제거
+    """
+    line = line.strip()
+    if not line.startswith("data:"):
+        return None
+    while line.startswith("data:"):
+        line = line[5:].strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+async def send_chat(client: httpx.AsyncClient, result: RequestResult, question: str, start: float):
+    response = await client.post(ENDPOINTS["chat"], json={"message": question})
+    if response.status_code != 200:
+        result.error = f"http_{response.status_code}"
+        return
+    body = response.json()
+    result.chars = len(body.get("response", ""))
+    result.chunks = 1
+    result.ttft = time.perf_counter() - start
+    result.ok = True
+
+
+async def send_stream(client: httpx.AsyncClient, result: RequestResult, question: str, start: float):
+    async with client.stream("POST", ENDPOINTS["stream"], json={"message": question}) as response:
+        if response.status_code != 200:
+            result.error = f"http_{response.status_code}"
+            return
+        last_chunk_at = None
+        async for line in response.aiter_lines():
+            chunk = parse_sse_line(line)
+            if chunk is None:
+                continue
+            now = time.perf_counter()
+            content = chunk.get("content") or ""
+            if content:
+                if chunk.get("done") and content.startswith(STREAM_ERROR_PREFIXES):
+                    result.error = "error_chunk"
+                    return
+                if last_chunk_at is None:
+                    result.ttft = now - start
+                else:
+                    result.gaps.append(now - last_chunk_at)
+                last_chunk_at = now
+                result.chunks += 1
+                result.chars += len(content)
+            if chunk.get("done"):
+                result.ok = True
+                return
+        result.error = "no_done_chunk"
+
+
+async def run_request(client: httpx.AsyncClient, endpoint: str, category: str, question: str,
+                      scheduled: float, started: float) -> RequestResult:
+    """
+    요청 하나 실행
+
+    scheduled: 예정 시각 (열린 루프의 도착 시각, 닫힌 루프는 started와 같음)
+    → 지연 시간/TTFT는 예정 시각부터 계산
+    """
+    result = RequestResult(endpoint=endpoint, category=category, queue_delay=started - scheduled)
+    try:
+        if endpoint == "chat":
+            await send_chat(client, result, question, scheduled)
+        else:
+            await send_stream(client, result, question, scheduled)
+    except httpx.TimeoutException:
+        result.error = "timeout"
+    except httpx.HTTPError as e:
+        result.error = type(e).__name__
+    result.latency = time.perf_counter() - scheduled
+    return result
+
+
+async def closed_loop(client, pick, args, results: List[RequestResult]):
+    """가상 사용자 concurrency명이 응답을 받자마자 다음 요청"""
+    counter = iter(range(args.requests))
+    deadline = time.perf_counter() + args.duration if args.duration else None
+
+    async def user():
+        for index in counter:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            endpoint, category, question = pick(index)
+            now = time.perf_counter()
+            results.append(await run_request(client, endpoint, category, question, now, now))
+
+    await asyncio.gather(*(user() for _ in range(args.concurrency)))
+
+
+async def open_loop(client, pick, args, results: List[RequestResult]):
+    """
+    초당 rate개(포아송 도착)로 요청 시작
+
+    동시 요청이 concurrency를 넘으면 슬롯이 빌 때까지 기다리며, 그 시간도 지연 시간에 포함됨
+    """
+    rng = random.Random(f"{args.seed}:arrivals")
+    slots = asyncio.Semaphore(args.concurrency)
+    total = int(args.rate * args.duration) if args.duration else args.requests
+    tasks = []
+
+    async def fire(index: int, scheduled: float):
+        async with slots:
+            endpoint, category, question = pick(index)
+            results.append(await run_request(client, endpoint, category, question, scheduled, time.perf_counter()))
+
+    scheduled = time.perf_counter()
+    for index in range(total):
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(fire(index, scheduled)))
+        scheduled += rng.expovariate(args.rate)
+    await asyncio.gather(*tasks)
+
+
+async def health_probe(client: httpx.AsyncClient, interval: float, samples: List[float], stop: asyncio.Event):
+    """부하 중 /health 지연 측정 (이벤트 루프가 막히면 이 값이 같이 커짐)"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            await client.get("/health")
+            samples.append(time.perf_counter() - start)
+        except httpx.HTTPError:
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+def distribution_ms(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "p50": round(percentile(ordered, 0.50) * 1000, 1),
+        "p90": round(percentile(ordered, 0.90) * 1000, 1),
+        "p95": round(percentile(ordered, 0.95) * 1000, 1),
+        "p99": round(percentile(ordered, 0.99) * 1000, 1),
+        "max": round(ordered[-1] * 1000, 1)
+    }
+
+
+def summarize(results: List[RequestResult], elapsed: float) -> Dict[str, Any]:
+    """요청 결과 목록 → 지표별 백분위수"""
+    succeeded = [r for r in results if r.ok]
+    errors: Dict[str, int] = {}
+    for r in results:
+        if not r.ok:
+            errors[r.error or "unknown"] = errors.get(r.error or "unknown", 0) + 1
+    return {
+        "requests": len(results),
+        "succeeded": len(succeeded),
+        "error_rate": round(1 - len(succeeded) / len(results), 4) if results else 0.0,
+        "errors": errors,
+        "throughput_rps": round(len(succeeded) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": distribution_ms([r.latency for r in succeeded]),
+        "ttft_ms": distribution_ms([r.ttft for r in succeeded if r.ttft is not None]),
+        "chunk_gap_ms": distribution_ms([gap for r in succeeded for gap in r.gaps]),
+        "queue_delay_ms": distribution_ms([r.queue_delay for r in results]),
+        "chunks_per_response": round(sum(r.chunks for r in succeeded) / len(succeeded), 1) if succeeded else 0.0
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    rows = [("전체 지연", "latency_ms"), ("TTFT", "ttft_ms"), ("청크 간격", "chunk_gap_ms"), ("시작 대기", "queue_delay_ms")]
+    for name, summary in report["endpoints"].items():
+        print(f"\n[{ENDPOINTS[name]}] 요청 {summary['requests']}개, 성공 {summary['succeeded']}개, "
+              f"오류율 {summary['error_rate']:.1%}, 처리량 {summary['throughput_rps']} req/s")
+        if summary["errors"]:
+            print(f"  오류: {summary['errors']}")
+        print(f"  {'지표(ms)':<12}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+        for label, key in rows:
+            dist = summary[key]
+            if dist.get("count"):
+                print(f"  {label:<12}" + "".join(f"{dist[p]:>9}" for p in ("p50", "p90", "p95", "p99", "max")))
+
+    print("\n[질문 종류별 전체 지연 p50 / p95 (ms)]")
+    for category, summary in report["categories"].items():
+        dist = summary["latency_ms"]
+        if dist.get("count"):
+            print(f"  {category}: {dist['p50']} / {dist['p95']} (오류율 {summary['error_rate']:.1%})")
+
+    probe = report["health_probe_ms"]
+    if probe.get("count"):
+        print(f"\n[/health 프로브] p50 {probe['p50']}ms, p99 {probe['p99']}ms, max {probe['max']}ms "
+              f"(부하 중 크게 튀면 이벤트 루프 블로킹 의심)")
+
+
+async def main_async(args) -> Dict[str, Any]:
+    pick = build_request_picker(args)
+    limits = httpx.Limits(max_connections=args.concurrency + 1, max_keepalive_connections=args.concurrency + 1)
+    timeout = httpx.Timeout(args.timeout, connect=10.0)
+    results: List[RequestResult] = []
+    probe_samples: List[float] = []
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits) as client:
+        # 워밍업 (모델/인덱스 지연 로딩 제외, 결과는 버림)
+        for index in range(args.warmup):
+            endpoint, category, question = pick(-1 - index)
+            now = time.perf_counter()
+            await run_request(client, endpoint, category, question, now, now)
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(health_probe(client, args.probe_interval, probe_samples, stop)) \
+            if args.probe_interval > 0 else None
+        started = time.perf_counter()
+        if args.mode == "open":
+            await open_loop(client, pick, args, results)
+        else:
+            await closed_loop(client, pick, args, results)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        if probe is not None:
+            await probe
+
+    by_endpoint: Dict[str, List[RequestResult]] = {}
+    by_category: Dict[str, List[RequestResult]] = {}
+    for r in results:
+        by_endpoint.setdefault(r.endpoint, []).append(r)
+        by_category.setdefault(r.category, []).append(r)
+
+    return {
+        "benchmark": "load_test",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "base_url": args.base_url,
+            "mode": args.mode,
+            "endpoint": args.endpoint,
+            "concurrency": args.concurrency,
+            "rate": args.rate if args.mode == "open" else None,
+            "requests": args.requests,
+            "duration": args.duration,
+            "mix": args.questions_file or dict(args.mix),
+            "seed": args.seed
+        },
+        "elapsed_seconds": round(elapsed, 2),
+        "overall": summarize(results, elapsed),
+        "endpoints": {name: summarize(items, elapsed) for name, items in sorted(by_endpoint.items())},
+        "categories": {name: summarize(items, elapsed) for name, items in sorted(by_category.items())},
+        "health_probe_ms": distribution_ms(probe_samples)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/chat, /chat/stream 동시 부하 테스트")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="서버 주소")
+    parser.add_argument("--endpoint", choices=["chat", "stream", "both"], default="both", help="요청할 엔드포인트")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed",
+                        help="closed: 가상 사용자 N명 연속 요청, open: 초당 --rate개 도착")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="동시 요청 수 (closed: 가상 사용자 수, open: 최대 동시 요청 수)")
+    parser.add_argument("--rate", type=float, default=5.0, help="open 모드 도착률 (초당 요청 수)")
+    parser.add_argument("--requests", type=int, default=200, help="총 요청 수 (--duration이 있으면 open 모드는 rate×duration)")
+    parser.add_argument("--duration", type=float, default=None, help="실행 시간 (초)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"질문 종류 비율 (기본 {DEFAULT_MIX})")
+    parser.add_argument("--questions-file", default=None, help="질문 파일 (한 줄에 하나, --mix 대신 사용)")
+    parser.add_argument("--warmup", type=int, default=3, help="측정 전 워밍업 요청 수")
+    parser.add_argument("--timeout", type=float, default=60.0, help="요청 타임아웃 (초)")
+    parser.add_argument("--probe-interval", type=float, default=0.2, help="/health 프로브 주기 (초, 0이면 끔)")
+    parser.add_argument("--seed", type=int, default=42, help="요청 순서/도착 시각 시드")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로")
+    args = parser.parse_args()
+    args.concurrency = max(1, args.concurrency)
+    if not args.questions_file:
+        problems = check_question_mix()
+        if problems:
+            parser.error("질문 검증 결과가 종류와 맞지 않는 질문: " + ", ".join(problems))
+
+    print(f"부하 테스트 시작: {args.base_url} ({args.mode} loop, 동시 {args.concurrency}"
+          + (f", 초당 {args.rate}개" if args.mode == "open" else "") + ")")
+    report = asyncio.run(main_async(args))
+    print_report(report)
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    main()
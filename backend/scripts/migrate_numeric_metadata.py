@@ -0,0 +1,48 @@
+"""
+벡터 DB 메타데이터 마이그레이션 스크립트
+가격/칼로리를 문자열에서 정수로 변환
+
+이 파일의 역할:
+- 기존 ChromaDB 컬렉션에 문자열("8000")로 저장된 price/calories를 정수(8000)로 변환
+- 임베딩은 다시 계산하지 않고 메타데이터만 배치 단위로 갱신
+
+왜 필요한가:
+- 예전 init_vectorstore.py는 CSV 값을 문자열 그대로 저장했음
+- 문자열 메타데이터에는 ChromaDB where 절의 $lte/$gte 비교가 적용되지 않아
+  "5천원 이하 디저트" 같은 필터 검색이 검색 전에 걸러지지 않음
+- 전체 재구축(임베딩 재계산) 없이 기존 컬렉션을 바로 사용할 수 있게 함
+
+사용 방법:
+- python scripts/migrate_numeric_metadata.py
+- python scripts/migrate_numeric_metadata.py --batch-size 1000
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# 프로젝트 루트 경로 설정
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.vectorstore import VectorStore
+from app.utils import logger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가격/칼로리 메타데이터를 정수로 변환")
+    parser.add_argument("--batch-size", type=int, default=500, help="한 번에 조회/갱신할 문서 수")
+    args = parser.parse_args()
+
+    try:
+        print("메타데이터 마이그레이션 시작 (price/calories → 정수)")
+        vectorstore = VectorStore()
+        stats = vectorstore.migrate_numeric_metadata(batch_size=args.batch_size)
+        print(f"완료: {stats['scanned']}개 확인, {stats['updated']}개 변환, 숫자가 아닌 값 {stats['invalid']}개")
+    except Exception as e:
+        logger.error(f"메타데이터 마이그레이션 실패: {e}", exc_info=True)
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+어휘 인덱스 강한 일치 회귀 테스트 (data/restaurant_menu_data.csv 기준)
+
+단어 중간에 걸친 이름("중이라면"의 "라면")이나 음식점명만 일치한 질문이
+임베딩을 생략하는 빠른 경로로 빠지지 않는지 확인
+"""
+
+import csv
+from pathlib import Path
+
+import pytest
+
+from app.lexical_index import LexicalIndex
+from app.preferences import parse_preferences
+
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "restaurant_menu_data.csv"
+
+
+@pytest.fixture(scope="module")
+def index() -> LexicalIndex:
+    with open(DATA_PATH, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.DictReader(f))
+    documents = [f"{row['restaurant_name']} - {row['menu_name']}" for row in rows]
+    return LexicalIndex().build(documents, rows)
+
+
+@pytest.mark.parametrize("query", [
+    "다이어트 중이라면 추천해줘",
+    "점심이라면 뭐가 좋을까",
+    "혼자라면 어디 갈까",
+    "한옥마을 근처 맛집 추천",
+])
+def test_ambiguous_queries_are_not_strong(index, query):
+    _, strong = index.search(query, k=5)
+    assert strong is False
+
+
+@pytest.mark.parametrize("query, menu_name", [
+    ("라면 추천해줘", "라면"),
+    ("비빔밥 가격 얼마야", "비빔밥"),
+    ("비빔밥은 얼마야", "비빔밥"),
+    ("전주한정식 닭볶음탕", "닭볶음탕"),
+])
+def test_menu_name_on_word_boundary_is_strong(index, query, menu_name):
+    results, strong = index.search(query, k=5)
+    assert strong is True
+    assert results[0]["metadata"]["menu_name"] == menu_name
+
+
+
+@pytest.mark.parametrize("query", [
+    "만원 이하 비빔밥",
+    "700칼로리 이하 비빔밥",
+    "저렴한 비빔밥",
+])
+def test_numeric_filters_accept_string_metadata(index, query):
+    # CSV 행처럼 가격/칼로리가 문자열로 저장된 예전 컬렉션에서도 범위 조건이 동작해야 함
+    search_filter = parse_preferences(query)
+    results, _ = index.search(query, k=5, search_filter=search_filter)
+    assert results
+    for result in results:
+        assert search_filter.matches(result["metadata"])
+        if search_filter.max_price is not None:
+            assert int(result["metadata"]["price"]) <= search_filter.max_price
+        if search_filter.max_calories is not None:
+            assert int(result["metadata"]["calories"]) <= search_filter.max_calories
+
+
+@pytest.mark.parametrize("query", [
+    "비빔밥이랑 비슷한 거 추천",
+    "라면 말고 다른 거",
+    "비빔밥 어울리는 반찬",
+])
+def test_menu_name_with_intent_words_is_not_strong(index, query):
+    # 요리명 외에 의도가 담긴 단어가 있으면 어휘 결과만으로 답하지 않고 RRF로 결합
+    _, strong = index.search(query, k=5)
+    assert strong is False
+
+
+@pytest.mark.parametrize("query", [
+    "만원 이하 비빔밥 추천해줘",
+    "전주 비빔밥 맛집 알려줘",
+    "비빔밥 칼로리 좀 알려주세요",
+])
+def test_menu_name_with_filler_words_is_strong(index, query):
+    _, strong = index.search(query, k=5)
+    assert strong is True
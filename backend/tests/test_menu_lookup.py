@@ -0,0 +1,66 @@
+"""
+메뉴 직접 조회 테스트 (data/restaurant_menu_data.csv 기준)
+
+질문 검증을 통과한 가격/칼로리 질문이 LLM 없이 템플릿으로 답변되는지 확인
+"""
+
+import csv
+from pathlib import Path
+
+import pytest
+
+from app.menu_lookup import MenuLookup
+from app.utils import validate_question
+
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "restaurant_menu_data.csv"
+
+
+def load_rows():
+    with open(DATA_PATH, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.DictReader(f))
+    documents = [f"{row['restaurant_name']} - {row['menu_name']}" for row in rows]
+    return documents, rows
+
+
+@pytest.fixture(scope="module")
+def lookup() -> MenuLookup:
+    return MenuLookup(load_rows)
+
+
+def test_menu_price_question_is_answered_directly(lookup):
+    question = "전주한정식 비빔밥 가격 얼마야?"
+    is_valid, _ = validate_question(question)
+    assert is_valid is True
+
+    hit = lookup.lookup(question)
+    assert hit is not None
+    answer, results = hit
+    assert answer.startswith("전주한정식의 비빔밥 가격은")
+    # 같은 이름의 지점이 여럿이면 지점별로 답변
+    assert results
+    assert all(r["metadata"]["menu_name"] == "비빔밥" for r in results)
+    assert all(r["metadata"]["restaurant_name"] == "전주한정식" for r in results)
+
+
+@pytest.mark.parametrize("question, first_line", [
+    ("전주한정식 닭볶음탕 칼로리는?", "전주한정식의 닭볶음탕 칼로리는"),
+    ("전주한정식 메뉴 뭐 있어?", "전주한정식 (한식) 주소:"),
+    ("전주한정식 주소 어디야", "전주한정식 (한식) 주소:"),
+])
+def test_confident_hits(lookup, question, first_line):
+    hit = lookup.lookup(question)
+    assert hit is not None
+    assert hit[0].startswith(first_line)
+
+
+@pytest.mark.parametrize("question", [
+    "보리밥 말고 다른 메뉴 추천",
+    "한옥마을에서 만원 이하 메뉴 뭐 있어?",
+    "전주 한옥마을 근처 메뉴 추천해줘",
+    "전주한정식이랑 비슷한 가격대 식당 추천",
+    "전주한정식 한식 메뉴 뭐 있어?",
+    "전주한정식 비빔밥보다 싼 메뉴 가격",
+])
+def test_filter_and_recommendation_questions_go_to_rag(lookup, question):
+    assert lookup.lookup(question) is None
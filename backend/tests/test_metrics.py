@@ -0,0 +1,66 @@
+"""
+Prometheus 텍스트 형식 출력 테스트 (app/metrics.py)
+
+히스토그램 누적 구간(le), +Inf/_sum/_count 줄과 스크레이프 시점 콜백(collector) 출력 확인
+"""
+
+from app.metrics import Counter, Histogram, MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram(
+        "test_duration_seconds", "테스트 시간", ["path"], buckets=(0.1, 0.5, 1.0)))
+    child = histogram.labels(path="stream")
+    for value in (0.05, 0.1, 0.3, 2.0):
+        child.observe(value)
+
+    assert registry.render().splitlines() == [
+        "# HELP test_duration_seconds 테스트 시간",
+        "# TYPE test_duration_seconds histogram",
+        'test_duration_seconds_bucket{path="stream",le="0.1"} 2',
+        'test_duration_seconds_bucket{path="stream",le="0.5"} 3',
+        'test_duration_seconds_bucket{path="stream",le="1"} 3',
+        'test_duration_seconds_bucket{path="stream",le="+Inf"} 4',
+        'test_duration_seconds_sum{path="stream"} 2.45',
+        'test_duration_seconds_count{path="stream"} 4',
+    ]
+
+
+def test_unlabelled_counter_and_collector_family():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("test_requests_total", "요청 수"))
+    counter.inc()
+    counter.inc(2)
+
+    def cache_family():
+        return [
+            ("test_cache_hits_total", "counter", "캐시 히트 수", [
+                ({"cache": "embedding"}, 3),
+                ({"cache": "answer\"s"}, 0.5),
+            ]),
+        ]
+
+    # 같은 이름으로 다시 등록하면 교체 (중복 출력 없음)
+    registry.register_collector("cache", cache_family)
+    registry.register_collector("cache", cache_family)
+
+    assert registry.render().splitlines() == [
+        "# HELP test_requests_total 요청 수",
+        "# TYPE test_requests_total counter",
+        "test_requests_total 3",
+        "# HELP test_cache_hits_total 캐시 히트 수",
+        "# TYPE test_cache_hits_total counter",
+        'test_cache_hits_total{cache="embedding"} 3',
+        'test_cache_hits_total{cache="answer\\"s"} 0.5',
+    ]
+
+
+def test_failing_collector_is_skipped():
+    registry = MetricsRegistry()
+
+    def broken():
+        raise RuntimeError("수집 실패")
+
+    registry.register_collector("broken", broken)
+    assert registry.render() == "\n"
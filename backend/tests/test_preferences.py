@@ -0,0 +1,58 @@
+"""
+질문 선호도 파서 테스트 (app/preferences.py)
+
+범위/가격대/제외 표현과 제외로 잘못 읽기 쉬운 표현("부담 없는 가격")을 표로 확인
+기대값에 없는 필드는 기본값(빈 목록/None)이어야 함
+"""
+
+import pytest
+
+from app.preferences import SearchFilter, parse_preferences
+
+
+SPICY_TERMS = ["매운", "매콤", "고추", "짬뽕", "떡볶이", "마라", "불닭", "핫치킨"]
+
+
+@pytest.mark.parametrize("question, expected", [
+    # 가격 범위/상한/하한
+    ("1만~2만원 메뉴", {"min_price": 10000, "max_price": 20000}),
+    ("8천원에서 12000원 사이", {"min_price": 8000, "max_price": 12000}),
+    ("2만~1만원", {"min_price": 10000, "max_price": 20000}),
+    ("1만원대 점심", {"min_price": 10000, "max_price": 19999}),
+    ("5천원대 간식", {"min_price": 5000, "max_price": 5999}),
+    ("1만원 이하", {"max_price": 10000}),
+    ("만원 이하 한식", {"categories": ["한식"], "max_price": 10000}),
+    ("1만5천원 미만", {"max_price": 15000}),
+    ("15000원 이상", {"min_price": 15000}),
+    ("12,000원", {"max_price": 12000}),
+    # 칼로리
+    ("500~700칼로리", {"min_calories": 500, "max_calories": 700}),
+    ("500칼로리 이하", {"max_calories": 500}),
+    ("300kcal 넘는 메뉴", {"min_calories": 300}),
+    # 카테고리
+    ("한식이나 일식", {"categories": ["한식", "일식"]}),
+    ("중식, 분식", {"categories": ["중식", "분식"]}),
+    ("치킨 추천", {"categories": ["치킨/닭강정"]}),
+    # 가격대 (명시적인 가격이 있으면 숫자 범위는 그대로)
+    ("저렴한 한식", {"categories": ["한식"], "max_price": 8000, "price_tier": "low"}),
+    ("가성비 좋은 곳", {"max_price": 8000, "price_tier": "low"}),
+    ("적당한 가격", {"min_price": 8000, "max_price": 15000, "price_tier": "medium"}),
+    ("고급 일식", {"categories": ["일식"], "min_price": 15000, "price_tier": "high"}),
+    ("비싼 거", {"min_price": 15000, "price_tier": "high"}),
+    ("저렴한 1만원 이하", {"max_price": 10000, "price_tier": "low"}),
+    # 제외
+    ("매운 거 빼고", {"exclude_terms": SPICY_TERMS}),
+    ("한식 말고", {"exclude_categories": ["한식"]}),
+    ("치킨 말고 한식", {"categories": ["한식"], "exclude_categories": ["치킨/닭강정"]}),
+    ("돼지고기 제외", {"exclude_terms": ["돼지고기"]}),
+    ("돼지고기 없는 메뉴", {"exclude_terms": ["돼지고기"]}),
+    ("고추 없는 메뉴", {"exclude_terms": ["고추"]}),
+    ("매운 거 없이", {"exclude_terms": SPICY_TERMS}),
+    # 제외로 잘못 읽기 쉬운 표현
+    ("부담 없는 가격의 한식", {"categories": ["한식"]}),
+    ("걱정 없이 먹을 수 있는 메뉴", {}),
+    ("전주한정식 비빔밥 가격 얼마야?", {}),
+    ("반만원", {}),
+])
+def test_parse_preferences(question, expected):
+    assert parse_preferences(question) == SearchFilter(**expected)
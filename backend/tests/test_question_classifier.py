@@ -0,0 +1,37 @@
+"""
+질문 검증 키워드 분류기 테스트 (app/question_keywords.json 기준)
+
+한 글자 금지 키워드("비", "눈")가 "비빔밥", "비용", "눈꽃빙수" 같은 단어 안에서
+일치하여 음식 질문을 거절하지 않는지 확인
+"""
+
+import pytest
+
+from app.utils import validate_question, classify_question
+
+
+@pytest.mark.parametrize("question", [
+    "전주한정식 비빔밥 가격 얼마야?",
+    "전주 비빔밥 맛집 추천해줘",
+    "전주 맛집 식사 비용 얼마야",
+    "눈꽃빙수 맛집 추천",
+    "비만에 좋은 음식 추천",
+])
+def test_short_forbidden_keyword_inside_word_is_allowed(question):
+    is_valid, _ = validate_question(question)
+    assert is_valid is True
+    assert classify_question(question)["forbidden"] == []
+
+
+@pytest.mark.parametrize("question, category", [
+    ("비 오는 날 먹기 좋은 국물 요리 추천", "weather"),
+    ("비가 오는데 전주 맛집 추천", "weather"),
+    ("비오는 날 전주 맛집", "weather"),
+    ("눈 오는 날 전주 맛집", "weather"),
+    ("전주 날씨 어때", "weather"),
+    ("노래 추천해줘 전주", "music"),
+])
+def test_forbidden_keywords_are_rejected(question, category):
+    is_valid, _ = validate_question(question)
+    assert is_valid is False
+    assert category in classify_question(question)["forbidden"]